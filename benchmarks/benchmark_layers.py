@@ -0,0 +1,233 @@
+"""
+Micro-benchmarks of the hot paths of the custom layer classes, run headlessly (no viewer).
+
+Every benchmark is run over a range of volume sizes or prompt counts and the median runtime per
+call is reported together with the scaling exponent (the slope of the log-log curve, e.g. ~1 for
+linear and ~3 for a cubic volume). Results can be saved and compared against a baseline, in which
+case the script fails if a benchmark became slower than the tolerance allows:
+
+    python benchmarks/benchmark_layers.py --save baseline.json
+    python benchmarks/benchmark_layers.py --compare baseline.json --tolerance 1.5
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from napari_nninteractive.layers.bbox_layer import BBoxLayer
+from napari_nninteractive.layers.lasso_layer import LassoLayer
+from napari_nninteractive.layers.point_layer import SinglePointLayer
+from napari_nninteractive.layers.scribble_layer import ScribbleLayer
+from napari_nninteractive.utils.registry import ObjectRegistry
+from napari_nninteractive.utils.utils import ColorMapper
+
+DEFAULT_VOLUME_SIZES = (64, 128, 256)
+DEFAULT_PROMPT_COUNTS = (10, 100, 1000)
+
+
+def measure(
+    run: Callable[[], None], setup: Optional[Callable[[], None]] = None, repeats: int = 20
+) -> float:
+    """
+    Measures the median runtime of a function in seconds, `setup` is called untimed before each run.
+    """
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def _rectangle(z: int, y: float, x: float, size: float = 8.0) -> np.ndarray:
+    return np.array([[z, y, x], [z, y + size, x], [z, y + size, x + size], [z, y, x + size]])
+
+
+def _polygon(z: int, center: float, radius: float, vertices: int = 32) -> np.ndarray:
+    _angles = np.linspace(0, 2 * np.pi, vertices, endpoint=False)
+    return np.stack(
+        [
+            np.full(vertices, z, dtype=float),
+            center + radius * np.sin(_angles),
+            center + radius * np.cos(_angles),
+        ],
+        axis=1,
+    )
+
+
+# Benchmarks over the number of prompts already in the layer (or objects / colors)
+
+
+def bench_point_add_remove(n_prompts: int, repeats: int) -> float:
+    """SinglePointLayer._add followed by remove_last with `n_prompts` points in the layer."""
+    layer = SinglePointLayer(ndim=3)
+    for i in range(n_prompts):
+        layer.add(np.array([[i % 64, i % 32, i % 16]], dtype=float))
+        layer.run()
+    _point = np.array([[1.0, 2.0, 3.0]])
+
+    def _run():
+        layer._add(_point)
+        layer.prompts.append(_point[0], True, 0)
+        layer.remove_last()
+
+    return measure(_run, repeats=repeats)
+
+
+def bench_bbox_remove_last(n_prompts: int, repeats: int) -> float:
+    """BBoxLayer.remove_last with `n_prompts` boxes in the layer."""
+    layer = BBoxLayer(ndim=3)
+    for i in range(n_prompts):
+        layer.add(_rectangle(i % 64, i % 32, i % 16), shape_type="rectangle")
+        layer.run()
+
+    def _setup():
+        layer._add(_rectangle(0, 1, 1), shape_type="rectangle")
+        layer.prompts.append(np.zeros(3), True, 0)
+
+    return measure(layer.remove_last, _setup, repeats=repeats)
+
+
+def bench_color_mapper(n_prompts: int, repeats: int) -> float:
+    """ColorMapper.__getitem__ for `n_prompts` object ids."""
+    mapper = ColorMapper(49, seed=0.5, background_value=0)
+
+    def _run():
+        for i in range(n_prompts):
+            mapper[i]
+
+    return measure(_run, repeats=repeats)
+
+
+def bench_object_registry(n_prompts: int, repeats: int) -> float:
+    """
+    Registering a new object and looking it up by layer with `n_prompts` objects. The registry
+    replaced `determine_layer_index`, which parsed the names of all layers.
+    """
+    registry = ObjectRegistry()
+    for i in range(n_prompts):
+        registry.register(i, object())
+
+    def _run():
+        _layer = object()
+        _index = registry.next_index
+        registry.register(_index, _layer)
+        registry.find(_layer)
+        registry.remove(_index)
+
+    return measure(_run, repeats=repeats)
+
+
+# Benchmarks over the volume size (edge length of a cubic volume)
+
+
+def bench_lasso_get_last(size: int, repeats: int) -> float:
+    """LassoLayer.get_last, which rasterizes the lasso into a volume of `size`^3."""
+    layer = LassoLayer(shape=(size, size, size), ndim=3)
+    layer.add(_polygon(size // 2, size / 2, size / 4), shape_type="polygon")
+    return measure(layer.get_last, repeats=repeats)
+
+
+def bench_scribble_run(size: int, repeats: int) -> float:
+    """ScribbleLayer.run, which marks the scribble as set, in a volume of `size`^3."""
+    layer = ScribbleLayer(data=np.zeros((size, size, size), dtype=np.uint8))
+    _stroke = (size // 2, slice(size // 4, size // 2), slice(size // 4, size // 4 + 3))
+
+    def _setup():
+        layer.data[_stroke] = 1
+        layer._is_free = False
+
+    return measure(layer.run, _setup, repeats=repeats)
+
+
+def bench_scribble_get_last(size: int, repeats: int) -> float:
+    """ScribbleLayer.get_last, which extracts the last scribble from a volume of `size`^3."""
+    layer = ScribbleLayer(data=np.zeros((size, size, size), dtype=np.uint8))
+    layer.data[size // 2, size // 4 : size // 2, size // 4 : size // 4 + 3] = 1
+    return measure(layer.get_last, repeats=repeats)
+
+
+PROMPT_BENCHMARKS = {
+    "SinglePointLayer._add + remove_last": bench_point_add_remove,
+    "BBoxLayer.remove_last": bench_bbox_remove_last,
+    "ColorMapper.__getitem__": bench_color_mapper,
+    "ObjectRegistry register + find": bench_object_registry,
+}
+VOLUME_BENCHMARKS = {
+    "LassoLayer.get_last": bench_lasso_get_last,
+    "ScribbleLayer.run": bench_scribble_run,
+    "ScribbleLayer.get_last": bench_scribble_get_last,
+}
+
+
+def scaling_exponent(sizes: Sequence[int], times: Sequence[float]) -> float:
+    """Returns the slope of the log-log curve of runtime over size."""
+    if len(sizes) < 2:
+        return float("nan")
+    return float(np.polyfit(np.log(sizes), np.log(np.maximum(times, 1e-12)), 1)[0])
+
+
+def run_benchmarks(
+    volume_sizes: Sequence[int], prompt_counts: Sequence[int], repeats: int
+) -> Dict[str, Dict[str, float]]:
+    """Runs all benchmarks, returns the median runtime per benchmark and size."""
+    results = {}
+    for benchmarks, sizes, unit in (
+        (PROMPT_BENCHMARKS, prompt_counts, "prompts"),
+        (VOLUME_BENCHMARKS, volume_sizes, "voxels^(1/3)"),
+    ):
+        for name, bench in benchmarks.items():
+            _times = [bench(size, repeats) for size in sizes]
+            results[name] = {str(size): t for size, t in zip(sizes, _times)}
+            _row = "  ".join(f"{size:>6}: {1000 * t:9.3f} ms" for size, t in zip(sizes, _times))
+            print(f"{name:<38} {_row}  | O(n^{scaling_exponent(sizes, _times):.2f}) over {unit}")
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float
+) -> List[Tuple[str, str, float]]:
+    """Returns the benchmarks (name, size, slowdown) which are slower than the baseline allows."""
+    regressions = []
+    for name, times in results.items():
+        for size, t in times.items():
+            _base = baseline.get(name, {}).get(size)
+            if _base is not None and _base > 0 and t / _base > tolerance:
+                regressions.append((name, size, t / _base))
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_VOLUME_SIZES)
+    parser.add_argument("--prompts", type=int, nargs="+", default=DEFAULT_PROMPT_COUNTS)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--save", help="Write the results to a json file")
+    parser.add_argument("--compare", help="Compare against the results of an earlier run")
+    parser.add_argument(
+        "--tolerance", type=float, default=1.5, help="Allowed slowdown against the baseline"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.prompts, args.repeats)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, size, slowdown in regressions:
+            print(f"Regression: {name} at {size} is {slowdown:.2f}x slower than the baseline")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
 from typing import Any, List
 
+import numpy as np
 from napari.layers.base._base_constants import ActionType
 from napari.utils.events import Event
 
+from napari_nninteractive.layers.prompt_store import PromptStore
+
 
 class BaseLayerClass(ABC):
     """
@@ -13,6 +16,11 @@ class BaseLayerClass(ABC):
     add or remove data, and track the occupancy status of the layer (whether it is free or occupied).
     Subclasses must implement the `replace_color`, `remove_last`, and `_add` methods.
 
+    The prompts added through `add` are kept in a `PromptStore`, their colors are indices into
+    `palette`: the current colors of positive and negative prompts followed by the colors of set
+    prompts. The store holds the polarity of the prompts, subclasses pop it once for each item they
+    remove. Layers which do not add their prompts through `add` (scribbles) keep it empty.
+
     Args:
         prompt_index (int): The index of the current prompt, affecting the color of the layer.
     """
@@ -29,6 +37,11 @@ class BaseLayerClass(ABC):
             0: [0.0, 0.427, 0.027, 1],  # [0, 109, 7]
             1: [0.561, 0.02, 0.0, 1],  # [143, 5, 0]
         }
+        self.palette = np.array(
+            [self.colors[0], self.colors[1], self.colors_set[0], self.colors_set[1]],
+            dtype=np.float32,
+        )
+        self.prompts = PromptStore()
         self.events.add(finished=Event)
 
     def set_prompt(self, index: int) -> None:
@@ -40,7 +53,8 @@ class BaseLayerClass(ABC):
         """
         self.prompt_index = index
         if not self._is_free:
-            self.replace_color(self.colors[self.prompt_index])
+            self.prompts.update_last(include=index == 0, color_index=index)
+            self.replace_color(self.palette[index])
 
     def add(self, data: Any, *arg, **kwargs) -> None:
         """
@@ -55,6 +69,7 @@ class BaseLayerClass(ABC):
         else:
             self.remove_last()
             self._add(data, *arg, **kwargs)
+        self.prompts.append(self._prompt_position(data), self.prompt_index == 0, self.prompt_index)
 
         self.events.finished(action=ActionType.ADDED, value="ADD")
 
@@ -66,7 +81,8 @@ class BaseLayerClass(ABC):
             return
 
         self._is_free = True
-        self.replace_color(self.colors_set[self.prompt_index])
+        self.prompts.update_last(color_index=self.prompt_index + 2)
+        self.replace_color(self.palette[self.prompt_index + 2])
 
     def is_free(self) -> bool:
         """
@@ -74,6 +90,14 @@ class BaseLayerClass(ABC):
         """
         return self._is_free
 
+    @staticmethod
+    def _prompt_position(data: Any) -> np.ndarray:
+        """Returns the position of a prompt, the mean of its vertices."""
+        if isinstance(data, (list, tuple)) and len(data) > 0 and np.ndim(data[0]) == 2:
+            data = np.concatenate(data)
+        _data = np.asarray(data, dtype=np.float64)
+        return _data.reshape(-1, _data.shape[-1]).mean(axis=0)
+
     @abstractmethod
     def replace_color(self, _color: List[float]) -> None:
         """
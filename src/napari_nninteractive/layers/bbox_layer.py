@@ -63,8 +63,10 @@ class BBoxLayer(BaseLayerClass, Shapes):
 
         self._feature_table.remove(index)
         self.text.remove(index)
-        self._data_view._edge_color = np.delete(self._data_view._edge_color, index, axis=0)
-        self._data_view._face_color = np.delete(self._data_view._face_color, index, axis=0)
+        # The last shape is always the one removed, slicing avoids copying the color arrays
+        self._data_view._edge_color = self._data_view._edge_color[:-1]
+        self._data_view._face_color = self._data_view._face_color[:-1]
+        self.prompts.pop()
 
     def run(self) -> None:
         """
@@ -85,8 +87,8 @@ class BBoxLayer(BaseLayerClass, Shapes):
             self,
             data,
             *args,
-            edge_color=self.colors[self.prompt_index],
-            face_color=self.colors[self.prompt_index],
+            edge_color=self.palette[self.prompt_index],
+            face_color=self.palette[self.prompt_index],
             **kwargs,
         )
 
@@ -96,6 +98,7 @@ class BBoxLayer(BaseLayerClass, Shapes):
         if not self._is_free and len(index) == 1 and index[0] == (len(self.data) - 1):
             super().remove_selected()
             self._is_free = True
+            self.prompts.pop()
 
     def _rotate_box(self, angle, center=(0, 0)) -> None:
         """Disable rotation by overriding the rotation function."""
@@ -76,8 +76,10 @@ class LassoLayer(BaseLayerClass, Shapes):
 
         self._feature_table.remove(index)
         self.text.remove(index)
-        self._data_view._edge_color = np.delete(self._data_view._edge_color, index, axis=0)
-        self._data_view._face_color = np.delete(self._data_view._face_color, index, axis=0)
+        # The last shape is always the one removed, slicing avoids copying the color arrays
+        self._data_view._edge_color = self._data_view._edge_color[:-1]
+        self._data_view._face_color = self._data_view._face_color[:-1]
+        self.prompts.pop()
 
     def run(self) -> None:
         """
@@ -98,12 +100,18 @@ class LassoLayer(BaseLayerClass, Shapes):
             self,
             data,
             *args,
-            edge_color=self.colors[self.prompt_index],
-            face_color=self.colors[self.prompt_index],
+            edge_color=self.palette[self.prompt_index],
+            face_color=self.palette[self.prompt_index],
             **kwargs,
         )
 
     def remove_selected(self) -> None:
+        """Removes the selected shapes along with their prompts."""
+        if self.selected_data:
+            # Only the unfinished last shape can be selected, removing it frees the layer
+            self._is_free = True
+        for _ in range(len(self.selected_data)):
+            self.prompts.pop()
         super().remove_selected()
         # """Removes selected points if any."""
         # index = list(self.selected_data)
@@ -140,16 +148,16 @@ class LassoLayer(BaseLayerClass, Shapes):
 
         ind = self._data_view._z_order[::-1][0]
         polygon = self._data_view.shapes[ind]
-        dim_not_displayed = int(polygon.dims_not_displayed[0])
-        slice_id = int(self._data_view.slice_key[0])
+        dims_not_displayed = [int(d) for d in polygon.dims_not_displayed]
+        slice_ids = [int(s) for s in np.atleast_1d(self._data_view.slice_key)]
 
-        # Check if the shape has more than 2 dimensions (3D case)
+        # Check if the shape has more than 2 dimensions (3D case or time series)
         if polygon.data.shape[1] > 2:
-            polygon_2d = np.delete(polygon.data, dim_not_displayed, axis=1)
+            polygon_2d = np.delete(polygon.data, dims_not_displayed, axis=1)
         else:
             polygon_2d = polygon.data
 
-        slice_shape = np.delete(labels_shape, dim_not_displayed)
+        slice_shape = np.delete(labels_shape, dims_not_displayed)
 
         transformed_shape = napari.layers.shapes._shapes_models.polygon.Polygon(polygon_2d)
         mask_slice = transformed_shape.to_mask(slice_shape, zoom_factor=1, offset=(0, 0)).astype(
@@ -157,6 +165,9 @@ class LassoLayer(BaseLayerClass, Shapes):
         )
         mask = np.zeros(labels_shape, dtype=np.uint8)
 
-        mask[(slice(None),) * dim_not_displayed + (slice_id,)] = mask_slice
+        _index = [slice(None)] * len(labels_shape)
+        for dim, slice_id in zip(dims_not_displayed, slice_ids):
+            _index[dim] = slice_id
+        mask[tuple(_index)] = mask_slice
 
         return mask
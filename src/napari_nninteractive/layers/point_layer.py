@@ -1,6 +1,5 @@
 from typing import Any, List, Sequence
 
-import numpy as np
 from napari.layers import Points
 
 from napari_nninteractive.layers.abstract_layer import BaseLayerClass
@@ -13,17 +12,19 @@ class SinglePointLayer(BaseLayerClass, Points):
     colors for individual points in the layer.
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.point_colors = []
-
-    def remove_color(self) -> None:
+    def _set_last_color(self, _color: List[float]) -> None:
         """
-        Removes the color associated with the last point, updating the face and border colors.
+        Writes the color of the last point directly into the face and border color arrays, instead
+        of setting all colors again.
+
+        Args:
+            _color (List[float]): The RGBA color of the last point.
         """
-        self.point_colors = self.point_colors[:-1]
-        self.face_color = np.array(self.point_colors)
-        self.border_color = np.array(self.point_colors)
+        if len(self.data) == 0:
+            return
+        self._face.colors[-1] = _color
+        self._border.colors[-1] = _color
+        self.refresh()
 
     def replace_color(self, _color: List[float]) -> None:
         """
@@ -32,16 +33,14 @@ class SinglePointLayer(BaseLayerClass, Points):
         Args:
             _color (List[float]): The new RGBA color to apply to the last point.
         """
-        self.point_colors[-1] = _color
-        self.face_color = np.array(self.point_colors)
-        self.border_color = np.array(self.point_colors)
+        self._set_last_color(_color)
 
     def remove_last(self) -> None:
         """
-        Removes the last point from the layer along with its color.
+        Removes the last point from the layer, the colors are truncated along with the data.
         """
         self.data = self.data[:-1]
-        self.remove_color()
+        self.prompts.pop()
 
     def _add(self, data: Any, *arg, **kwargs) -> None:
         """
@@ -51,10 +50,7 @@ class SinglePointLayer(BaseLayerClass, Points):
             data (Any): The point data to add.
         """
         Points.add(self, data, *arg, **kwargs)
-        _color = self.colors[self.prompt_index]
-        self.point_colors.append(_color)
-        self.face_color = np.array(self.point_colors)
-        self.border_color = np.array(self.point_colors)
+        self._set_last_color(self.palette[self.prompt_index])
 
     def remove_selected(self) -> None:
         """Removes selected points if any."""
@@ -62,7 +58,7 @@ class SinglePointLayer(BaseLayerClass, Points):
         if not self._is_free and len(index) == 1 and index[0] == (len(self.data) - 1):
             super().remove_selected()
             self._is_free = True
-            self.remove_color()
+            self.prompts.pop()
 
     def _move(
         self,
@@ -0,0 +1,91 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class PromptStore:
+    """
+    A growable array store for the prompts of an interaction layer. Holds the position, the
+    polarity (include or exclude) and the palette index of the color of each prompt in
+    preallocated arrays, which double their capacity when full, so adding, recoloring and removing
+    prompts never rebuilds them.
+
+    Args:
+        capacity (int, optional): The number of prompts to preallocate space for.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._capacity = max(1, capacity)
+        self._size = 0
+        self._coordinates = None
+        self._include = np.zeros(self._capacity, dtype=bool)
+        self._color_index = np.zeros(self._capacity, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        """The positions of the prompts (a view)."""
+        if self._coordinates is None:
+            return np.zeros((0, 0), dtype=np.float64)
+        return self._coordinates[: self._size]
+
+    @property
+    def include(self) -> np.ndarray:
+        """True for positive, False for negative prompts (a view)."""
+        return self._include[: self._size]
+
+    @property
+    def color_index(self) -> np.ndarray:
+        """The palette index of the color of each prompt (a view)."""
+        return self._color_index[: self._size]
+
+    def _grow(self) -> None:
+        """Doubles the capacity of all arrays."""
+        self._capacity *= 2
+        self._include = np.resize(self._include, self._capacity)
+        self._color_index = np.resize(self._color_index, self._capacity)
+        self._coordinates = np.resize(
+            self._coordinates, (self._capacity, self._coordinates.shape[1])
+        )
+
+    def append(self, coordinates: Sequence[float], include: bool, color_index: int) -> int:
+        """
+        Adds a prompt.
+
+        Args:
+            coordinates (Sequence[float]): The position of the prompt.
+            include (bool): Whether the prompt is positive.
+            color_index (int): The palette index of the color of the prompt.
+
+        Returns:
+            int: The index of the prompt.
+        """
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1)
+        if self._coordinates is None:
+            self._coordinates = np.zeros((self._capacity, len(coordinates)), dtype=np.float64)
+        if self._size == self._capacity:
+            self._grow()
+        self._coordinates[self._size] = coordinates
+        self._include[self._size] = include
+        self._color_index[self._size] = color_index
+        self._size += 1
+        return self._size - 1
+
+    def update_last(self, include: Optional[bool] = None, color_index: Optional[int] = None):
+        """Changes the polarity and/or color of the last prompt in place."""
+        if self._size == 0:
+            return
+        if include is not None:
+            self._include[self._size - 1] = include
+        if color_index is not None:
+            self._color_index[self._size - 1] = color_index
+
+    def pop(self) -> None:
+        """Removes the last prompt."""
+        self._size = max(0, self._size - 1)
+
+    def clear(self) -> None:
+        """Removes all prompts, keeping the allocated space."""
+        self._size = 0
@@ -1,3 +1,5 @@
+from typing import Any, Optional, Tuple
+
 import numpy as np
 from napari.layers import Labels
 from napari.layers.base._base_constants import ActionType
@@ -23,6 +25,8 @@ class ScribbleLayer(BaseLayerClass, Labels):
 
         self._is_free = False
         self.mouse_drag_callbacks.append(self.on_draw)
+        # The bounding box of everything painted, [start, stop] per axis
+        self._painted = None
 
     def replace_color(self, _color) -> None:
         """
@@ -50,6 +54,23 @@ class ScribbleLayer(BaseLayerClass, Labels):
         self._is_free = True
         self.refresh()
 
+    def data_setitem(self, indices: Any, value: Any, refresh: bool = True) -> None:
+        """Paints into the layer and remembers the painted region."""
+        super().data_setitem(indices, value, refresh)
+        _indices = [np.asarray(i) for i in indices]
+        if len(_indices) != self.data.ndim or any(i.size == 0 for i in _indices):
+            return
+        region = [[int(i.min()), int(i.max()) + 1] for i in _indices]
+        if getattr(self, "_painted", None) is not None:
+            region = [[min(a[0], b[0]), max(a[1], b[1])] for a, b in zip(self._painted, region)]
+        self._painted = region
+
+    def painted_bbox(self) -> Optional[Tuple[slice, ...]]:
+        """Returns the bounding box of everything painted into the layer, None if nothing was."""
+        if self._painted is None:
+            return None
+        return tuple(slice(start, stop) for start, stop in self._painted)
+
     def remove_last(self) -> None:
         """
         Undoes the last action, reverting the most recent scribble interaction.
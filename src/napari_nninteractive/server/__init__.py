@@ -0,0 +1,4 @@
+from .client import RemoteSession, parse_address
+from .server import InferenceServer
+
+__all__ = ("InferenceServer", "RemoteSession", "parse_address")
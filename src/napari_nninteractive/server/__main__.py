@@ -0,0 +1,68 @@
+import argparse
+from pathlib import Path
+
+import torch
+from huggingface_hub import snapshot_download
+
+from napari_nninteractive.server.protocol import DEFAULT_HOST, DEFAULT_PORT
+from napari_nninteractive.server.server import InferenceServer
+from napari_nninteractive.utils.budget import set_prediction_budget
+from napari_nninteractive.utils.performance import apply_thread_settings, load_performance_settings
+from napari_nninteractive.utils.precision import CPU_PRECISIONS, set_cpu_precision
+from napari_nninteractive.utils.session import find_inference_class, initialize_session
+
+
+def main():
+    """Loads a model once and serves it to napari-nninteractive clients."""
+    parser = argparse.ArgumentParser(description="nnInteractive inference server")
+    parser.add_argument("--model", default="nnInteractive_v1.0", help="Model name or folder")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Use 0.0.0.0 to serve the network")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--device", default="cuda:0" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--precision", default=None, choices=CPU_PRECISIONS)
+    parser.add_argument("--max-patches", type=int, default=None)
+    parser.add_argument("--latency-target-ms", type=int, default=None)
+    args = parser.parse_args()
+
+    if Path(args.model).exists():
+        checkpoint_path = Path(args.model)
+    else:
+        download_path = snapshot_download(
+            repo_id="nnInteractive/nnInteractive", allow_patterns=[f"{args.model}/*"]
+        )
+        checkpoint_path = Path(download_path).joinpath(args.model)
+    print(f"Using Model {checkpoint_path.name} at : {checkpoint_path}")
+
+    # The performance settings of this machine are the defaults
+    settings = load_performance_settings()
+    apply_thread_settings(
+        settings["intra_op_threads"], settings["inter_op_threads"], settings["numa_node"]
+    )
+
+    device = torch.device(args.device)
+    session = find_inference_class(checkpoint_path)(
+        device=device,
+        use_torch_compile=False,
+        torch_n_threads=settings["intra_op_threads"],
+        verbose=False,
+        do_autozoom=True,
+    )
+    initialize_session(session, checkpoint_path)
+
+    if device.type == "cpu":
+        set_cpu_precision(session, args.precision or settings["cpu_precision"])
+    max_patches = settings["max_patches"] if args.max_patches is None else args.max_patches
+    latency = settings["latency_target_ms"]
+    latency = latency if args.latency_target_ms is None else args.latency_target_ms
+    set_prediction_budget(session, max_patches, latency / 1000)
+
+    server = InferenceServer(session, args.host, args.port, model_name=checkpoint_path.name)
+    print(f"Serving {checkpoint_path.name} at {server.address[0]}:{server.address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
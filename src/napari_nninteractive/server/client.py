@@ -0,0 +1,145 @@
+import socket
+import threading
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from napari_nninteractive.server.protocol import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    crop_nonzero,
+    paste,
+    recv_message,
+    send_message,
+)
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Parses 'host:port' (or only 'host'), using the default port if none is given."""
+    host, _, port = address.strip().rpartition(":")
+    if not host:
+        return port or DEFAULT_HOST, DEFAULT_PORT
+    return host, int(port)
+
+
+class RemoteSession:
+    """
+    An inference session running in an `InferenceServer`. It offers the parts of the nnInteractive
+    inference session used by the widget, predictions are written into the local target buffer.
+
+    The network is not available in this process, so it can not be wrapped or benchmarked.
+
+    Args:
+        host (str, optional): The address of the server.
+        port (int, optional): The port of the server.
+    """
+
+    network = None
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self._socket = socket.create_connection((host, port))
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Requests are sent from the main thread and from background workers
+        self._lock = threading.Lock()
+        self.target_buffer = None
+
+        info = self._request({"command": "hello"})
+        self.model = info["model"]
+        self.preferred_scribble_thickness = info["preferred_scribble_thickness"]
+        self.patch_size = info["patch_size"]
+
+    def _request(
+        self, header: Dict[str, Any], arrays: Optional[Dict[str, np.ndarray]] = None
+    ) -> Dict[str, Any]:
+        """Sends a command and writes the changed region of the reply into the target buffer."""
+        with self._lock:
+            send_message(self._socket, header, arrays)
+            reply, reply_arrays = recv_message(self._socket)
+        if reply["status"] != "ok":
+            raise RuntimeError(f"Inference server: {reply['message']}")
+        if "dirty" in reply_arrays and self.target_buffer is not None:
+            paste(self.target_buffer, reply["offset"], reply_arrays["dirty"])
+        return reply
+
+    def close(self) -> None:
+        """Closes the connection, the server releases the session."""
+        self._socket.close()
+
+    def set_image(self, image: np.ndarray, image_properties: Dict[str, Any]) -> None:
+        self._request(
+            {"command": "set_image", "spacing": [float(s) for s in image_properties["spacing"]]},
+            {"image": np.asarray(image)},
+        )
+
+    def set_target_buffer(self, target_buffer: np.ndarray) -> None:
+        self.target_buffer = target_buffer
+        self._request(
+            {
+                "command": "set_target_buffer",
+                "shape": list(target_buffer.shape),
+                "dtype": target_buffer.dtype.str,
+            }
+        )
+
+    def set_do_autozoom(self, do_autozoom: bool) -> None:
+        self._request({"command": "set_do_autozoom", "do_autozoom": bool(do_autozoom)})
+
+    def reset_interactions(self) -> None:
+        self._request({"command": "reset_interactions"})
+        # The server only knows the predictions it made itself
+        if self.target_buffer is not None:
+            self.target_buffer.fill(0)
+
+    def add_point_interaction(
+        self, coordinates: Sequence[float], include_interaction: bool, run_prediction: bool = True
+    ) -> None:
+        self._request(
+            {
+                "command": "point",
+                "coordinates": [float(c) for c in coordinates],
+                "include": bool(include_interaction),
+                "run_prediction": bool(run_prediction),
+            }
+        )
+
+    def add_bbox_interaction(
+        self, bbox: Sequence[Sequence[float]], include_interaction: bool, run_prediction=True
+    ) -> None:
+        self._request(
+            {
+                "command": "bbox",
+                "bbox": [[float(c) for c in axis] for axis in bbox],
+                "include": bool(include_interaction),
+                "run_prediction": bool(run_prediction),
+            }
+        )
+
+    def _add_mask(self, command: str, mask: np.ndarray, **kwargs) -> None:
+        """Sends only the bounding box crop of a mask."""
+        offset, crop = crop_nonzero(np.asarray(mask).astype(np.uint8, copy=False))
+        self._request({"command": command, "offset": offset, **kwargs}, {"mask": crop})
+
+    def add_scribble_interaction(
+        self, scribble: np.ndarray, include_interaction: bool, run_prediction: bool = True
+    ) -> None:
+        self._add_mask(
+            "scribble",
+            scribble,
+            include=bool(include_interaction),
+            run_prediction=bool(run_prediction),
+        )
+
+    def add_lasso_interaction(
+        self, lasso: np.ndarray, include_interaction: bool, run_prediction: bool = True
+    ) -> None:
+        self._add_mask(
+            "lasso", lasso, include=bool(include_interaction), run_prediction=bool(run_prediction)
+        )
+
+    def add_initial_seg_interaction(
+        self, initial_seg: np.ndarray, run_prediction: bool = False
+    ) -> None:
+        self._add_mask("initial_seg", initial_seg, run_prediction=bool(run_prediction))
+
+    def _predict(self) -> None:
+        self._request({"command": "predict"})
@@ -0,0 +1,269 @@
+import multiprocessing
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import torch
+
+from napari_nninteractive.server.client import RemoteSession
+from napari_nninteractive.server.protocol import run_interaction
+from napari_nninteractive.utils.budget import set_prediction_budget, start_prediction_budget
+from napari_nninteractive.utils.compile import configure_compile_cache
+from napari_nninteractive.utils.performance import apply_thread_settings
+from napari_nninteractive.utils.precision import set_cpu_precision
+from napari_nninteractive.utils.session import find_inference_class, initialize_session
+from napari_nninteractive.utils.shared import (
+    DirtyTrackingArray,
+    attach_shared,
+    locate_shared,
+    shared_zeros,
+)
+
+
+class InferenceProcessError(RuntimeError):
+    """Raised when the inference process failed or exited."""
+
+
+def _describe(array: np.ndarray) -> Dict[str, Any]:
+    """Describes where an array lives in shared memory."""
+    name, offset = locate_shared(array)
+    return {"name": name, "offset": offset, "shape": list(array.shape), "dtype": array.dtype.str}
+
+
+def _configure(session: Any, settings: Dict[str, Any]) -> None:
+    """Applies the precision and the auto-zoom budget to the session."""
+    if "cpu_precision" in settings and session.device.type == "cpu":
+        set_cpu_precision(session, settings["cpu_precision"])
+    if "max_patches" in settings:
+        set_prediction_budget(
+            session, settings["max_patches"], settings["latency_target_ms"] / 1000
+        )
+
+
+def run_session_process(connection: Any, checkpoint_path: str, device: str, settings: Dict):
+    """
+    Entry point of the inference process. Loads the model and executes the commands of the widget
+    until the connection is closed. The image and the target buffer are mapped from shared memory.
+
+    Args:
+        connection (Any): The pipe to the widget.
+        checkpoint_path (str): The model folder.
+        device (str): The device to run the model on.
+        settings (Dict): The thread, precision, budget, compile and auto-zoom settings.
+    """
+    apply_thread_settings(
+        settings["intra_op_threads"], settings["inter_op_threads"], settings["numa_node"]
+    )
+    if settings["compile"]:
+        configure_compile_cache()
+    session = find_inference_class(checkpoint_path)(
+        device=torch.device(device),
+        use_torch_compile=settings["compile"],
+        torch_n_threads=settings["intra_op_threads"],
+        verbose=False,
+        do_autozoom=settings["do_autozoom"],
+    )
+    initialize_session(session, checkpoint_path)
+    _configure(session, settings)
+
+    # Shared memory blocks have to stay open while their arrays are used
+    blocks = {}
+    image = target = None
+    while True:
+        try:
+            header, arrays = connection.recv()
+        except EOFError:
+            break
+        command = header["command"]
+        if command == "close":
+            break
+
+        try:
+            reply = {}
+            start_prediction_budget(session)
+            if command == "hello":
+                reply = {
+                    "model": str(checkpoint_path),
+                    "preferred_scribble_thickness": [
+                        float(t) for t in session.preferred_scribble_thickness
+                    ],
+                    "patch_size": [int(p) for p in session.configuration_manager.patch_size],
+                }
+            elif command == "set_image":
+                image = None
+                blocks["image"], image = attach_shared(**header["image"])
+                session.set_image(image, {"spacing": header["spacing"]})
+            elif command == "set_target_buffer":
+                target = None
+                blocks["target"], _target = attach_shared(**header["target"])
+                target = _target.view(DirtyTrackingArray)
+                session.set_target_buffer(target)
+            elif command == "configure":
+                _configure(session, header["settings"])
+            else:
+                target.dirty = None
+                if not run_interaction(session, command, header, arrays, target.shape):
+                    raise ValueError(f"Unknown command {command}")
+                # Writes which bypass the tracking (e.g. through torch) mark everything as dirty
+                reply["dirty"] = target.dirty or [[0, int(s)] for s in target.shape]
+            connection.send(("ok", reply))
+        except Exception as e:
+            connection.send(("error", {"message": f"{type(e).__name__}: {str(e)}"}))
+
+
+class ProcessSession(RemoteSession):
+    """
+    An inference session running in a child process, so inference neither competes with napari
+    for the GIL nor takes it down when it crashes.
+
+    The image and the target buffer live in shared memory, only commands, prompts (masks cropped to
+    their bounding box) and the regions changed by a prediction are sent through a pipe. Target
+    buffers allocated with `shared_zeros` are written directly, others are mirrored.
+
+    Predictions run asynchronously: commands which run a prediction return directly and `poll`
+    collects the changed regions afterwards. All other commands wait for the running predictions.
+
+    Args:
+        checkpoint_path (str): The model folder.
+        device (torch.device): The device to run the model on.
+        settings (Dict): The thread, precision, budget, compile and auto-zoom settings.
+    """
+
+    def __init__(self, checkpoint_path: str, device: torch.device, settings: Dict[str, Any]):
+        _context = multiprocessing.get_context("spawn")
+        self._connection, _child = _context.Pipe()
+        self._process = _context.Process(
+            target=run_session_process,
+            args=(_child, str(checkpoint_path), str(device), settings),
+            name="nnInteractive inference",
+            daemon=True,
+        )
+        self._process.start()
+        _child.close()
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._errors: List[str] = []
+        self._dirty: List[Tuple[slice, ...]] = []
+        self._image = None
+        self._mirror = None
+        self.target_buffer = None
+
+        info = self._request({"command": "hello"})
+        self.model = info["model"]
+        self.preferred_scribble_thickness = info["preferred_scribble_thickness"]
+        self.patch_size = info["patch_size"]
+
+    def is_alive(self) -> bool:
+        """Checks if the inference process is still running."""
+        return self._process.is_alive()
+
+    def _check_alive(self) -> None:
+        if not self._process.is_alive():
+            raise InferenceProcessError(
+                f"The inference process exited unexpectedly (exit code {self._process.exitcode})"
+            )
+
+    def _request(
+        self, header: Dict[str, Any], arrays: Optional[Dict[str, np.ndarray]] = None
+    ) -> Dict[str, Any]:
+        """Sends a command, waits for its reply unless it runs a prediction."""
+        with self._lock:
+            self._check_alive()
+            self._connection.send((header, arrays or {}))
+            self._pending += 1
+            if header.get("run_prediction") or header["command"] == "predict":
+                return {}
+            reply = self._drain(block=True)
+            self._raise_errors()
+        return reply
+
+    def _drain(self, block: bool) -> Dict[str, Any]:
+        """Receives the replies of sent commands, returns the last one."""
+        reply = {}
+        while self._pending > 0:
+            if not self._connection.poll(0.1 if block else 0):
+                if not block:
+                    break
+                self._check_alive()
+                continue
+            status, reply = self._connection.recv()
+            self._pending -= 1
+            if status == "error":
+                self._errors.append(reply["message"])
+            elif "dirty" in reply:
+                self._on_dirty(tuple(slice(start, stop) for start, stop in reply["dirty"]))
+        return reply
+
+    def _on_dirty(self, region: Tuple[slice, ...]) -> None:
+        """Copies the changed region of a mirrored target buffer and remembers the region."""
+        if self._mirror is not None:
+            self.target_buffer[region] = self._mirror[region]
+        self._dirty.append(region)
+
+    def _raise_errors(self) -> None:
+        if self._errors:
+            _errors, self._errors = self._errors, []
+            raise InferenceProcessError("\n".join(_errors))
+
+    def poll(self) -> List[Tuple[slice, ...]]:
+        """
+        Collects finished predictions without blocking.
+
+        Returns:
+            List[Tuple[slice, ...]]: The regions of the target buffer changed since the last poll.
+        """
+        if not self._lock.acquire(blocking=False):
+            return []
+        try:
+            if self._pending > 0:
+                self._check_alive()
+            self._drain(block=False)
+            dirty, self._dirty = self._dirty, []
+            self._raise_errors()
+        finally:
+            self._lock.release()
+        return dirty
+
+    def wait(self) -> None:
+        """Waits until all running predictions are finished."""
+        with self._lock:
+            self._drain(block=True)
+            self._raise_errors()
+
+    def close(self) -> None:
+        """Stops the inference process."""
+        if self._process.is_alive():
+            try:
+                self._connection.send(({"command": "close"}, {}))
+            except OSError:
+                pass
+            self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._connection.close()
+
+    def configure(self, **settings: Union[str, int]) -> None:
+        """Changes the precision or the auto-zoom budget of the session."""
+        self._request({"command": "configure", "settings": settings})
+
+    def set_image(self, image: np.ndarray, image_properties: Dict[str, Any]) -> None:
+        # The image is copied into shared memory once, the process maps it from there
+        self._image = shared_zeros(image.shape, image.dtype)
+        self._image[...] = image
+        self._request(
+            {
+                "command": "set_image",
+                "image": _describe(self._image),
+                "spacing": [float(s) for s in image_properties["spacing"]],
+            }
+        )
+
+    def set_target_buffer(self, target_buffer: np.ndarray) -> None:
+        self.target_buffer = target_buffer
+        self._mirror = None
+        if locate_shared(target_buffer) is None:
+            self._mirror = shared_zeros(target_buffer.shape, target_buffer.dtype)
+            self._mirror[...] = target_buffer
+        _shared = self._mirror if self._mirror is not None else target_buffer
+        self._request({"command": "set_target_buffer", "target": _describe(_shared)})
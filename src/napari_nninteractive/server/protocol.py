@@ -0,0 +1,148 @@
+import json
+import socket
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5757
+
+# Each message is a length prefixed json header followed by the raw bytes of its arrays
+_HEADER_SIZE = struct.Struct("!Q")
+
+
+def send_message(
+    sock: socket.socket, header: Dict[str, Any], arrays: Optional[Dict[str, np.ndarray]] = None
+) -> None:
+    """
+    Sends a message. Arrays are sent as raw bytes directly from their memory, the header lists
+    their names, dtypes and shapes.
+
+    Args:
+        sock (socket.socket): The connected socket.
+        header (Dict[str, Any]): The json serializable message.
+        arrays (Optional[Dict[str, np.ndarray]]): Arrays sent along with the message.
+    """
+    arrays = {name: np.ascontiguousarray(a) for name, a in (arrays or {}).items()}
+    header = dict(
+        header,
+        arrays=[
+            {"name": name, "dtype": a.dtype.str, "shape": list(a.shape)} for name, a in arrays.items()
+        ],
+    )
+    _json = json.dumps(header).encode("utf-8")
+    sock.sendall(_HEADER_SIZE.pack(len(_json)) + _json)
+    for a in arrays.values():
+        if a.nbytes > 0:
+            sock.sendall(a.reshape(-1).view(np.uint8))
+
+
+def _recv_into(sock: socket.socket, buffer: memoryview) -> None:
+    """Fills the buffer from the socket."""
+    received = 0
+    while received < len(buffer):
+        n = sock.recv_into(buffer[received:])
+        if n == 0:
+            raise ConnectionError("Connection closed")
+        received += n
+
+
+def recv_message(sock: socket.socket) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Receives a message sent by `send_message`. Arrays are received directly into their memory.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, np.ndarray]]: The header and the arrays.
+    """
+    _size = bytearray(_HEADER_SIZE.size)
+    _recv_into(sock, memoryview(_size))
+    _json = bytearray(_HEADER_SIZE.unpack(_size)[0])
+    _recv_into(sock, memoryview(_json))
+    header = json.loads(_json.decode("utf-8"))
+
+    arrays = {}
+    for spec in header.pop("arrays", []):
+        a = np.empty(spec["shape"], dtype=np.dtype(spec["dtype"]))
+        if a.nbytes > 0:
+            _recv_into(sock, memoryview(a.reshape(-1).view(np.uint8)))
+        arrays[spec["name"]] = a
+    return header, arrays
+
+
+def bounding_box(mask: np.ndarray) -> Optional[Tuple[slice, ...]]:
+    """Returns the slices of the bounding box of all nonzero values, None if there are none."""
+    slices = []
+    for axis in range(mask.ndim):
+        _any = np.any(mask, axis=tuple(a for a in range(mask.ndim) if a != axis))
+        _nonzero = np.flatnonzero(_any)
+        if len(_nonzero) == 0:
+            return None
+        slices.append(slice(int(_nonzero[0]), int(_nonzero[-1]) + 1))
+    return tuple(slices)
+
+
+def crop_nonzero(mask: np.ndarray) -> Tuple[List[int], np.ndarray]:
+    """
+    Crops a sparse mask (e.g. a scribble) to its bounding box, so only the crop is sent.
+
+    Returns:
+        Tuple[List[int], np.ndarray]: The offset of the crop and the crop.
+    """
+    bbox = bounding_box(mask)
+    if bbox is None:
+        return [0] * mask.ndim, np.zeros((0,) * mask.ndim, dtype=mask.dtype)
+    return [sl.start for sl in bbox], mask[bbox]
+
+
+def paste(target: np.ndarray, offset: List[int], crop: np.ndarray) -> None:
+    """Writes a crop into the target at the given offset."""
+    if crop.size > 0:
+        target[tuple(slice(o, o + s) for o, s in zip(offset, crop.shape))] = crop
+
+
+def run_interaction(
+    session: Any,
+    command: str,
+    header: Dict[str, Any],
+    arrays: Dict[str, np.ndarray],
+    shape: Sequence[int],
+) -> bool:
+    """
+    Runs an interaction command on an inference session. Masks are sent as bounding box crops and
+    are pasted into a full size mask first.
+
+    Args:
+        session (Any): The inference session.
+        command (str): The command.
+        header (Dict[str, Any]): The arguments of the command.
+        arrays (Dict[str, np.ndarray]): The arrays of the command.
+        shape (Sequence[int]): The shape of the target buffer.
+
+    Returns:
+        bool: False if the command is no interaction command.
+    """
+    if command == "point":
+        session.add_point_interaction(
+            header["coordinates"], header["include"], header["run_prediction"]
+        )
+    elif command == "bbox":
+        session.add_bbox_interaction(header["bbox"], header["include"], header["run_prediction"])
+    elif command in ("scribble", "lasso", "initial_seg"):
+        mask = np.zeros(shape, dtype=np.uint8)
+        paste(mask, header["offset"], arrays["mask"])
+        if command == "scribble":
+            session.add_scribble_interaction(mask, header["include"], header["run_prediction"])
+        elif command == "lasso":
+            session.add_lasso_interaction(mask, header["include"], header["run_prediction"])
+        else:
+            session.add_initial_seg_interaction(mask, run_prediction=header["run_prediction"])
+    elif command == "reset_interactions":
+        session.reset_interactions()
+    elif command == "predict":
+        session._predict()
+    elif command == "set_do_autozoom":
+        session.set_do_autozoom(header["do_autozoom"])
+    else:
+        return False
+    return True
@@ -0,0 +1,190 @@
+import socket
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from napari_nninteractive.server.protocol import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    recv_message,
+    run_interaction,
+    send_message,
+)
+from napari_nninteractive.utils.budget import start_prediction_budget
+from napari_nninteractive.utils.session import clone_session
+from napari_nninteractive.utils.shared import DirtyTrackingArray
+
+
+class _Client:
+    """The connection, the inference session and the queued requests of one client."""
+
+    def __init__(self, client_id: int, connection: socket.socket, session: Any):
+        self.id = client_id
+        self.connection = connection
+        self.session = session
+        self.requests = deque()
+        self.closed = False
+        # The target buffer of the session, it records the regions written since the last reply
+        self.target = None
+
+
+class InferenceServer:
+    """
+    Serves one loaded model to several napari clients over TCP.
+
+    Every client gets its own inference session (image, interactions, queued predictions and target
+    buffer), all of them share the network of `session`. Requests are executed one at a time and
+    the clients take turns, so a client with many queued requests does not starve the others. The
+    target buffers record where they are written, after each request only this region is sent
+    back.
+
+    Args:
+        session (Any): An initialized inference session holding the model.
+        host (str, optional): The address to listen on, localhost by default.
+        port (int, optional): The port to listen on, 0 to pick a free one.
+        model_name (str, optional): The name of the model reported to the clients.
+    """
+
+    def __init__(
+        self,
+        session: Any,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        model_name: str = "",
+    ):
+        self.session = session
+        self.model_name = model_name
+        self._socket = socket.create_server((host, port))
+        self.address = self._socket.getsockname()[:2]
+        self._clients: List[_Client] = []
+        self._condition = threading.Condition()
+        self._next_id = 0
+        self._turn = 0
+        self._running = False
+
+    def serve_forever(self) -> None:
+        """Accepts clients in the background and executes their requests until shutdown."""
+        self._running = True
+        threading.Thread(target=self._accept, daemon=True).start()
+        while self._running:
+            client, request = self._next_request()
+            if client is not None:
+                self._handle(client, *request)
+
+    def shutdown(self) -> None:
+        """Stops serving and closes all connections."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._socket.close()
+        for client in self._clients:
+            client.connection.close()
+
+    def _accept(self) -> None:
+        """Accepts new clients, each one gets a session sharing the loaded network."""
+        while self._running:
+            try:
+                connection, address = self._socket.accept()
+            except OSError:
+                break
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._condition:
+                client = _Client(self._next_id, connection, clone_session(self.session))
+                self._next_id += 1
+                self._clients.append(client)
+            print(f"Client {client.id} connected from {address[0]}:{address[1]}")
+            threading.Thread(target=self._read, args=(client,), daemon=True).start()
+
+    def _read(self, client: _Client) -> None:
+        """Queues the requests of a client until it disconnects."""
+        try:
+            while True:
+                request = recv_message(client.connection)
+                with self._condition:
+                    client.requests.append(request)
+                    self._condition.notify()
+        except (ConnectionError, OSError):
+            pass
+        with self._condition:
+            client.closed = True
+            self._condition.notify()
+        print(f"Client {client.id} disconnected")
+
+    def _next_request(self) -> Tuple[Optional[_Client], Any]:
+        """Waits for the next request, taking the clients in turns."""
+        with self._condition:
+            while self._running:
+                # Sessions of disconnected clients are released
+                self._clients = [c for c in self._clients if not c.closed]
+                for i in range(len(self._clients)):
+                    client = self._clients[(self._turn + i) % len(self._clients)]
+                    if client.requests:
+                        self._turn = (self._turn + i + 1) % len(self._clients)
+                        return client, client.requests.popleft()
+                self._condition.wait()
+        return None, None
+
+    def _handle(self, client: _Client, header: Dict[str, Any], arrays: Dict[str, np.ndarray]):
+        """Executes a request and replies with the changed region of the target buffer."""
+        reply_arrays = {}
+        if client.target is not None:
+            client.target.dirty = None
+        try:
+            reply = self._execute(client, header, arrays)
+            reply["status"] = "ok"
+            _dirty = self._dirty_region(client)
+            if _dirty is not None:
+                reply["offset"], reply_arrays["dirty"] = _dirty
+        except Exception as e:
+            reply = {"status": "error", "message": f"{type(e).__name__}: {str(e)}"}
+
+        try:
+            send_message(client.connection, reply, reply_arrays)
+        except OSError:
+            client.closed = True
+
+    def _execute(
+        self, client: _Client, header: Dict[str, Any], arrays: Dict[str, np.ndarray]
+    ) -> Dict[str, Any]:
+        """Runs a single command on the session of a client."""
+        command = header["command"]
+        session = client.session
+        start_prediction_budget(session)
+
+        if command == "hello":
+            return {
+                "model": self.model_name,
+                "preferred_scribble_thickness": [
+                    float(t) for t in session.preferred_scribble_thickness
+                ],
+                "patch_size": [int(p) for p in session.configuration_manager.patch_size],
+            }
+        elif command == "set_image":
+            session.set_image(arrays["image"], {"spacing": header["spacing"]})
+            self._set_target(client, arrays["image"].shape[1:], np.uint8)
+        elif command == "set_target_buffer":
+            self._set_target(client, header["shape"], np.dtype(header["dtype"]))
+        elif command == "reset_interactions":
+            session.reset_interactions()
+            if client.target is not None:
+                # The client clears its buffer itself
+                client.target.dirty = None
+        elif not run_interaction(session, command, header, arrays, client.target.shape):
+            raise ValueError(f"Unknown command {command}")
+        return {}
+
+    def _set_target(self, client: _Client, shape: Tuple[int, ...], dtype: np.dtype) -> None:
+        """Creates a new target buffer for the session of a client."""
+        client.target = np.zeros(shape, dtype=dtype).view(DirtyTrackingArray)
+        client.session.set_target_buffer(client.target)
+        client.target.dirty = None
+
+    def _dirty_region(self, client: _Client) -> Optional[Tuple[List[int], np.ndarray]]:
+        """Returns the offset and content of the region written since the last reply."""
+        if client.target is None or client.target.dirty is None:
+            return None
+        bbox = tuple(slice(start, stop) for start, stop in client.target.dirty)
+        client.target.dirty = None
+        return [sl.start for sl in bbox], np.asarray(client.target[bbox])
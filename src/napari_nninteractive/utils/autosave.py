@@ -0,0 +1,346 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from napari_nninteractive.server.protocol import crop_nonzero
+from napari_nninteractive.utils.chunks import (
+    chunk_fingerprint,
+    chunk_grid,
+    chunk_slices,
+    normalize_chunks,
+)
+
+AUTOSAVE_ROOT = Path.home().joinpath(".nninteractive", "autosave")
+
+
+def autosave_root(image_name: str) -> Path:
+    """Returns the folder holding all autosaved sessions of an image."""
+    return AUTOSAVE_ROOT.joinpath(re.sub(r"[^\w.-]+", "_", image_name))
+
+
+def latest_session_dir(image_name: str, exclude: Optional[Path] = None) -> Optional[Path]:
+    """
+    Returns the most recent autosaved session of an image, ignoring `exclude` (the running session).
+    """
+    _root = autosave_root(image_name)
+    if not _root.is_dir():
+        return None
+    _dirs = sorted(
+        d
+        for d in _root.iterdir()
+        if d.is_dir() and d.joinpath("session.json").is_file() and d != exclude
+    )
+    return _dirs[-1] if _dirs else None
+
+
+def cleanup_sessions(image_name: str, keep: int = 3) -> None:
+    """Removes all but the `keep` most recent autosaved sessions of an image."""
+    _root = autosave_root(image_name)
+    if not _root.is_dir():
+        return
+    _dirs = sorted(d for d in _root.iterdir() if d.is_dir())
+    for _dir in _dirs[:-keep] if keep > 0 else _dirs:
+        shutil.rmtree(_dir, ignore_errors=True)
+
+
+def pack_mask(mask: np.ndarray) -> Tuple[List[List[int]], np.ndarray]:
+    """
+    Encodes a sparse mask (e.g. a scribble) compactly as its bounding box and the bit packed crop.
+
+    Returns:
+        Tuple[List[List[int]], np.ndarray]: The bounding box ([start, stop] per axis) and the crop
+            packed into uint8 with `np.packbits`.
+    """
+    offset, crop = crop_nonzero(mask)
+    bbox = [[o, o + s] for o, s in zip(offset, crop.shape)]
+    return bbox, np.packbits(crop.astype(bool))
+
+
+def unpack_mask(
+    bbox: Sequence[Sequence[int]], packed: np.ndarray, shape: Sequence[int]
+) -> np.ndarray:
+    """Decodes a mask encoded by `pack_mask` into a uint8 mask of the given shape."""
+    mask = np.zeros(shape, dtype=np.uint8)
+    _crop_shape = [stop - start for start, stop in bbox]
+    _crop = np.unpackbits(packed, count=int(np.prod(_crop_shape))).reshape(_crop_shape)
+    mask[tuple(slice(start, stop) for start, stop in bbox)] = _crop
+    return mask
+
+
+def merge_regions(
+    a: Optional[Sequence[Sequence[int]]], b: Optional[Sequence[Sequence[int]]]
+) -> Optional[List[List[int]]]:
+    """Returns the bounding box of two regions given as [start, stop] per axis, None is empty."""
+    if a is None or b is None:
+        _region = a if b is None else b
+        return None if _region is None else [list(r) for r in _region]
+    return [[min(r[0], q[0]), max(r[1], q[1])] for r, q in zip(a, b)]
+
+
+def painted_region(event: Any, ndim: int) -> Optional[List[List[int]]]:
+    """
+    Returns the region ([start, stop] per axis) changed by a paint event of a Labels layer, whose
+    value lists the painted (indices, old values, new value) atoms. None if it is not known.
+    """
+    region = None
+    try:
+        for atom in getattr(event, "value", None) or []:
+            _indices = [np.asarray(i) for i in atom[0]]
+            if len(_indices) != ndim:
+                return None
+            if any(i.size == 0 for i in _indices):
+                continue
+            region = merge_regions(region, [[int(i.min()), int(i.max()) + 1] for i in _indices])
+    except (TypeError, IndexError):
+        return None
+    return region
+
+
+class DirtyRegion:
+    """
+    Collects the regions written into an array as their bounding box. Regions can be recorded from
+    any thread, e.g. by the listener of a `DirtyTrackingArray` the session writes into.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._region: Optional[List[List[int]]] = None
+
+    def mark(self, region: Sequence[Sequence[int]]) -> None:
+        """Records a written region, given as [start, stop] per axis."""
+        with self._lock:
+            self._region = merge_regions(self._region, region)
+
+    def pop(self) -> Optional[List[List[int]]]:
+        """Returns the bounding box of all regions recorded since the last call, None if none."""
+        with self._lock:
+            region, self._region = self._region, None
+        return region
+
+
+class ChunkedArrayWriter:
+    """
+    Mirrors an in-memory array into a memory-mapped .npy file. Each chunk is fingerprinted and only
+    chunks whose content changed since the last write are copied to disk. If the caller knows the
+    written region, only the chunks inside it are fingerprinted.
+
+    Args:
+        path (Path): The .npy file to write to.
+        shape (Sequence[int]): The shape of the array.
+        dtype (Any): The dtype of the array.
+        chunks (Sequence[int], optional): The chunk size used for dirty tracking.
+    """
+
+    def __init__(
+        self, path: Path, shape: Sequence[int], dtype: Any, chunks: Sequence[int] = (64, 64, 64)
+    ):
+        self.path = Path(path)
+        self.shape = tuple(int(s) for s in shape)
+        self.dtype = np.dtype(dtype)
+        self.chunks = normalize_chunks(self.shape, chunks)
+        self.grid = chunk_grid(self.shape, self.chunks)
+        self.slices = chunk_slices(self.shape, self.chunks)
+        self._memmap = None
+
+        # A new file is zero-initialized, so empty chunks never have to be written
+        _zero_fp = {}
+        self.fingerprints = np.zeros(len(self.slices), dtype=np.int64)
+        for i, sl in enumerate(self.slices):
+            _shape = tuple(s.stop - s.start for s in sl)
+            if _shape not in _zero_fp:
+                _zero_fp[_shape] = chunk_fingerprint(np.zeros(_shape, dtype=self.dtype))
+            self.fingerprints[i] = _zero_fp[_shape]
+
+    def chunk_ids(self, region: Optional[Sequence[Sequence[int]]] = None) -> Sequence[int]:
+        """Returns the ids of all chunks overlapping a region ([start, stop] per axis), or all."""
+        if region is None:
+            return range(len(self.slices))
+        _ranges = [
+            range(max(start, 0) // c, min(-(-stop // c), g))
+            for (start, stop), c, g in zip(region, self.chunks, self.grid)
+        ]
+        return [int(np.ravel_multi_index(i, self.grid)) for i in product(*_ranges)]
+
+    def write(self, data: np.ndarray, region: Optional[Sequence[Sequence[int]]] = None) -> int:
+        """
+        Writes all chunks of `data` which changed since the last call.
+
+        Args:
+            data (np.ndarray): The array to save.
+            region (Optional[Sequence[Sequence[int]]], optional): The region ([start, stop] per
+                axis) holding all changes since the last call, everything is compared if None.
+
+        Returns:
+            int: The number of chunks written.
+        """
+        if self._memmap is None:
+            self._memmap = open_memmap(self.path, mode="w+", dtype=self.dtype, shape=self.shape)
+
+        written = 0
+        for i in self.chunk_ids(region):
+            sl = self.slices[i]
+            # Copy the chunk first, the array might be modified while we are saving
+            block = np.array(data[sl], dtype=self.dtype)
+            _fp = chunk_fingerprint(block)
+            if _fp != self.fingerprints[i]:
+                self._memmap[sl] = block
+                self.fingerprints[i] = _fp
+                written += 1
+        if written:
+            self._memmap.flush()
+        return written
+
+    def close(self) -> None:
+        """Releases the memory map."""
+        if self._memmap is not None:
+            self._memmap.flush()
+            self._memmap = None
+
+
+class SessionAutosaver:
+    """
+    Incrementally saves the arrays and the state of an annotation session to disk.
+
+    Every session gets its own timestamped folder below `autosave_root(image_name)`, so starting a
+    new session never overwrites the state of a crashed one. Saving can run in a background thread,
+    at most one save is in flight at any time.
+
+    Args:
+        image_name (str): The name of the image layer the session belongs to.
+        chunks (Sequence[int], optional): The chunk size used for dirty tracking.
+    """
+
+    def __init__(self, image_name: str, chunks: Sequence[int] = (64, 64, 64)):
+        self.directory = autosave_root(image_name).joinpath(
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        )
+        self.chunks = chunks
+        self._writers: Dict[str, ChunkedArrayWriter] = {}
+        self._files = set()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._future: Optional[Future] = None
+        self._state_json = None
+
+    def save(
+        self,
+        arrays: Dict[str, np.ndarray],
+        state: Dict[str, Any],
+        regions: Optional[Dict[str, Sequence[Sequence[int]]]] = None,
+        files: Optional[Dict[str, np.ndarray]] = None,
+    ) -> int:
+        """
+        Saves the changed chunks of all given arrays and the session state.
+
+        Args:
+            arrays (Dict[str, np.ndarray]): The arrays to save, keyed by file name (without suffix).
+            state (Dict[str, Any]): A json serializable description of the session.
+            regions (Optional[Dict[str, Sequence[Sequence[int]]]], optional): The region of each
+                array ([start, stop] per axis) which changed since it was saved last, or which is
+                not zero for a new array. Arrays without a region are compared completely.
+            files (Optional[Dict[str, np.ndarray]], optional): Small arrays which never change,
+                e.g. packed prompt masks. Each one is written once into its own .npy file.
+
+        Returns:
+            int: The number of chunks written.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        regions = regions or {}
+        written = 0
+        for key, data in arrays.items():
+            writer = self._writers.get(key)
+            if writer is None or writer.shape != data.shape or writer.dtype != data.dtype:
+                if writer is not None:
+                    writer.close()
+                writer = ChunkedArrayWriter(
+                    self.directory.joinpath(f"{key}.npy"), data.shape, data.dtype, self.chunks
+                )
+                self._writers[key] = writer
+            written += writer.write(data, regions.get(key))
+
+        for key, data in (files or {}).items():
+            if key not in self._files:
+                np.save(self.directory.joinpath(f"{key}.npy"), data)
+                self._files.add(key)
+
+        _state_json = json.dumps(
+            dict(state, arrays=sorted(self._writers), files=sorted(self._files)), indent=2
+        )
+        if _state_json != self._state_json:
+            # Write to a temporary file first so a crash never leaves a truncated state behind
+            _tmp = self.directory.joinpath("session.json.tmp")
+            _tmp.write_text(_state_json)
+            _tmp.replace(self.directory.joinpath("session.json"))
+            self._state_json = _state_json
+        return written
+
+    def save_async(
+        self,
+        arrays: Dict[str, np.ndarray],
+        state: Dict[str, Any],
+        regions: Optional[Dict[str, Sequence[Sequence[int]]]] = None,
+        files: Optional[Dict[str, np.ndarray]] = None,
+    ) -> bool:
+        """
+        Saves in a background thread. Returns False if the previous save is still running and
+        re-raises the error of the previous save if it failed.
+        """
+        if self.is_busy():
+            return False
+        if self._future is not None:
+            _future, self._future = self._future, None
+            _future.result()
+        self._future = self._executor.submit(self.save, arrays, state, regions, files)
+        return True
+
+    def is_busy(self) -> bool:
+        """Checks if a background save is currently running."""
+        return self._future is not None and not self._future.done()
+
+    def wait(self) -> None:
+        """Blocks until the running background save (if any) is finished."""
+        if self._future is not None:
+            self._future.result()
+
+    def close(self) -> None:
+        """Waits for pending saves and releases all files."""
+        self.wait()
+        for writer in self._writers.values():
+            writer.close()
+        self._executor.shutdown(wait=True)
+
+
+def load_session(directory: Path) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Loads an autosaved session. The arrays are memory-mapped copy-on-write, so nothing is read from
+    disk before it is actually needed and edits never modify the saved files. The small files
+    (e.g. packed prompt masks) are read right away.
+
+    Args:
+        directory (Path): The session folder.
+
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, np.ndarray]]: The session state and the arrays.
+    """
+    directory = Path(directory)
+    state = json.loads(directory.joinpath("session.json").read_text())
+    arrays = {}
+    for key in state.get("arrays", []):
+        _file = directory.joinpath(f"{key}.npy")
+        if _file.is_file():
+            arrays[key] = np.load(_file, mmap_mode="c")
+    for key in state.get("files", []):
+        _file = directory.joinpath(f"{key}.npy")
+        if _file.is_file():
+            arrays[key] = np.load(_file)
+    return state, arrays
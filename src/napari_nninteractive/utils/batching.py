@@ -0,0 +1,48 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# Default of the largest zoom out factor used to predict several batched prompts with one patch
+MAX_BATCH_ZOOM_OUT_FACTOR = 4
+
+
+def group_interaction_centers(
+    centers: Sequence[Sequence[float]],
+    zoom_factors: Sequence[float],
+    patch_size: Sequence[int],
+    max_zoom_out_factor: float,
+) -> Tuple[List[List[int]], List[float]]:
+    """
+    Greedily merges the prediction centers of several interactions into as few patches as possible.
+
+    Each group is predicted at the center of the bounding box of its members. The zoom out factor
+    of a group is the largest requested one, increased if needed so that the (zoomed) patch covers
+    all members with at least a quarter patch of context. Centers are only merged if the resulting
+    zoom out factor does not exceed `max_zoom_out_factor`.
+
+    Args:
+        centers (Sequence[Sequence[float]]): The prediction center of each interaction.
+        zoom_factors (Sequence[float]): The requested zoom out factor of each interaction.
+        patch_size (Sequence[int]): The patch size of the network.
+        max_zoom_out_factor (float): The largest zoom out factor a merged group may have.
+
+    Returns:
+        Tuple[List[List[int]], List[float]]: The centers and zoom out factors of all groups.
+    """
+    patch_size = np.asarray(patch_size, dtype=float)
+    groups = []  # [min corner, max corner, zoom out factor]
+    for center, zoom in zip(centers, zoom_factors):
+        center = np.asarray(center, dtype=float)
+        for group in groups:
+            _min = np.minimum(group[0], center)
+            _max = np.maximum(group[1], center)
+            _zoom = max(group[2], zoom, np.max((_max - _min + patch_size / 2) / patch_size))
+            if _zoom <= max_zoom_out_factor:
+                group[:] = [_min, _max, float(_zoom)]
+                break
+        else:
+            groups.append([center, center, float(zoom)])
+
+    _centers = [np.round((_min + _max) / 2).astype(int).tolist() for _min, _max, _ in groups]
+    _zoom_factors = [_zoom for _, _, _zoom in groups]
+    return _centers, _zoom_factors
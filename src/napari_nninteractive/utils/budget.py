@@ -0,0 +1,96 @@
+import time
+from typing import Any
+
+import torch
+
+from napari_nninteractive.utils.network import NetworkWrapper, find_wrapper, set_wrapper
+
+
+class BudgetedNetwork(NetworkWrapper):
+    """
+    Bounds the runtime of a single (auto-zoom) prediction by limiting the number of forward passes.
+
+    Once the budget is used up, the remaining passes of the prediction are answered without running
+    the network: the output reproduces the previous segmentation which is part of the network input.
+    The inference session then finishes its auto-zoom and refinement loop as usual, but each
+    remaining pass costs almost nothing and the prediction keeps everything computed so far.
+
+    Args:
+        network (torch.nn.Module): The network to wrap.
+        max_patches (int, optional): Maximum forward passes per prediction, 0 for no limit.
+        latency_target (float, optional): Target runtime per prediction in seconds, 0 for no limit.
+            No further pass is started if it is expected to end after the target.
+        previous_seg_channel (int, optional): The input channel holding the previous segmentation.
+            nnInteractive puts the image in channel 0 followed by the interaction channels, the
+            first of which is the previous segmentation.
+    """
+
+    def __init__(
+        self,
+        network: torch.nn.Module,
+        max_patches: int = 0,
+        latency_target: float = 0.0,
+        previous_seg_channel: int = 1,
+    ):
+        super().__init__(network)
+        self.max_patches = max_patches
+        self.latency_target = latency_target
+        self.previous_seg_channel = previous_seg_channel
+        self.start()
+
+    def start(self) -> None:
+        """Starts the budget of a new prediction."""
+        self.passes = 0
+        self.skipped = 0
+        self._start = time.perf_counter()
+
+    def is_exhausted(self) -> bool:
+        """Checks if another forward pass would exceed the budget. The first pass is always run."""
+        if self.passes == 0:
+            return False
+        if self.max_patches > 0 and self.passes >= self.max_patches:
+            return True
+        if self.latency_target > 0:
+            _elapsed = time.perf_counter() - self._start
+            return _elapsed + _elapsed / self.passes > self.latency_target
+        return False
+
+    def forward(self, x: torch.Tensor) -> Any:
+        if self.is_exhausted():
+            self.skipped += 1
+            return previous_segmentation_logits(x, self.previous_seg_channel)
+        self.passes += 1
+        return self.network(x)
+
+
+def previous_segmentation_logits(x: torch.Tensor, previous_seg_channel: int = 1) -> torch.Tensor:
+    """Answers a forward pass without the network, reproducing the previous segmentation."""
+    _previous = x[:, previous_seg_channel : previous_seg_channel + 1] > 0.5
+    return torch.cat((~_previous, _previous), dim=1).float()
+
+
+def set_prediction_budget(session: Any, max_patches: int, latency_target: float) -> None:
+    """
+    Limits the forward passes per prediction of a session, removes the limit if both values are 0.
+
+    Args:
+        session (Any): The inference session.
+        max_patches (int): Maximum forward passes per prediction, 0 for no limit.
+        latency_target (float): Target runtime per prediction in seconds, 0 for no limit.
+    """
+    if max_patches > 0 or latency_target > 0:
+        set_wrapper(
+            session,
+            BudgetedNetwork,
+            lambda n: BudgetedNetwork(n, max_patches=max_patches, latency_target=latency_target),
+        )
+    else:
+        set_wrapper(session, BudgetedNetwork, None)
+
+
+def start_prediction_budget(session: Any) -> Any:
+    """Resets the budget before a new prediction, returns the budget (None if unbounded)."""
+    budget = find_wrapper(session.network, BudgetedNetwork)
+    if budget is not None:
+        budget.start()
+    return budget
@@ -0,0 +1,82 @@
+import threading
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from napari_nninteractive.server.protocol import bounding_box
+
+
+class BufferPool:
+    """
+    Recycles session sized buffers (e.g. scribble masks) instead of allocating a new volume for
+    every object. Returned buffers are cleared only where they were written, so a recycled buffer
+    costs a pass over its dirty region instead of the whole volume. Fresh buffers are allocated
+    zeroed, which the OS does lazily.
+
+    A buffer handed out by `acquire` belongs to the caller, e.g. the working object keeps its buffer
+    as layer data once it is finished. Only buffers given back with `release` are reused. Buffers
+    can be acquired and released from any thread, e.g. by a worker predicting several objects.
+
+    Args:
+        shape (Sequence[int]): The shape of the buffers.
+        dtype (np.dtype, optional): The dtype of the buffers.
+        allocate (Callable, optional): Allocates a zeroed buffer from shape and dtype, e.g.
+            `shared_zeros` if the buffers are shared with an inference process.
+        capacity (int, optional): The largest number of buffers kept for reuse.
+    """
+
+    def __init__(
+        self,
+        shape: Sequence[int],
+        dtype: np.dtype = np.uint8,
+        allocate: Callable = np.zeros,
+        capacity: int = 2,
+    ):
+        self.shape = tuple(int(s) for s in shape)
+        self.dtype = np.dtype(dtype)
+        self._allocate = allocate
+        self.capacity = capacity
+        self._free: List[np.ndarray] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def acquire(self) -> np.ndarray:
+        """Returns a zeroed buffer, a recycled one if there is one."""
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+        return self._allocate(self.shape, dtype=self.dtype)
+
+    def release(
+        self, buffer: np.ndarray, dirty: Optional[Tuple[slice, ...]] = None, known: bool = False
+    ) -> None:
+        """
+        Gives back a buffer which is not used anymore.
+
+        Args:
+            buffer (np.ndarray): The buffer, buffers of another shape or dtype are dropped.
+            dirty (Optional[Tuple[slice, ...]], optional): The region which was written.
+            known (bool, optional): If `dirty` is known, None then means nothing was written.
+                Otherwise the written region is searched.
+        """
+        if (
+            len(self) >= self.capacity
+            or buffer.shape != self.shape
+            or buffer.dtype != self.dtype
+            or not buffer.flags.writeable
+        ):
+            return
+        if not known:
+            dirty = bounding_box(buffer)
+        if dirty is not None:
+            buffer[dirty] = 0
+        with self._lock:
+            if len(self._free) < self.capacity:
+                self._free.append(buffer)
+
+    def clear(self) -> None:
+        """Drops all buffers kept for reuse."""
+        with self._lock:
+            self._free = []
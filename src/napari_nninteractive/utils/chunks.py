@@ -0,0 +1,61 @@
+import zlib
+from itertools import product
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+def normalize_chunks(shape: Sequence[int], chunks: Sequence[int]) -> Tuple[int, ...]:
+    """
+    Clips the chunk size to the array shape and pads missing (leading) dimensions with full extent.
+
+    Args:
+        shape (Sequence[int]): The shape of the array.
+        chunks (Sequence[int]): The requested chunk size, aligned to the trailing dimensions.
+    """
+    chunks = tuple(int(c) for c in chunks)[-len(shape) :]
+    chunks = (None,) * (len(shape) - len(chunks)) + chunks
+    return tuple(int(s) if c is None else max(1, min(int(s), c)) for s, c in zip(shape, chunks))
+
+
+def chunk_grid(shape: Sequence[int], chunks: Sequence[int]) -> Tuple[int, ...]:
+    """Returns the number of chunks along each dimension."""
+    chunks = normalize_chunks(shape, chunks)
+    return tuple(-(-int(s) // c) for s, c in zip(shape, chunks))
+
+
+def chunk_slices(shape: Sequence[int], chunks: Sequence[int]) -> List[Tuple[slice, ...]]:
+    """
+    Returns the slices of all chunks of an array in C-order.
+
+    Args:
+        shape (Sequence[int]): The shape of the array.
+        chunks (Sequence[int]): The chunk size.
+    """
+    chunks = normalize_chunks(shape, chunks)
+    ranges = [range(0, int(s), c) for s, c in zip(shape, chunks)]
+    return [
+        tuple(slice(start, min(start + c, int(s))) for start, c, s in zip(starts, chunks, shape))
+        for starts in product(*ranges)
+    ]
+
+
+def chunk_fingerprint(block: np.ndarray) -> int:
+    """Computes a cheap content fingerprint (crc32) of a single block."""
+    return zlib.crc32(np.ascontiguousarray(block).view(np.uint8).ravel())
+
+
+def chunk_fingerprints(data: np.ndarray, chunks: Sequence[int]) -> np.ndarray:
+    """
+    Computes a content fingerprint for every chunk of an array.
+
+    Args:
+        data (np.ndarray): The array to fingerprint.
+        chunks (Sequence[int]): The chunk size.
+
+    Returns:
+        np.ndarray: One uint32 fingerprint per chunk, in the order of `chunk_slices`.
+    """
+    return np.array(
+        [chunk_fingerprint(data[sl]) for sl in chunk_slices(data.shape, chunks)], dtype=np.uint32
+    )
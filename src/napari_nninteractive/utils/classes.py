@@ -0,0 +1,80 @@
+import csv
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+from scipy.ndimage import find_objects
+
+
+def split_classes(label_map: np.ndarray) -> List[Tuple[int, Tuple[slice, ...]]]:
+    """
+    Finds all classes of a label map and their bounding boxes in a single pass.
+
+    Args:
+        label_map (np.ndarray): The label map, 0 is background.
+
+    Returns:
+        List[Tuple[int, Tuple[slice, ...]]]: The class id and bounding box of each class.
+    """
+    label_map = np.asarray(label_map)
+    if not np.issubdtype(label_map.dtype, np.integer):
+        label_map = label_map.astype(np.int64)
+    return [
+        (class_id, bbox)
+        for class_id, bbox in enumerate(find_objects(label_map), start=1)
+        if bbox is not None
+    ]
+
+
+def class_mask(label_map: np.ndarray, class_id: int, bbox: Tuple[slice, ...]) -> np.ndarray:
+    """
+    Extracts the full size binary mask of a class, only the bounding box of the class is compared.
+
+    Args:
+        label_map (np.ndarray): The label map.
+        class_id (int): The class to extract.
+        bbox (Tuple[slice, ...]): The bounding box of the class.
+    """
+    mask = np.zeros(label_map.shape, dtype=np.uint8)
+    mask[bbox] = label_map[bbox] == class_id
+    return mask
+
+
+def load_class_table(path: Union[str, Path]) -> Dict[int, str]:
+    """
+    Reads the names of the classes of a label map. Supported are the dataset.json of nnU-Net
+    ({"labels": {"liver": 1, ...}}), json files mapping ids to names ({"1": "liver", ...}) and
+    csv/tsv files with id,name rows.
+
+    Args:
+        path (Union[str, Path]): The class table.
+
+    Returns:
+        Dict[int, str]: The name of each class id.
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path) as f:
+            table = json.load(f)
+        table = table.get("labels", table)
+        names = {}
+        for key, value in table.items():
+            # nnU-Net maps names to ids (regions are lists of ids and are skipped)
+            if isinstance(value, int):
+                names[value] = key
+            elif str(key).isdigit():
+                names[int(key)] = str(value)
+        return names
+
+    with open(path, newline="") as f:
+        try:
+            dialect = csv.Sniffer().sniff(f.read(4096), delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        f.seek(0)
+        return {
+            int(row[0]): row[1].strip()
+            for row in csv.reader(f, dialect)
+            if len(row) >= 2 and row[0].strip().isdigit()
+        }
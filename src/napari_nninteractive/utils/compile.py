@@ -0,0 +1,67 @@
+import os
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Sequence
+
+import torch
+
+COMPILE_CACHE_ROOT = Path.home().joinpath(".nninteractive", "compile_cache")
+
+
+def configure_compile_cache() -> Path:
+    """
+    Enables the persistent inductor caches, so compiled kernels survive a restart of napari.
+    The cache is kept per torch version. Already configured cache folders are respected.
+
+    Returns:
+        Path: The cache folder.
+    """
+    _default = COMPILE_CACHE_ROOT.joinpath(torch.__version__.replace("+", "_"))
+    cache_dir = Path(os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(_default)))
+    os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+    os.environ.setdefault("TORCHINDUCTOR_AUTOGRAD_CACHE", "1")
+
+    # The environment is only read when inductor is imported, update the config if it already is
+    if "torch._inductor.config" in sys.modules:
+        _config = sys.modules["torch._inductor.config"]
+        _config.fx_graph_cache = True
+        if hasattr(_config, "autograd_cache"):
+            _config.autograd_cache = True
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def first_conv_in_channels(network: torch.nn.Module) -> int:
+    """Returns the number of input channels the network expects."""
+    for module in network.modules():
+        if isinstance(module, torch.nn.modules.conv._ConvNd):
+            return module.in_channels
+    raise ValueError("Network has no convolution to infer the number of input channels from")
+
+
+@torch.inference_mode()
+def warmup_network(
+    network: torch.nn.Module, patch_size: Sequence[int], device: torch.device, repeats: int = 2
+) -> None:
+    """
+    Runs the network on a dummy patch to trigger compilation before the first real interaction.
+    Uses the same input shape and autocast setting as the inference session, otherwise the
+    compiled graph would not be reused.
+
+    Args:
+        network (torch.nn.Module): The (compiled) network.
+        patch_size (Sequence[int]): The patch size used for inference.
+        device (torch.device): The device of the network.
+        repeats (int, optional): The number of warm-up passes.
+    """
+    dummy = torch.zeros(
+        (1, first_conv_in_channels(network), *[int(p) for p in patch_size]), device=device
+    )
+    _autocast = torch.autocast(device.type) if device.type == "cuda" else nullcontext()
+    with _autocast:
+        for _ in range(repeats):
+            network(dummy)
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
@@ -0,0 +1,279 @@
+import json
+import os
+import threading
+import urllib.request
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+CHECKPOINT_REPO = "nnInteractive/nnInteractive"
+CHECKPOINT_ROOT = Path.home().joinpath(".nninteractive", "checkpoints")
+# Written into a checkpoint folder once all of its files are complete
+COMPLETE_MARKER = ".complete.json"
+
+_CHUNK_SIZE = 2**20
+# Files are split into chunks which hf_transfer downloads in parallel
+_HF_TRANSFER_CHUNK_SIZE = 10 * 2**20
+_HF_TRANSFER_MIN_SIZE = 64 * 2**20
+
+
+class DownloadCancelled(Exception):
+    """Raised in the download thread when the download was cancelled."""
+
+
+class RemoteFile:
+    """
+    A file of a checkpoint.
+
+    Args:
+        path (str): The path of the file relative to the checkpoint folder.
+        url (str): The download url.
+        size (Optional[int], optional): The file size in bytes if it is known.
+    """
+
+    def __init__(self, path: str, url: str, size: Optional[int] = None):
+        self.path = path
+        self.url = url
+        self.size = size
+
+
+def checkpoint_dir(model_name: str, repo_id: str = CHECKPOINT_REPO) -> Path:
+    """Returns the folder a checkpoint is downloaded to."""
+    return CHECKPOINT_ROOT.joinpath(*repo_id.split("/"), model_name)
+
+
+def cached_checkpoint(model_name: str, repo_id: str = CHECKPOINT_REPO) -> Optional[Path]:
+    """
+    Looks for a completely downloaded checkpoint without accessing the network, either in the
+    checkpoint folder of the plugin or in the huggingface cache of earlier versions.
+
+    Returns:
+        Optional[Path]: The checkpoint folder, None if the checkpoint has to be downloaded.
+    """
+    _dir = checkpoint_dir(model_name, repo_id)
+    if _dir.joinpath(COMPLETE_MARKER).exists():
+        return _dir
+
+    from huggingface_hub import snapshot_download
+
+    try:
+        _snapshot = snapshot_download(
+            repo_id=repo_id, allow_patterns=[f"{model_name}/*"], local_files_only=True
+        )
+    except Exception:
+        # Nothing is cached (the exception type depends on the huggingface_hub version)
+        return None
+    _dir = Path(_snapshot).joinpath(model_name)
+    return _dir if _dir.is_dir() and any(_dir.iterdir()) else None
+
+
+def list_checkpoint_files(
+    model_name: str, repo_id: str = CHECKPOINT_REPO, endpoint: Optional[str] = None
+) -> List[RemoteFile]:
+    """Lists the files of a checkpoint on the huggingface hub, including their sizes."""
+    from huggingface_hub import HfApi, hf_hub_url
+
+    api = HfApi(endpoint=endpoint)
+    files = []
+    for entry in api.list_repo_tree(repo_id, path_in_repo=model_name, recursive=True):
+        # Folders have no size
+        if getattr(entry, "size", None) is None:
+            continue
+        files.append(
+            RemoteFile(
+                os.path.relpath(entry.path, model_name),
+                hf_hub_url(repo_id, entry.path, endpoint=endpoint),
+                entry.size,
+            )
+        )
+    return files
+
+
+def _hf_transfer() -> Optional[Callable]:
+    """Returns the parallel downloader of hf_transfer, None if it is not installed."""
+    try:
+        from hf_transfer import download
+    except ImportError:
+        return None
+    return download
+
+
+class CheckpointDownloader:
+    """
+    Downloads the files of a checkpoint, meant to run in a background thread while the GUI polls
+    the progress.
+
+    Every file is downloaded into a .incomplete file first and only moved to its final name once
+    it is complete. A cancelled or failed download continues where it stopped with an http range
+    request. Large files are downloaded with hf_transfer in parallel chunks if it is installed and
+    nothing was downloaded yet (its partial files can not be resumed).
+
+    Args:
+        files (List[RemoteFile]): The files of the checkpoint.
+        target_dir (Union[str, Path]): The checkpoint folder.
+        headers (Optional[Dict[str, str]], optional): Http headers, e.g. for authentication.
+        use_hf_transfer (bool, optional): Use hf_transfer if it is installed.
+        threads (int, optional): The number of parallel connections of hf_transfer.
+    """
+
+    def __init__(
+        self,
+        files: List[RemoteFile],
+        target_dir: Union[str, Path],
+        headers: Optional[Dict[str, str]] = None,
+        use_hf_transfer: bool = True,
+        threads: int = 8,
+    ):
+        self.files = files
+        self.target_dir = Path(target_dir)
+        self.headers = dict(headers or {})
+        self.threads = threads
+        self._hf_transfer = _hf_transfer() if use_hf_transfer else None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        # Bytes downloaded per file, files which were (partially) downloaded before count as well
+        self._done = {f.path: self._existing_bytes(f) for f in files}
+        self._current = None
+
+    @property
+    def total(self) -> int:
+        """The size of all files in bytes (files of unknown size count as empty)."""
+        return sum(f.size or 0 for f in self.files)
+
+    def progress(self) -> Tuple[Optional[str], int, int, int, int]:
+        """
+        Returns the current file, its downloaded bytes and size and the downloaded bytes and size
+        of the whole checkpoint. Safe to call from any thread.
+        """
+        with self._lock:
+            _current = self._current
+            _done = dict(self._done)
+        _file_done, _file_size = 0, 0
+        if _current is not None:
+            _file_done, _file_size = _done[_current.path], _current.size or 0
+        return (
+            None if _current is None else _current.path,
+            _file_done,
+            _file_size,
+            sum(_done.values()),
+            self.total,
+        )
+
+    def cancel(self) -> None:
+        """Stops the download after the current chunk, the downloaded part is kept for resuming."""
+        self._cancel.set()
+
+    def _final_path(self, file: RemoteFile) -> Path:
+        return self.target_dir.joinpath(file.path)
+
+    def _partial_path(self, file: RemoteFile) -> Path:
+        _path = self._final_path(file)
+        return _path.with_name(_path.name + ".incomplete")
+
+    def _existing_bytes(self, file: RemoteFile) -> int:
+        """Returns how much of a file was downloaded by an earlier attempt."""
+        _final = self._final_path(file)
+        if _final.exists():
+            return _final.stat().st_size
+        _partial = self._partial_path(file)
+        return _partial.stat().st_size if _partial.exists() else 0
+
+    def _add_bytes(self, file: RemoteFile, n: int) -> None:
+        with self._lock:
+            self._done[file.path] += n
+
+    def _set_bytes(self, file: RemoteFile, n: int) -> None:
+        with self._lock:
+            self._done[file.path] = n
+
+    def run(self) -> Path:
+        """
+        Downloads all missing files.
+
+        Returns:
+            Path: The checkpoint folder.
+
+        Raises:
+            DownloadCancelled: If the download was cancelled.
+        """
+        for file in self.files:
+            if self._cancel.is_set():
+                raise DownloadCancelled()
+            with self._lock:
+                self._current = file
+            _final = self._final_path(file)
+            if _final.exists() and (file.size is None or _final.stat().st_size == file.size):
+                continue
+            _final.parent.mkdir(parents=True, exist_ok=True)
+            self._download(file)
+        with self._lock:
+            self._current = None
+
+        with open(self.target_dir.joinpath(COMPLETE_MARKER), "w") as f:
+            json.dump({"files": {file.path: file.size for file in self.files}}, f)
+        return self.target_dir
+
+    def _download(self, file: RemoteFile) -> None:
+        """Downloads a single file, continuing a partial download if there is one."""
+        _partial = self._partial_path(file)
+        _offset = _partial.stat().st_size if _partial.exists() else 0
+
+        if (
+            self._hf_transfer is not None
+            and _offset == 0
+            and (file.size or 0) >= _HF_TRANSFER_MIN_SIZE
+        ):
+            self._download_parallel(file, _partial)
+        else:
+            self._download_stream(file, _partial, _offset)
+
+        if file.size is not None and _partial.stat().st_size != file.size:
+            raise OSError(
+                f"Download of {file.path} is incomplete: "
+                f"{_partial.stat().st_size} of {file.size} bytes"
+            )
+        os.replace(_partial, self._final_path(file))
+
+    def _download_stream(self, file: RemoteFile, partial: Path, offset: int) -> None:
+        """Streams a file chunk by chunk, starting at an offset."""
+        if file.size is not None and 0 < offset == file.size:
+            return
+        _headers = dict(self.headers)
+        if offset > 0:
+            _headers["Range"] = f"bytes={offset}-"
+        request = urllib.request.Request(file.url, headers=_headers)
+        with urllib.request.urlopen(request) as response:
+            if offset > 0 and response.status != 206:
+                # The server ignored the range, the file is downloaded from the start
+                offset = 0
+            self._set_bytes(file, offset)
+            with open(partial, "ab" if offset > 0 else "wb") as f:
+                while True:
+                    if self._cancel.is_set():
+                        raise DownloadCancelled()
+                    chunk = response.read(_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    self._add_bytes(file, len(chunk))
+
+    def _download_parallel(self, file: RemoteFile, partial: Path) -> None:
+        """Downloads a file in parallel chunks with hf_transfer. It can not be cancelled midway."""
+        # hf_transfer does not follow redirects (the hub redirects to a CDN), resolve them first
+        request = urllib.request.Request(file.url, headers=self.headers, method="HEAD")
+        with urllib.request.urlopen(request) as response:
+            _url = response.geturl()
+
+        self._set_bytes(file, 0)
+        try:
+            self._hf_transfer(
+                url=_url,
+                filename=str(partial),
+                max_files=self.threads,
+                chunk_size=_HF_TRANSFER_CHUNK_SIZE,
+                headers=self.headers,
+                callback=lambda n: self._add_bytes(file, n),
+            )
+        except Exception:
+            # The chunks are written out of order, a partial file can not be resumed
+            partial.unlink(missing_ok=True)
+            raise
@@ -0,0 +1,75 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+
+MANIFEST_NAME = "export_manifest.json"
+
+
+class ExportManifest:
+    """
+    Remembers what the last exports wrote into an output folder, so unchanged objects are skipped
+    and chunked files are only updated where they changed.
+
+    Every exported file is recorded with a signature (format, shape, chunks, offset, ...) and the
+    fingerprints of its chunks. A file has to be written completely if it is missing or its
+    signature changed, otherwise the fingerprints tell which chunks changed.
+
+    Args:
+        directory (Union[str, Path]): The output folder.
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.path = self.directory.joinpath(MANIFEST_NAME)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    self.files = json.load(f)["files"]
+            except (OSError, ValueError, KeyError):
+                # A broken manifest only means that everything is written again
+                self.files = {}
+
+    def changed_chunks(
+        self, file_name: str, signature: Dict[str, Any], fingerprints: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """
+        Compares an object with the state it was exported in.
+
+        Args:
+            file_name (str): The name of the exported file.
+            signature (Dict[str, Any]): Json serializable settings the file was written with.
+            fingerprints (np.ndarray): The chunk fingerprints of the object.
+
+        Returns:
+            Optional[np.ndarray]: None if the file has to be written completely, otherwise which
+            chunks changed (none if the file is up to date).
+        """
+        entry = self.files.get(file_name)
+        if entry is None or not self.directory.joinpath(file_name).exists():
+            return None
+        # A json round trip makes the signatures comparable (e.g. tuples become lists)
+        if entry["signature"] != json.loads(json.dumps(signature)):
+            return None
+        _fingerprints = np.asarray(entry["fingerprints"], dtype=np.uint32)
+        if _fingerprints.shape != fingerprints.shape:
+            return None
+        return _fingerprints != fingerprints
+
+    def update(
+        self, file_name: str, signature: Dict[str, Any], fingerprints: np.ndarray, **info: Any
+    ) -> None:
+        """Records a written file, additional info (e.g. the object name) is stored along."""
+        self.files[file_name] = dict(
+            info, signature=signature, fingerprints=[int(f) for f in fingerprints]
+        )
+
+    def save(self) -> None:
+        """Writes the manifest, replacing the previous one at once."""
+        _tmp = self.path.with_suffix(".tmp")
+        with open(_tmp, "w") as f:
+            json.dump({"version": 1, "files": self.files}, f)
+        os.replace(_tmp, self.path)
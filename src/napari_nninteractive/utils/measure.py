@@ -0,0 +1,182 @@
+import csv
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy.ndimage import find_objects
+
+from napari_nninteractive.utils.pyramid import label_data
+
+MEASUREMENT_COLUMNS = ("index", "name", "voxels", "volume", "centroid", "bbox_start", "bbox_stop")
+
+# Voxels of the label image reduced at once when measuring objects
+_MEASURE_SLAB_VOXELS = 2**24
+
+# The measurements of an empty object
+_EMPTY = {"voxels": 0, "volume": 0.0, "centroid": None, "bbox_start": None, "bbox_stop": None}
+
+
+def measure_mask(
+    mask: np.ndarray, spacing: Sequence[float], bbox: Optional[Tuple[slice, ...]] = None
+) -> Dict[str, Any]:
+    """
+    Measures a binary object: voxel count, physical volume, bounding box and centroid. Only the
+    bounding box is read, the centroid is computed from the marginal sums of two reductions.
+
+    Args:
+        mask (np.ndarray): The mask of the object.
+        spacing (Sequence[float]): The physical size of a voxel along each spatial axis, leading
+            axes without spacing (e.g. time) do not count towards the volume.
+        bbox (Optional[Tuple[slice, ...]], optional): The bounding box if it is known already.
+
+    Returns:
+        Dict[str, Any]: The measurements, positions are given in voxels.
+    """
+    spacing = np.asarray(spacing, dtype=np.float64)[-mask.ndim :]
+    if bbox is None:
+        bbox = tuple(slice(0, s) for s in mask.shape)
+    crop = np.asarray(mask[bbox]) != 0
+
+    if crop.ndim > 1:
+        # Sum over the last axis once, the other marginals follow from the (smaller) result
+        _plane = crop.sum(axis=-1, dtype=np.int64)
+        marginals = [
+            _plane.sum(axis=tuple(a for a in range(crop.ndim - 1) if a != axis))
+            for axis in range(crop.ndim - 1)
+        ]
+        marginals.append(crop.sum(axis=tuple(range(crop.ndim - 1)), dtype=np.int64))
+    else:
+        marginals = [crop.astype(np.int64)]
+    voxels = int(marginals[0].sum())
+
+    if voxels == 0:
+        return dict(_EMPTY)
+    # Shrink the bounding box to the object, e.g. if it was grown by a margin
+    start, stop, centroid = [], [], []
+    for sl, marginal in zip(bbox, marginals):
+        _nonzero = np.flatnonzero(marginal)
+        start.append(int(sl.start + _nonzero[0]))
+        stop.append(int(sl.start + _nonzero[-1] + 1))
+        centroid.append(float(sl.start + np.dot(np.arange(len(marginal)), marginal) / voxels))
+    return {
+        "voxels": voxels,
+        "volume": float(voxels * np.prod(spacing)),
+        "centroid": centroid,
+        "bbox_start": start,
+        "bbox_stop": stop,
+    }
+
+
+def measure_objects(records: List[Any], spacing: Sequence[float]) -> List[Dict[str, Any]]:
+    """
+    Measures objects of the object registry in a single pass. The objects are painted into one
+    label image covering their cached bounding boxes, from which the voxel counts and centroids of
+    all objects are reduced with `np.bincount` and the bounding boxes with `find_objects`. Objects
+    overlapping an object painted before are measured on their own with `measure_mask`.
+
+    Args:
+        records (List[Any]): The object records.
+        spacing (Sequence[float]): The physical size of a voxel along each spatial axis, leading
+            axes without spacing (e.g. time) do not count towards the volume.
+
+    Returns:
+        List[Dict[str, Any]]: The measurements of each object, see `MEASUREMENT_COLUMNS`.
+    """
+    _bboxes = [record.bbox for record in records]
+    _present = [bbox for bbox in _bboxes if bbox is not None]
+    if not _present:
+        return [dict(index=r.index, name=r.name, **_EMPTY) for r in records]
+
+    # The label image only covers the union of all bounding boxes
+    _offset = np.min([[sl.start for sl in bbox] for bbox in _present], axis=0)
+    _stop = np.max([[sl.stop for sl in bbox] for bbox in _present], axis=0)
+    labels = np.zeros(_stop - _offset, dtype=np.min_scalar_type(len(records)))
+    _separate = {}
+    for label, (record, bbox) in enumerate(zip(records, _bboxes), start=1):
+        if bbox is None:
+            continue
+        _mask = np.asarray(label_data(record.layer)[bbox]) != 0
+        _target = labels[tuple(slice(sl.start - o, sl.stop - o) for sl, o in zip(bbox, _offset))]
+        if np.any(_target[_mask]):
+            _separate[label] = measure_mask(label_data(record.layer), spacing, bbox)
+        else:
+            _target[_mask] = label
+
+    counts, sums = _label_sums(labels, len(records) + 1)
+    _objects = find_objects(labels, max_label=len(records))
+    _voxel_volume = float(np.prod(np.asarray(spacing, dtype=np.float64)[-labels.ndim :]))
+
+    measurements = []
+    for label, record in enumerate(records, start=1):
+        if label in _separate:
+            _measurement = _separate[label]
+        elif counts[label] == 0:
+            _measurement = dict(_EMPTY)
+        else:
+            _measurement = {
+                "voxels": int(counts[label]),
+                "volume": float(counts[label] * _voxel_volume),
+                "centroid": [float(o + c) for o, c in zip(_offset, sums[:, label] / counts[label])],
+                "bbox_start": [int(o + sl.start) for o, sl in zip(_offset, _objects[label - 1])],
+                "bbox_stop": [int(o + sl.stop) for o, sl in zip(_offset, _objects[label - 1])],
+            }
+        measurements.append(dict(index=record.index, name=record.name, **_measurement))
+    return measurements
+
+
+def _label_sums(labels: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Counts the voxels of each label and sums their coordinates along each axis. The label image is
+    reduced in slabs along the first axis, so the coordinate weights never cover all of it.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The voxel count (n,) and coordinate sums (ndim, n) per label.
+    """
+    counts = np.zeros(n, dtype=np.int64)
+    sums = np.zeros((labels.ndim, n), dtype=np.float64)
+    _plane = int(np.prod(labels.shape[1:], dtype=np.int64))
+    _step = max(1, _MEASURE_SLAB_VOXELS // max(_plane, 1))
+    for start in range(0, labels.shape[0], _step):
+        slab = labels[start : start + _step]
+        _flat = slab.ravel()
+        counts += np.bincount(_flat, minlength=n)
+        for axis in range(labels.ndim):
+            _shape = [1] * slab.ndim
+            _shape[axis] = slab.shape[axis]
+            _coords = np.arange(slab.shape[axis], dtype=np.float64).reshape(_shape)
+            if axis == 0:
+                _coords = _coords + start
+            sums[axis] += np.bincount(
+                _flat, weights=np.broadcast_to(_coords, slab.shape).ravel(), minlength=n
+            )
+    return counts, sums
+
+
+def write_measurements(
+    measurements: List[Dict[str, Any]], directory: Union[str, Path], spacing: Sequence[float]
+) -> None:
+    """
+    Writes the measurements as measurements.json and measurements.csv into a directory.
+
+    Args:
+        measurements (List[Dict[str, Any]]): The measurements of `measure_objects`.
+        directory (Union[str, Path]): The output directory.
+        spacing (Sequence[float]): The voxel spacing the volumes are based on.
+    """
+    directory = Path(directory)
+    with open(directory.joinpath("measurements.json"), "w") as f:
+        json.dump(
+            {"spacing": [float(s) for s in spacing], "objects": measurements}, f, indent=2
+        )
+
+    with open(directory.joinpath("measurements.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(MEASUREMENT_COLUMNS)
+        for m in measurements:
+            writer.writerow(
+                [
+                    " ".join(f"{v:g}" for v in m[c]) if isinstance(m[c], list) else m[c]
+                    for c in MEASUREMENT_COLUMNS
+                ]
+            )
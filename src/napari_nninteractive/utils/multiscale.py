@@ -0,0 +1,45 @@
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+# Largest image (per frame) handed to the session when the resolution level is chosen automatically
+MAX_SESSION_VOXELS = 2**28
+
+
+def pyramid_levels(layer: Any) -> List[Any]:
+    """Returns the resolution levels of an image layer, finest first. Arrays are not loaded."""
+    if getattr(layer, "multiscale", False):
+        return list(layer.data)
+    return [layer.data]
+
+
+def select_level(
+    levels: List[Any], max_voxels: int = MAX_SESSION_VOXELS, skip_axes: int = 0
+) -> int:
+    """
+    Selects the finest resolution level which is not larger than `max_voxels`.
+
+    Args:
+        levels (List[Any]): The resolution levels, finest first.
+        max_voxels (int, optional): The largest number of voxels.
+        skip_axes (int, optional): Number of leading axes (e.g. time) which are not counted.
+    """
+    for level, data in enumerate(levels):
+        if np.prod(data.shape[skip_axes:], dtype=np.int64) <= max_voxels:
+            return level
+    return len(levels) - 1
+
+
+def downsample_factors(levels: List[Any], level: int) -> np.ndarray:
+    """Returns the downsampling of a resolution level relative to the finest level per axis."""
+    return np.array(levels[0].shape, dtype=float) / np.array(levels[level].shape, dtype=float)
+
+
+def source_chunks(data: Any) -> Optional[Tuple[int, ...]]:
+    """Returns the chunk size of a dask or zarr array, None for in-memory arrays."""
+    chunks = getattr(data, "chunksize", None)  # dask
+    if chunks is None:
+        chunks = getattr(data, "chunks", None)  # zarr
+    if chunks is None or not all(isinstance(c, (int, np.integer)) for c in chunks):
+        return None
+    return tuple(int(c) for c in chunks)
@@ -0,0 +1,51 @@
+from typing import Any, Callable, Optional
+
+import torch
+
+
+class NetworkWrapper(torch.nn.Module):
+    """
+    Base class for modules which wrap the network of an inference session to change how it is run.
+    Wrappers can be stacked, each one holds the wrapped module as `network`.
+
+    Args:
+        network (torch.nn.Module): The network to wrap.
+    """
+
+    def __init__(self, network: torch.nn.Module):
+        super().__init__()
+        self.network = network
+
+
+def strip_wrapper(network: torch.nn.Module, wrapper_class: type) -> torch.nn.Module:
+    """Removes all wrappers of `wrapper_class` from a stack of wrappers."""
+    if isinstance(network, wrapper_class):
+        return strip_wrapper(network.network, wrapper_class)
+    if isinstance(network, NetworkWrapper):
+        network.network = strip_wrapper(network.network, wrapper_class)
+    return network
+
+
+def find_wrapper(network: torch.nn.Module, wrapper_class: type) -> Optional[Any]:
+    """Returns the first wrapper of `wrapper_class` in a stack of wrappers."""
+    while isinstance(network, NetworkWrapper):
+        if isinstance(network, wrapper_class):
+            return network
+        network = network.network
+    return None
+
+
+def set_wrapper(
+    session: Any, wrapper_class: type, wrapper: Optional[Callable[[torch.nn.Module], Any]]
+) -> None:
+    """
+    Replaces the wrapper of `wrapper_class` around the network of a session.
+
+    Args:
+        session (Any): The inference session.
+        wrapper_class (type): The type of wrapper to replace.
+        wrapper (Optional[Callable]): A function creating the new wrapper around a network,
+            None to only remove the existing wrapper.
+    """
+    network = strip_wrapper(session.network, wrapper_class)
+    session.network = wrapper(network) if wrapper is not None else network
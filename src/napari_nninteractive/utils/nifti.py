@@ -0,0 +1,191 @@
+import os
+import zlib
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import nibabel as nib
+import numpy as np
+
+# The compression options of the export, mapped to the gzip level (None writes plain .nii)
+NIFTI_COMPRESSION = {
+    "gzip (fast)": 1,
+    "gzip (default)": 6,
+    "gzip (best)": 9,
+    "none (.nii)": None,
+}
+
+# Each block is compressed independently into its own gzip member
+_BLOCK_SIZE = 16 * 2**20
+
+
+def is_nifti(path: Union[str, Path]) -> bool:
+    """Checks if a file name has a NIfTI extension."""
+    return str(path).endswith((".nii", ".nii.gz"))
+
+
+def nifti_affine(matrix: np.ndarray) -> np.ndarray:
+    """
+    Converts the homogeneous affine of a napari layer to a 4x4 NIfTI affine, which maps the first
+    (up to three) array axes as NIfTI only has three spatial axes.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    n = matrix.shape[0] - 1
+    k = min(3, n)
+    affine = np.eye(4)
+    affine[:k, :k] = matrix[:k, :k]
+    affine[:k, 3] = matrix[:k, n]
+    return affine
+
+
+def _axis_order_matches(
+    shape: Tuple[int, ...],
+    affine: np.ndarray,
+    file_shape: Tuple[int, ...],
+    file_zooms: Sequence[float],
+    reverse: bool,
+) -> bool:
+    """
+    Checks if masks of a shape and affine (in napari axis order) are the data of a NIfTI file of
+    the given shape and voxel spacing, read with the axes in file order or reversed.
+    """
+    if len(shape) != len(file_shape) or len(file_zooms) < len(shape):
+        return False
+    _file_shape = file_shape[::-1] if reverse else file_shape
+    _file_zooms = np.asarray(file_zooms[: len(shape)], dtype=np.float64)
+    _file_zooms = _file_zooms[::-1] if reverse else _file_zooms
+    if tuple(_file_shape) != tuple(shape):
+        return False
+    # The affine only holds the spacing of the first (up to three) axes
+    k = min(3, len(shape))
+    spacing = np.linalg.norm(np.asarray(affine, dtype=np.float64)[:k, :k], axis=0)
+    return bool(np.allclose(spacing, _file_zooms[:k], rtol=1e-3))
+
+
+def _gzip_member(block: memoryview, level: int) -> bytes:
+    """Compresses a block into a complete gzip member, zlib releases the GIL while doing so."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(block) + compressor.flush()
+
+
+class NiftiLabelWriter:
+    """
+    Writes label masks as NIfTI files without going through napari's writer plugins. The header is
+    prepared once, from the source image if it is a NIfTI file whose axis order can be matched to
+    the masks and otherwise from the given affine, and copied for each mask.
+
+    Compressed files are written as a series of gzip members which are compressed in parallel
+    (like pigz), any gzip reader decompresses them as one stream.
+
+    Args:
+        shape (Sequence[int]): The shape of the masks.
+        affine (np.ndarray): The 4x4 affine used when the source header can not be reused.
+        source_path (Optional[Union[str, Path]], optional): The file of the source image.
+        level (Optional[int], optional): The gzip level, None for uncompressed .nii files.
+        threads (Optional[int], optional): The number of threads, all cores by default.
+    """
+
+    def __init__(
+        self,
+        shape: Sequence[int],
+        affine: np.ndarray,
+        source_path: Optional[Union[str, Path]] = None,
+        level: Optional[int] = 1,
+        threads: Optional[int] = None,
+    ):
+        self.header, self._transpose = self._prepare_header(tuple(shape), affine, source_path)
+        self.level = level
+        self.threads = threads or os.cpu_count() or 1
+        self.suffix = ".nii" if level is None else ".nii.gz"
+
+    @staticmethod
+    def _prepare_header(
+        shape: Tuple[int, ...], affine: np.ndarray, source_path: Optional[Union[str, Path]]
+    ) -> Tuple[nib.Nifti1Header, bool]:
+        """
+        Returns the header for the masks and whether masks are stored with reversed axes.
+
+        Readers may hand the volume to napari in the axis order of the file or reversed. The order
+        is taken from the shape and the voxel spacing of the source header compared to the spacing
+        of the affine. The source header is only reused if exactly one order matches, otherwise
+        (e.g. an isotropic cube) the header is built from the affine.
+        """
+        header = None
+        transpose = False
+        if source_path is not None and is_nifti(source_path) and Path(source_path).exists():
+            # Only the header is read, the image data stays on disk
+            _header = nib.load(str(source_path)).header.copy()
+            _shape = tuple(int(s) for s in _header.get_data_shape())
+            _orders = [
+                reverse
+                for reverse in (False, True)
+                if _axis_order_matches(shape, affine, _shape, _header.get_zooms(), reverse)
+            ]
+            if len(_orders) == 1:
+                header = _header
+                transpose = _orders[0]
+        if header is None:
+            header = nib.Nifti1Image(np.zeros((1,) * len(shape), dtype=np.uint8), affine).header
+            header.set_data_shape(shape)
+
+        header.set_data_dtype(np.uint8)
+        header.set_slope_inter(1, 0)
+        header["cal_min"] = 0
+        header["cal_max"] = 1
+        return header, transpose
+
+    def _to_bytes(self, data: np.ndarray, offset: Optional[Sequence[int]] = None) -> bytes:
+        """Serializes a mask with a copy of the prepared header."""
+        _data = np.asarray(data, dtype=np.uint8)
+        affine = self.header.get_best_affine()
+        if offset is not None:
+            # A crop starts at the offset, its origin moves there in world space
+            _offset = np.asarray(offset, dtype=np.float64)
+            _offset = _offset[::-1] if self._transpose else _offset
+            affine[:3, 3] += affine[:3, : len(_offset)] @ _offset
+        # NIfTI stores the first axis fastest, the transposed view is written without a copy
+        _data = _data.T if self._transpose else _data
+        image = nib.Nifti1Image(_data, affine, header=self.header.copy())
+        return image.to_bytes()
+
+    def write(
+        self,
+        path: Union[str, Path],
+        data: np.ndarray,
+        offset: Optional[Sequence[int]] = None,
+        executor: Executor = None,
+    ) -> None:
+        """
+        Writes a single mask.
+
+        Args:
+            path (Union[str, Path]): The output file.
+            data (np.ndarray): The mask.
+            offset (Optional[Sequence[int]], optional): The voxel offset if the mask is a crop.
+            executor (Executor, optional): Compresses the blocks of the file in parallel.
+        """
+        _bytes = memoryview(self._to_bytes(data, offset))
+        with open(path, "wb") as f:
+            if self.level is None:
+                f.write(_bytes)
+                return
+            blocks = [_bytes[i : i + _BLOCK_SIZE] for i in range(0, len(_bytes), _BLOCK_SIZE)]
+            _map = executor.map if executor is not None else map
+            for member in _map(partial(_gzip_member, level=self.level), blocks):
+                f.write(member)
+
+    def write_all(self, items: List[Tuple[Union[str, Path], np.ndarray, Any]]) -> None:
+        """
+        Writes several masks in parallel, a single mask is compressed in parallel instead.
+
+        Args:
+            items (List[Tuple[Union[str, Path], np.ndarray, Any]]): The output file, mask and
+                offset (None if the mask is not cropped) of each object.
+        """
+        with ThreadPoolExecutor(self.threads) as executor:
+            if len(items) == 1:
+                self.write(*items[0], executor=executor)
+            else:
+                for future in [executor.submit(self.write, *item) for item in items]:
+                    future.result()
@@ -0,0 +1,183 @@
+import json
+import os
+import platform
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import torch
+
+PERFORMANCE_FILE = Path.home().joinpath(".nninteractive", "performance.json")
+
+# The cpus napari was started with, restored when pinning is turned off again
+_INITIAL_AFFINITY = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else None
+
+
+def machine_id() -> str:
+    """Identifies the current machine, settings are remembered per machine."""
+    return f"{platform.node()}-{os.cpu_count()}"
+
+
+def parse_cpulist(cpulist: str) -> List[int]:
+    """Parses a linux cpu list like '0-3,8-11' into a list of cpu ids."""
+    cpus = []
+    for part in cpulist.strip().split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            cpus.extend(range(int(start), int(end) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+
+def numa_nodes() -> Dict[int, List[int]]:
+    """
+    Returns the cpus of each NUMA node. Machines without NUMA information (or non-linux systems)
+    are treated as a single node.
+    """
+    nodes = {}
+    for _file in sorted(Path("/sys/devices/system/node").glob("node*/cpulist")):
+        try:
+            nodes[int(_file.parent.name[4:])] = parse_cpulist(_file.read_text())
+        except (OSError, ValueError):
+            continue
+    if not nodes:
+        nodes[0] = list(range(os.cpu_count() or 1))
+    return nodes
+
+
+def physical_core_count(cpus: Optional[List[int]] = None) -> int:
+    """
+    Counts the physical cores (ignoring hyperthreads) of the given cpus, or of the whole machine.
+    """
+    cores = set()
+    for cpu in cpus if cpus is not None else range(os.cpu_count() or 1):
+        _file = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list")
+        try:
+            cores.add(min(parse_cpulist(_file.read_text())))
+        except (OSError, ValueError):
+            cores.add(cpu)
+    return max(1, len(cores))
+
+
+def default_performance_settings() -> Dict[str, Any]:
+    """
+    Uses one thread per physical core and leaves one core for napari and Qt.
+    """
+    return {
+        "intra_op_threads": max(1, physical_core_count() - 1),
+        "inter_op_threads": 2,
+        "numa_node": -1,
+        "cpu_precision": "fp32",
+        "max_patches": 0,
+        "latency_target_ms": 0,
+    }
+
+
+def load_performance_settings() -> Dict[str, Any]:
+    """Loads the performance settings of this machine, falls back to the defaults."""
+    settings = default_performance_settings()
+    if PERFORMANCE_FILE.is_file():
+        try:
+            settings.update(json.loads(PERFORMANCE_FILE.read_text()).get(machine_id(), {}))
+        except (OSError, ValueError):
+            pass
+    return settings
+
+
+def save_performance_settings(settings: Dict[str, Any]) -> None:
+    """Remembers performance settings (and benchmark results) for this machine."""
+    _all = {}
+    if PERFORMANCE_FILE.is_file():
+        try:
+            _all = json.loads(PERFORMANCE_FILE.read_text())
+        except (OSError, ValueError):
+            _all = {}
+    _all[machine_id()] = dict(_all.get(machine_id(), {}), **settings)
+    PERFORMANCE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    PERFORMANCE_FILE.write_text(json.dumps(_all, indent=2))
+
+
+def set_process_affinity(cpus: Any) -> None:
+    """
+    Pins all threads of this process to the given cpus. The affinity is a property of each thread,
+    so every running thread (e.g. the OpenMP pool torch already started) is pinned one by one.
+    Threads started afterwards inherit the affinity of the thread starting them.
+
+    Args:
+        cpus (Any): The cpu ids.
+    """
+    os.sched_setaffinity(0, cpus)
+    _tasks = Path("/proc/self/task")
+    for _task in _tasks.iterdir() if _tasks.is_dir() else []:
+        try:
+            os.sched_setaffinity(int(_task.name), cpus)
+        except (OSError, ValueError):
+            # The thread exited meanwhile
+            continue
+
+
+def apply_thread_settings(intra_op_threads: int, inter_op_threads: int, numa_node: int) -> None:
+    """
+    Configures the torch thread pools and optionally pins the process to one NUMA node.
+
+    Pinning keeps the inference threads and the memory they allocate on the same socket. It is
+    applied to all threads of the process, including the already running torch thread pools.
+
+    Args:
+        intra_op_threads (int): Number of threads used within one operation.
+        inter_op_threads (int): Number of threads used to run independent operations in parallel.
+        numa_node (int): The NUMA node to pin to, -1 to use all cpus.
+    """
+    torch.set_num_threads(int(intra_op_threads))
+
+    if torch.get_num_interop_threads() != inter_op_threads:
+        try:
+            torch.set_num_interop_threads(int(inter_op_threads))
+        except RuntimeError:
+            # Can only be set once, before torch started any inter-op parallel work
+            print("The number of inter-op threads is applied after restarting napari")
+
+    if _INITIAL_AFFINITY is not None:
+        cpus = numa_nodes().get(numa_node) if numa_node >= 0 else None
+        set_process_affinity(cpus or _INITIAL_AFFINITY)
+
+
+def candidate_thread_counts(max_threads: int) -> List[int]:
+    """Powers of two up to `max_threads` plus the number of physical cores."""
+    counts = {max_threads, physical_core_count()}
+    n = 1
+    while n < max_threads:
+        counts.add(n)
+        n *= 2
+    return sorted(c for c in counts if 1 <= c <= max_threads)
+
+
+def benchmark_thread_counts(
+    run: Callable[[], None], thread_counts: List[int], repeats: int = 3
+) -> Iterator[Tuple[int, float]]:
+    """
+    Times `run` for each number of intra-op threads. Each setting gets one untimed warm-up run,
+    the median of `repeats` runs is reported.
+
+    Args:
+        run (Callable[[], None]): A representative prediction.
+        thread_counts (List[int]): The numbers of threads to benchmark.
+        repeats (int, optional): The number of timed runs per setting.
+
+    Yields:
+        Tuple[int, float]: The number of threads and the median runtime in seconds.
+    """
+    _initial = torch.get_num_threads()
+    try:
+        for n in thread_counts:
+            torch.set_num_threads(n)
+            run()
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - start)
+            yield n, sorted(times)[len(times) // 2]
+    finally:
+        torch.set_num_threads(_initial)
@@ -0,0 +1,97 @@
+import time
+from typing import Any, Callable, Dict, Iterator, List
+
+import numpy as np
+import torch
+
+from napari_nninteractive.utils.network import NetworkWrapper, set_wrapper
+
+CPU_PRECISIONS = ["fp32", "bf16"]
+
+
+class AutocastNetwork(NetworkWrapper):
+    """
+    Runs the wrapped network under CPU autocast in reduced precision and returns float32 outputs,
+    so the inference session does not notice the difference.
+
+    Args:
+        network (torch.nn.Module): The network to wrap.
+        dtype (torch.dtype, optional): The autocast dtype. Defaults to bfloat16.
+    """
+
+    def __init__(self, network: torch.nn.Module, dtype: torch.dtype = torch.bfloat16):
+        super().__init__(network)
+        self.dtype = dtype
+
+    def forward(self, x: torch.Tensor) -> Any:
+        with torch.autocast("cpu", dtype=self.dtype):
+            out = self.network(x)
+        if isinstance(out, (list, tuple)):
+            return type(out)(o.float() for o in out)
+        return out.float()
+
+
+def set_cpu_precision(session: Any, precision: str) -> None:
+    """
+    Switches the network of an inference session between fp32 and bf16 autocast.
+
+    Args:
+        session (Any): The inference session.
+        precision (str): One of CPU_PRECISIONS.
+    """
+    if precision not in CPU_PRECISIONS:
+        raise ValueError(f"Unknown precision {precision}, use one of {CPU_PRECISIONS}")
+
+    if precision == "bf16":
+        set_wrapper(session, AutocastNetwork, lambda n: AutocastNetwork(n, torch.bfloat16))
+    else:
+        set_wrapper(session, AutocastNetwork, None)
+
+
+def dice(reference: np.ndarray, prediction: np.ndarray) -> float:
+    """Computes the dice score between two binary masks (1.0 if both are empty)."""
+    reference = reference > 0
+    prediction = prediction > 0
+    _sum = reference.sum() + prediction.sum()
+    if _sum == 0:
+        return 1.0
+    return float(2 * np.logical_and(reference, prediction).sum() / _sum)
+
+
+def compare_precisions(
+    run: Callable[[], None],
+    result: np.ndarray,
+    apply: Callable[[str], None],
+    precisions: List[str],
+    repeats: int = 3,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Measures latency and accuracy of a representative prediction in different precisions. The first
+    precision is the reference the dice scores are computed against.
+
+    Args:
+        run (Callable[[], None]): A representative prediction writing into `result`.
+        result (np.ndarray): The buffer the prediction is written to.
+        apply (Callable[[str], None]): Switches the inference to the given precision.
+        precisions (List[str]): The precisions to compare, starting with the reference.
+        repeats (int, optional): The number of timed runs per precision.
+
+    Yields:
+        Dict[str, Any]: The precision, the median runtime in seconds and the dice to the reference.
+    """
+    reference = None
+    for precision in precisions:
+        apply(precision)
+        run()
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        if reference is None:
+            reference = result.copy()
+        yield {
+            "precision": precision,
+            "seconds": sorted(times)[len(times) // 2],
+            "dice": dice(reference, result),
+        }
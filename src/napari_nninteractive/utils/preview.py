@@ -0,0 +1,96 @@
+from contextlib import nullcontext
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+import torch
+
+from napari_nninteractive.utils.budget import previous_segmentation_logits
+from napari_nninteractive.utils.network import NetworkWrapper
+
+# Zoom out factor of a preview, the preview shows the first patch at this fraction of its resolution
+PREVIEW_ZOOM_OUT_FACTOR = 2
+
+
+class CancellableNetwork(NetworkWrapper):
+    """
+    Lets a running prediction be dropped between two forward passes. Once `stop` returns True, the
+    remaining passes are answered with the previous segmentation like an exhausted budget, so the
+    inference session finishes its auto-zoom and refinement loop almost instantly.
+
+    Args:
+        network (torch.nn.Module): The network to wrap.
+        stop (Callable[[], bool]): Checked before each forward pass.
+        previous_seg_channel (int, optional): The input channel holding the previous segmentation.
+    """
+
+    def __init__(
+        self, network: torch.nn.Module, stop: Callable[[], bool], previous_seg_channel: int = 1
+    ):
+        super().__init__(network)
+        self.stop = stop
+        self.previous_seg_channel = previous_seg_channel
+
+    def forward(self, x: torch.Tensor) -> Any:
+        if self.stop():
+            return previous_segmentation_logits(x, self.previous_seg_channel)
+        return self.network(x)
+
+
+@torch.inference_mode()
+def predict_preview(
+    session: Any, center: Any, zoom_out_factor: int = PREVIEW_ZOOM_OUT_FACTOR
+) -> Optional[Tuple[Tuple[slice, ...], np.ndarray]]:
+    """
+    Predicts a low resolution preview of the first patch of a prediction around a center.
+
+    The network input is built as for the auto-zoom at `zoom_out_factor`, of which only the central
+    part covering the first patch is run through the network. At the default factor this costs
+    about an eighth of a full forward pass. The upsampled preview is written into the target buffer
+    only, the interactions of the session (including its previous segmentation) stay untouched.
+
+    Args:
+        session (Any): The inference session, with its interactions already added.
+        center (Any): The prediction center queued by the session.
+        zoom_out_factor (int, optional): The integer zoom out factor of the preview.
+
+    Returns:
+        Optional[Tuple[Tuple[slice, ...], np.ndarray]]: The region of the target buffer holding the
+            preview and its previous content. None if the session can not build a preview.
+    """
+    _kernel_sizes = getattr(session.configuration_manager, "pool_op_kernel_sizes", None)
+    if (
+        not hasattr(session, "_build_network_input")
+        or _kernel_sizes is None
+        or not isinstance(session.target_buffer, np.ndarray)
+    ):
+        return None
+
+    # The crop has to stay divisible by the total stride of the network
+    patch_size = np.asarray(session.configuration_manager.patch_size, dtype=int)
+    stride = np.prod(np.asarray(_kernel_sizes, dtype=int), axis=0)
+    crop = np.maximum(patch_size // zoom_out_factor // stride * stride, stride)
+    offset = (patch_size - crop) // 2
+
+    _autocast = (
+        torch.autocast(session.device.type) if session.device.type == "cuda" else nullcontext()
+    )
+    with _autocast:
+        _input, _, scaled_bbox, _ = session._build_network_input(center, zoom_out_factor)
+        _input = _input[(slice(None), *[slice(o, o + c) for o, c in zip(offset, crop)])]
+        pred = session.network(_input[None].contiguous())[0].argmax(0)
+    del _input
+    pred = pred.to(torch.uint8).cpu().numpy()
+    for axis in range(pred.ndim):
+        pred = pred.repeat(zoom_out_factor, axis=axis)
+
+    target = session.target_buffer
+    _start = [lb + o * zoom_out_factor for (lb, _), o in zip(scaled_bbox, offset)]
+    _lower = [max(s, 0) for s in _start]
+    _upper = [min(s + p, n) for s, p, n in zip(_start, pred.shape, target.shape)]
+    if any(u <= l for l, u in zip(_lower, _upper)):
+        return None
+
+    region = tuple(slice(l, u) for l, u in zip(_lower, _upper))
+    prior = np.array(target[region])
+    target[region] = pred[tuple(slice(l - s, u - s) for l, u, s in zip(_lower, _upper, _start))]
+    return region, prior
@@ -0,0 +1,173 @@
+import threading
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from napari_nninteractive.server.protocol import bounding_box
+from napari_nninteractive.utils.shared import DirtyTrackingArray
+
+# The coarsest level of a label pyramid is at most this large along every downsampled axis
+MIN_PYRAMID_SIZE = 256
+MAX_PYRAMID_LEVELS = 6
+
+
+def label_data(layer: Any) -> Any:
+    """Returns the full resolution data of a (multiscale) Labels layer."""
+    if getattr(layer, "multiscale", False):
+        return layer.data[0]
+    return layer.data
+
+
+def mode_downsample(block: np.ndarray, skip_axes: int = 0) -> np.ndarray:
+    """
+    Halves a label block along all axes except the first `skip_axes` by taking the most frequent
+    label of each 2x2(x2) cell. Ties are resolved in favour of the larger label, so thin objects do
+    not vanish from the coarse levels. Odd sizes are padded by repeating the border.
+
+    Args:
+        block (np.ndarray): The labels.
+        skip_axes (int, optional): Number of leading axes (e.g. time) which are kept.
+
+    Returns:
+        np.ndarray: The downsampled labels.
+    """
+    _pad = [(0, 0)] * skip_axes + [(0, s % 2) for s in block.shape[skip_axes:]]
+    if any(p[1] for p in _pad):
+        block = np.pad(block, _pad, mode="edge")
+    _shape, _cell_axes = [], []
+    for axis, s in enumerate(block.shape):
+        if axis < skip_axes:
+            _shape.append(s)
+        else:
+            _shape.extend([s // 2, 2])
+            _cell_axes.append(len(_shape) - 1)
+    cells = block.reshape(_shape)
+    _cell_axes = tuple(_cell_axes)
+    _cell_size = 2 ** len(_cell_axes)
+
+    labels = np.unique(cells)
+    if len(labels) == 1:
+        _out_shape = [s for axis, s in enumerate(cells.shape) if axis not in _cell_axes]
+        return np.full(_out_shape, labels[0], dtype=block.dtype)
+    if len(labels) == 2 and labels[0] == 0:
+        # Binary masks, the common case of the object layers
+        _count = cells.astype(bool).sum(axis=_cell_axes, dtype=np.uint8)
+        return np.where(2 * _count >= _cell_size, labels[1], 0).astype(block.dtype)
+
+    best_label = None
+    best_count = None
+    for label in labels:
+        _count = (cells == label).sum(axis=_cell_axes, dtype=np.uint8)
+        if best_label is None:
+            best_label = np.full(_count.shape, label, dtype=block.dtype)
+            best_count = _count
+        else:
+            _better = _count >= best_count
+            best_label[_better] = label
+            best_count = np.maximum(best_count, _count)
+    return best_label
+
+
+class LabelPyramid:
+    """
+    The resolution levels of a label volume for a multiscale Labels layer, so napari renders a
+    coarse level when zoomed out or in 3D. The finest level is the label volume itself (not a
+    copy), the coarser levels are mode downsampled from their predecessor.
+
+    Writes through the arrays returned by `tracked` are recorded, `update` then recomputes only the
+    changed region of each coarser level.
+
+    Args:
+        data (np.ndarray): The label volume.
+        skip_axes (int, optional): Number of leading axes (e.g. time) which are not downsampled.
+        min_size (int, optional): The coarsest level is at most this large along each axis.
+        max_levels (int, optional): The largest number of levels.
+        empty (bool, optional): The label volume is known to be empty, it is not searched.
+    """
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        skip_axes: int = 0,
+        min_size: int = MIN_PYRAMID_SIZE,
+        max_levels: int = MAX_PYRAMID_LEVELS,
+        empty: bool = False,
+    ):
+        self.skip_axes = skip_axes
+        self.levels: List[np.ndarray] = [data]
+        _shape = tuple(data.shape)
+        while len(self.levels) < max_levels and max(_shape[skip_axes:], default=0) > min_size:
+            _shape = _shape[:skip_axes] + tuple((s + 1) // 2 for s in _shape[skip_axes:])
+            self.levels.append(np.zeros(_shape, dtype=data.dtype))
+        self._lock = threading.Lock()
+        self._pending: Optional[List[List[int]]] = None
+
+        _bbox = bounding_box(data) if len(self.levels) > 1 and not empty else None
+        if _bbox is not None:
+            self.mark([[sl.start, sl.stop] for sl in _bbox])
+            self.update()
+
+    def mark(self, region: Sequence[Sequence[int]]) -> None:
+        """Records a changed region of the finest level (given as [start, stop] per axis)."""
+        with self._lock:
+            if self._pending is None:
+                self._pending = [list(r) for r in region]
+            else:
+                self._pending = [
+                    [min(a[0], b[0]), max(a[1], b[1])] for a, b in zip(self._pending, region)
+                ]
+
+    def mark_all(self) -> None:
+        """Records that the whole volume changed."""
+        self.mark([[0, int(s)] for s in self.levels[0].shape])
+
+    def tracked(self, index: Optional[int] = None) -> DirtyTrackingArray:
+        """
+        Returns a view of the finest level (or one of its frames) which records everything
+        written into it, e.g. as the target buffer of the inference session.
+
+        Args:
+            index (Optional[int], optional): The frame of a time series, None for the whole volume.
+        """
+        if index is None:
+            view = self.levels[0].view(DirtyTrackingArray)
+            view.listener = self.mark
+        else:
+            view = self.levels[0][index].view(DirtyTrackingArray)
+            view.listener = lambda region: self.mark([[index, index + 1]] + list(region))
+        return view
+
+    def update(self) -> bool:
+        """
+        Recomputes the changed region on all coarser levels.
+
+        Returns:
+            bool: True if anything changed since the last update.
+        """
+        with self._lock:
+            region, self._pending = self._pending, None
+        if region is None:
+            return False
+
+        for level in range(1, len(self.levels)):
+            _source = self.levels[level - 1]
+            _target = self.levels[level]
+            # Grow the region to whole 2x2(x2) cells
+            region = region[: self.skip_axes] + [
+                [start // 2, min((stop + 1) // 2, s)]
+                for (start, stop), s in zip(
+                    region[self.skip_axes :], _target.shape[self.skip_axes :]
+                )
+            ]
+            _target_slices = tuple(slice(start, stop) for start, stop in region)
+            _source_slices = tuple(
+                sl if axis < self.skip_axes else slice(2 * sl.start, min(2 * sl.stop, s))
+                for axis, (sl, s) in enumerate(zip(_target_slices, _source.shape))
+            )
+            _target[_target_slices] = mode_downsample(_source[_source_slices], self.skip_axes)
+        return True
+
+
+def pyramid_region(region: Tuple[slice, ...]) -> List[List[int]]:
+    """Converts slices with known bounds into a region given as [start, stop] per axis."""
+    return [[sl.start, sl.stop] for sl in region]
@@ -0,0 +1,130 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from napari_nninteractive.server.protocol import bounding_box
+from napari_nninteractive.utils.pyramid import label_data
+
+
+def object_layer_name(index: int, name: str, image_name: str) -> str:
+    """Returns the display name of a finished object layer, e.g. "object 3 (liver) - image"."""
+    name_suffix = f" ({name})" if name else ""
+    return f"object {index}{name_suffix} - {image_name}"
+
+
+def expand_bbox(
+    bbox: Tuple[slice, ...], margin: int, shape: Sequence[int]
+) -> Tuple[slice, ...]:
+    """Grows a bounding box by a margin on all sides, clipped to the array shape."""
+    return tuple(
+        slice(max(0, sl.start - margin), min(int(s), sl.stop + margin))
+        for sl, s in zip(bbox, shape)
+    )
+
+
+class ObjectRecord:
+    """
+    Everything known about one segmented object.
+
+    Args:
+        index (int): The object id.
+        layer (Any): The Labels layer holding the object.
+        name (str, optional): The object name, empty if the object is unnamed.
+        color (Any, optional): The colormap of the layer.
+    """
+
+    def __init__(self, index: int, layer: Any, name: str = "", color: Any = None):
+        self.index = index
+        self.layer = layer
+        self.name = name
+        self.color = color
+        self.finished = False
+        # The statistics are computed lazily, dirty marks them as outdated
+        self.dirty = True
+        self._bbox = None
+        self._voxels = 0
+
+    def _update(self) -> None:
+        if self.dirty:
+            _data = np.asarray(label_data(self.layer))
+            self._bbox = bounding_box(_data)
+            self._voxels = int(np.count_nonzero(_data[self._bbox])) if self._bbox else 0
+            self.dirty = False
+
+    @property
+    def bbox(self) -> Optional[Tuple[slice, ...]]:
+        """The bounding box of the object, None if it is empty."""
+        self._update()
+        return self._bbox
+
+    @property
+    def voxels(self) -> int:
+        """The number of voxels of the object."""
+        self._update()
+        return self._voxels
+
+
+class ObjectRegistry:
+    """
+    Maps object ids to their records, so objects are found by id or layer instead of by parsing
+    layer names. Renaming a layer therefore does not change which object it holds.
+    """
+
+    def __init__(self):
+        self._records: Dict[int, ObjectRecord] = {}
+        self._by_layer: Dict[int, int] = {}
+        self._next_index = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._records
+
+    def __iter__(self) -> Iterator[ObjectRecord]:
+        return iter(sorted(self._records.values(), key=lambda r: r.index))
+
+    @property
+    def next_index(self) -> int:
+        """The id for the next new object."""
+        return self._next_index
+
+    def register(self, index: int, layer: Any, name: str = "", color: Any = None) -> ObjectRecord:
+        """
+        Adds an object, replacing any object with the same id or layer.
+
+        Returns:
+            ObjectRecord: The record of the object.
+        """
+        self.remove(index)
+        self.remove_layer(layer)
+        record = ObjectRecord(index, layer, name, color)
+        self._records[index] = record
+        self._by_layer[id(layer)] = index
+        self._next_index = max(self._next_index, index + 1)
+        return record
+
+    def get(self, index: int) -> Optional[ObjectRecord]:
+        """Returns the record of an object id, None if there is none."""
+        return self._records.get(index)
+
+    def find(self, layer: Any) -> Optional[ObjectRecord]:
+        """Returns the record of the object held by a layer, None if there is none."""
+        index = self._by_layer.get(id(layer))
+        return None if index is None else self._records[index]
+
+    def remove(self, index: int) -> None:
+        """Removes an object, e.g. when its layer was deleted."""
+        record = self._records.pop(index, None)
+        if record is not None:
+            self._by_layer.pop(id(record.layer), None)
+
+    def remove_layer(self, layer: Any) -> None:
+        """Removes the object held by a layer."""
+        index = self._by_layer.get(id(layer))
+        if index is not None:
+            self.remove(index)
+
+    def finished(self) -> List[ObjectRecord]:
+        """Returns the records of all finished objects, ordered by id."""
+        return [record for record in self if record.finished]
@@ -0,0 +1,161 @@
+import copy
+import inspect
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Iterator, Union
+
+import nnInteractive
+import torch
+from batchgenerators.utilities.file_and_folder_operations import join, load_json
+from nnunetv2.utilities.find_class_by_name import recursive_find_python_class
+
+
+def find_inference_class(checkpoint_path: Union[str, Path]) -> Any:
+    """
+    Returns the inference session class a checkpoint was trained for, defaults to the
+    nnInteractiveInferenceSession.
+
+    Args:
+        checkpoint_path (Union[str, Path]): The model folder.
+    """
+    if Path(checkpoint_path).joinpath("inference_session_class.json").is_file():
+        inference_class = load_json(Path(checkpoint_path).joinpath("inference_session_class.json"))
+        if isinstance(inference_class, dict):
+            inference_class = inference_class["inference_class"]
+    else:
+        inference_class = "nnInteractiveInferenceSession"
+
+    return recursive_find_python_class(
+        join(nnInteractive.__path__[0], "inference"),
+        inference_class,
+        "nnInteractive.inference",
+    )
+
+
+# Settings a model folder sets on a session besides the network, interactions only read them
+_CHECKPOINT_SETTINGS = (
+    "preferred_scribble_thickness",
+    "interaction_decay",
+    "pad_mode_data",
+    "point_interaction",
+    "num_interaction_channels",
+    "supported_interactions",
+    "channel_mapping",
+    "supports_initial_label",
+    "supports_zero_shot_label_refinement",
+    "license",
+)
+
+
+# Serializes the checkpoint loading of sessions, see `mmap_checkpoint_loading`
+_CHECKPOINT_LOCK = threading.Lock()
+
+
+class _MmapTorch:
+    """Stands in for the torch module of a session module, only its `load` memory-maps files."""
+
+    def __init__(self, load: Any):
+        self.load = load
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(torch, name)
+
+
+@contextmanager
+def mmap_checkpoint_loading(session: Any) -> Iterator[None]:
+    """
+    Makes torch.load memory-map checkpoint files instead of reading them into RAM while a session
+    loads its model. The weights are paged in from the file as they are copied into the network
+    (or to the device), so loading is faster and does not hold a second copy in memory.
+    Checkpoints in the legacy (non zip) format are loaded as before.
+
+    The global torch.load stays untouched, as other threads may use torch meanwhile. Only the
+    modules of the session class see a torch whose load memory-maps files.
+
+    Args:
+        session (Any): The inference session which loads the checkpoint.
+    """
+    _load = torch.load
+    if "mmap" not in inspect.signature(_load).parameters:
+        # torch < 2.1
+        yield
+        return
+
+    @wraps(_load)
+    def _mmap_load(f: Any, *args, **kwargs) -> Any:
+        if isinstance(f, (str, os.PathLike)) and "mmap" not in kwargs:
+            try:
+                return _load(f, *args, mmap=True, **kwargs)
+            except RuntimeError:
+                # Only checkpoints of the zip format can be memory-mapped
+                pass
+        return _load(f, *args, **kwargs)
+
+    _modules = {
+        sys.modules[cls.__module__]
+        for cls in type(session).__mro__
+        if getattr(sys.modules.get(cls.__module__), "torch", None) is torch
+    }
+    with _CHECKPOINT_LOCK:
+        for module in _modules:
+            module.torch = _MmapTorch(_mmap_load)
+        try:
+            yield
+        finally:
+            for module in _modules:
+                module.torch = torch
+
+
+def initialize_session(session: Any, checkpoint_path: Union[str, Path]) -> None:
+    """
+    Loads the final checkpoint of fold 0 of a model folder into an inference session, the weights
+    are memory-mapped.
+
+    Args:
+        session (Any): The inference session.
+        checkpoint_path (Union[str, Path]): The model folder.
+    """
+    with mmap_checkpoint_loading(session):
+        session.initialize_from_trained_model_folder(
+            str(checkpoint_path), 0, "checkpoint_final.pth"
+        )
+
+
+def clone_session(template: Any) -> Any:
+    """
+    Creates a new inference session which shares the loaded network of an initialized session, e.g.
+    one session per client of the inference server. Only the network, the plans, the configuration
+    manager, the trainer name and the checkpoint settings are taken from the template. The new
+    session has its own image, interactions, queued prediction centers, futures and executor.
+
+    Args:
+        template (Any): An initialized inference session.
+
+    Returns:
+        Any: The new session.
+    """
+    session = type(template)(
+        device=template.device,
+        use_torch_compile=False,
+        verbose=template.verbose,
+        torch_n_threads=template.torch_n_threads,
+        do_autozoom=template.do_autozoom,
+    )
+    session.manual_initialization(
+        template.network,
+        template.plans_manager,
+        template.configuration_manager,
+        template.dataset_json,
+        template.trainer_name,
+    )
+    # Keep the (compiled and wrapped) network of the template as it is
+    session.network = template.network
+    session.use_torch_compile = template.use_torch_compile
+    for name in _CHECKPOINT_SETTINGS:
+        if hasattr(template, name):
+            setattr(session, name, copy.deepcopy(getattr(template, name)))
+    return session
@@ -0,0 +1,107 @@
+import weakref
+from multiprocessing import shared_memory
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+# All blocks allocated by this process, by name
+_BLOCKS = weakref.WeakValueDictionary()
+
+
+def _release(shm: shared_memory.SharedMemory) -> None:
+    """Frees a shared memory block once no array uses it anymore."""
+    shm.close()
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def shared_zeros(shape: Sequence[int], dtype: np.dtype = np.uint8) -> np.ndarray:
+    """
+    Allocates a zero initialized array in shared memory, so another process can map it without
+    copying. The block is freed when the array (and all views of it) are garbage collected.
+
+    Args:
+        shape (Sequence[int]): The shape of the array.
+        dtype (np.dtype, optional): The dtype of the array.
+    """
+    shape = tuple(int(s) for s in shape)
+    nbytes = max(1, int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize)
+    shm = shared_memory.SharedMemory(create=True, size=nbytes)
+    array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    array.fill(0)
+    _BLOCKS[shm.name] = shm
+    weakref.finalize(array, _release, shm)
+    return array
+
+
+def locate_shared(array: np.ndarray) -> Optional[Tuple[str, int]]:
+    """
+    Finds the shared memory block a (view of an) array allocated by `shared_zeros` lives in.
+
+    Returns:
+        Optional[Tuple[str, int]]: The name of the block and the byte offset of the array, None if
+        the array is not in shared memory or not contiguous.
+    """
+    if not array.flags.c_contiguous:
+        return None
+    address = array.__array_interface__["data"][0]
+    for name, shm in list(_BLOCKS.items()):
+        start = np.frombuffer(shm.buf, dtype=np.uint8).__array_interface__["data"][0]
+        if start <= address and address + array.nbytes <= start + shm.size:
+            return name, address - start
+    return None
+
+
+def attach_shared(
+    name: str, offset: int, shape: Sequence[int], dtype: np.dtype
+) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """
+    Maps an array which lives in a shared memory block of another process.
+
+    Returns:
+        Tuple[shared_memory.SharedMemory, np.ndarray]: The block, which has to be kept open while
+        the array is used, and the array.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+
+
+class DirtyTrackingArray(np.ndarray):
+    """
+    A target buffer which records the bounding box of everything written into it, so the inference
+    process can announce the changed region without comparing volumes. A listener, if set, is
+    called with every written region (e.g. to update the label pyramid).
+    """
+
+    def __array_finalize__(self, obj: Any) -> None:
+        self.dirty = None
+        self.listener = None
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.mark(key)
+
+    def fill(self, value: Any) -> None:
+        super().fill(value)
+        self.mark(Ellipsis)
+
+    def mark(self, key: Any) -> None:
+        """Adds the region addressed by an index to the dirty region."""
+        region = [[0, int(s)] for s in self.shape]
+        _key = key if isinstance(key, tuple) else (key,)
+        if len(_key) <= self.ndim and all(isinstance(k, (slice, int, np.integer)) for k in _key):
+            for axis, k in enumerate(_key):
+                if isinstance(k, slice):
+                    start, stop, _ = k.indices(self.shape[axis])
+                    region[axis] = [min(start, stop), max(start, stop)]
+                else:
+                    k = int(k) % self.shape[axis]
+                    region[axis] = [k, k + 1]
+        if self.listener is not None:
+            self.listener(region)
+        if self.dirty is None:
+            self.dirty = region
+        else:
+            self.dirty = [[min(a[0], b[0]), max(a[1], b[1])] for a, b in zip(self.dirty, region)]
@@ -0,0 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Tuple
+
+import numpy as np
+
+
+def is_time_series(ndim: int, rgb: bool = False) -> bool:
+    """Checks if an image layer is a time series of 3D volumes (t, z, y, x)."""
+    return ndim == 4 and not rgb
+
+
+def read_frame(data: Any, frame: int) -> np.ndarray:
+    """Reads one frame of a (possibly lazily loaded) time series into memory."""
+    return np.asarray(data[frame])
+
+
+def prefetch_frames(data: Any, frames: List[int]) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Reads the frames of a time series one frame ahead in a background thread, so reading frame
+    t+1 overlaps with processing frame t.
+
+    Args:
+        data (Any): The time series, indexed by the frame along the first axis.
+        frames (List[int]): The frames to read, in order.
+
+    Yields:
+        Tuple[int, np.ndarray]: The frame index and the frame.
+    """
+    if not frames:
+        return
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(read_frame, data, frames[0])
+        for i, frame in enumerate(frames):
+            _data = future.result()
+            if i + 1 < len(frames):
+                future = executor.submit(read_frame, data, frames[i + 1])
+            yield frame, _data
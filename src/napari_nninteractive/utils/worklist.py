@@ -0,0 +1,142 @@
+import csv
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+# Files (and folders, e.g. .zarr) of a worklist folder which are opened as cases
+IMAGE_SUFFIXES = (
+    ".nii.gz",
+    ".nii",
+    ".mha",
+    ".mhd",
+    ".nrrd",
+    ".tif",
+    ".tiff",
+    ".zarr",
+    ".png",
+    ".jpg",
+    ".jpeg",
+)
+
+
+def is_image_file(path: Union[str, Path]) -> bool:
+    """Checks if a path has one of the image suffixes of a worklist."""
+    return str(path).lower().endswith(IMAGE_SUFFIXES)
+
+
+def load_worklist(path: Union[str, Path]) -> List[Path]:
+    """
+    Lists the cases of a worklist, given either as a folder of images or as a csv file.
+
+    The cases of a folder are its image files in alphabetical order. The first column of a csv file
+    holds the image paths, relative paths are relative to the csv file. A header row is skipped.
+
+    Args:
+        path (Union[str, Path]): The folder or csv file.
+
+    Returns:
+        List[Path]: The image of each case.
+    """
+    path = Path(path).expanduser()
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if is_image_file(p.name))
+    if not path.is_file():
+        raise FileNotFoundError(f"Worklist {path} does not exist")
+
+    cases = []
+    _first = True
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                continue
+            _case = Path(row[0].strip()).expanduser()
+            if not _case.is_absolute():
+                _case = path.parent.joinpath(_case)
+            if _first and not _case.exists() and not is_image_file(_case.name):
+                # Header row
+                _first = False
+                continue
+            _first = False
+            cases.append(_case)
+    return cases
+
+
+def read_case(path: Union[str, Path]) -> Tuple[List[tuple], Optional[str]]:
+    """
+    Reads an image with the napari readers and decodes it into memory, so it can be added to the
+    viewer without waiting. Lazily loaded images (e.g. dask or zarr arrays) are loaded completely,
+    multiscale images stay lazy as only one of their levels is used by the session.
+
+    Args:
+        path (Union[str, Path]): The image.
+
+    Returns:
+        Tuple[List[tuple], Optional[str]]: The layer data tuples (data, meta, layer type) and the
+            name of the reader plugin.
+    """
+    from napari.plugins.io import read_data_with_plugins
+
+    layer_data, hookimpl = read_data_with_plugins([str(path)])
+    if not layer_data:
+        raise ValueError(f"No reader found for {path}")
+
+    decoded = []
+    for layer_tuple in layer_data:
+        data = layer_tuple[0]
+        meta = dict(layer_tuple[1]) if len(layer_tuple) > 1 and layer_tuple[1] else {}
+        layer_type = layer_tuple[2] if len(layer_tuple) > 2 else "image"
+        if layer_type in ("image", "labels") and not meta.get("multiscale", False):
+            data = np.asarray(data)
+        decoded.append((data, meta, layer_type))
+    return decoded, getattr(hookimpl, "plugin_name", None)
+
+
+class CasePrefetcher:
+    """
+    Reads the cases of a worklist in a background thread, so the next case is ready while the
+    current one is annotated. Cases are read one after another in the order they were requested.
+
+    Args:
+        read (Callable[[Path], Any], optional): Reads a case, see `read_case`.
+    """
+
+    def __init__(self, read: Callable[[Path], Any] = read_case):
+        self._read = read
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="worklist")
+        self._futures: Dict[Path, Future] = {}
+
+    def prefetch(self, path: Path) -> None:
+        """Starts reading a case unless it is read already."""
+        if path not in self._futures:
+            self._futures[path] = self._executor.submit(self._read, path)
+
+    def is_ready(self, path: Path) -> bool:
+        """Checks if a case is read completely."""
+        return path in self._futures and self._futures[path].done()
+
+    def get(self, path: Path) -> Any:
+        """
+        Returns a case and forgets it. Waits if the case is still being read and reads it
+        right away if it was not prefetched.
+
+        Raises:
+            Exception: The exception of the reader if the case could not be read.
+        """
+        _future = self._futures.pop(path, None)
+        if _future is None:
+            return self._read(path)
+        return _future.result()
+
+    def discard(self, keep: Optional[List[Path]] = None) -> None:
+        """Forgets all prefetched cases except the ones to keep, running reads are finished."""
+        keep = keep or []
+        for path in list(self._futures):
+            if path not in keep:
+                self._futures.pop(path).cancel()
+
+    def close(self) -> None:
+        """Stops the background thread."""
+        self.discard()
+        self._executor.shutdown(wait=False)
@@ -1,17 +1,20 @@
 import os
 import warnings
+from itertools import compress
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
-from huggingface_hub import snapshot_download
 from napari._qt.layer_controls.qt_layer_controls_container import layer_to_controls
-from napari.layers import Labels
+from napari.layers import Image, Labels, Layer
+from napari.layers._source import layer_source
 from napari.layers.base._base_constants import ActionType
+from napari.qt.threading import thread_worker
 from napari.utils.notifications import show_warning
 from napari.utils.transforms import Affine
 from napari.viewer import Viewer
-from qtpy.QtWidgets import QFileDialog, QWidget
+from qtpy.QtCore import Qt, QTimer
+from qtpy.QtWidgets import QFileDialog, QTableWidgetItem, QWidget
 
 from napari_nninteractive.controls.bbox_controls import CustomQtBBoxControls
 from napari_nninteractive.controls.lasso_controls import CustomQtLassoControls
@@ -22,7 +25,55 @@ from napari_nninteractive.layers.lasso_layer import LassoLayer
 from napari_nninteractive.layers.point_layer import SinglePointLayer
 from napari_nninteractive.layers.scribble_layer import ScribbleLayer
 from napari_nninteractive.utils.affine import is_orthogonal
-from napari_nninteractive.utils.utils import ColorMapper, determine_layer_index
+from napari_nninteractive.utils.autosave import (
+    DirtyRegion,
+    SessionAutosaver,
+    cleanup_sessions,
+    latest_session_dir,
+    load_session,
+    merge_regions,
+    pack_mask,
+    painted_region,
+)
+from napari_nninteractive.utils.buffer_pool import BufferPool
+from napari_nninteractive.utils.chunks import chunk_fingerprints, chunk_slices, normalize_chunks
+from napari_nninteractive.utils.download import (
+    CheckpointDownloader,
+    DownloadCancelled,
+    cached_checkpoint,
+    checkpoint_dir,
+    list_checkpoint_files,
+)
+from napari_nninteractive.utils.manifest import ExportManifest
+from napari_nninteractive.utils.measure import measure_objects, write_measurements
+from napari_nninteractive.utils.multiscale import (
+    MAX_SESSION_VOXELS,
+    downsample_factors,
+    pyramid_levels,
+    select_level,
+    source_chunks,
+)
+from napari_nninteractive.utils.nifti import (
+    NIFTI_COMPRESSION,
+    NiftiLabelWriter,
+    is_nifti,
+    nifti_affine,
+)
+from napari_nninteractive.utils.pyramid import (
+    LabelPyramid,
+    label_data,
+    pyramid_region,
+)
+from napari_nninteractive.utils.registry import (
+    ObjectRecord,
+    ObjectRegistry,
+    expand_bbox,
+    object_layer_name,
+)
+from napari_nninteractive.utils.shared import DirtyTrackingArray, shared_zeros
+from napari_nninteractive.utils.timeseries import is_time_series
+from napari_nninteractive.utils.utils import ColorMapper
+from napari_nninteractive.utils.worklist import CasePrefetcher, load_worklist
 from napari_nninteractive.widget_gui import BaseGUI
 
 layer_to_controls[SinglePointLayer] = CustomQtPointsControls
@@ -59,8 +110,56 @@ class LayerControls(BaseGUI):
         self.colormap = ColorMapper(49, seed=0.5, background_value=0)
         self._scribble_brush_size = 5
         self.object_index = 0
+        # The objects of each image, the layers are found through them instead of their names
+        self._object_registries = {}
+        # The frame of a time series the session currently works on
+        self.frame = 0
+        # The lower resolution levels of the working object if labels are multiscale
+        self._label_pyramid = None
+        # Session sized buffers for the working object and the scribbles
+        self._buffer_pool = None
+
+        # Prompts collected in batch mode, each as (interaction index, data, positive)
+        self.pending_prompts = []
+
+        # Autosave of the current session, only the changed regions of the working object and of
+        # the objects (tracked by layer id, None if the whole object changed) are saved
+        self.prompt_history = []
+        self._autosaver = None
+        self._autosave_dirty = {}
+        self._working_changes = DirtyRegion()
+        # Everything written into the working buffer, i.e. where the working object can be
+        self._working_extent = DirtyRegion()
+        # Bit packed masks of scribble and lasso prompts which are not autosaved yet, by file name
+        self._prompt_masks = {}
+        self._prompt_mask_count = 0
+        self._autosave_timer = QTimer(self)
+        self._autosave_timer.timeout.connect(self._autosave)
+
+        # Checkpoints are downloaded in the background, the GUI polls the progress
+        self._downloader = None
+        self._download_cancelled = False
+        self._download_timer = QTimer(self)
+        self._download_timer.setInterval(200)
+        self._download_timer.timeout.connect(self._poll_download)
+
+        # Cases of the worklist, the next case is read in the background during the annotation
+        self._worklist = []
+        self._worklist_index = -1
+        self._case_layers = []
+        self._prefetcher = CasePrefetcher()
+        self._worklist_timer = QTimer(self)
+        self._worklist_timer.setInterval(500)
+        self._worklist_timer.timeout.connect(self._update_worklist_label)
 
         self._viewer.layers.selection.events.active.connect(self.on_layer_selected)
+        self._viewer.layers.events.removed.connect(self._on_layer_removed)
+
+    def _close(self):
+        """Flushes the autosave before closing the viewer."""
+        self._autosave(wait=True)
+        self._prefetcher.close()
+        super()._close()
 
     # Layer Handling
     def _clear_layers(self) -> None:
@@ -69,6 +168,13 @@ class LayerControls(BaseGUI):
         for layer_name in layer_names:
             if layer_name in self._viewer.layers:
                 self._viewer.layers.remove(layer_name)
+        # Prompts which are not submitted yet are gone with their layers
+        self.pending_prompts = []
+        self._update_pending_label()
+
+    def _update_pending_label(self) -> None:
+        """Shows the number of prompts waiting for the next batch prediction."""
+        self.pending_label.setText(f"Pending: {len(self.pending_prompts)}")
 
     def add_point_layer(self) -> None:
         """Adds a single point layer to the viewer."""
@@ -109,7 +215,7 @@ class LayerControls(BaseGUI):
 
     def add_scribble_layer(self) -> None:
         """Adds a scribble layer to the viewer with an initial blank data array."""
-        _data = np.zeros(self.session_cfg["shape"], dtype=np.uint8)
+        _data = self._buffer_pool.acquire()
         scribble_layer = ScribbleLayer(
             data=_data,
             name=self.scribble_layer_name,
@@ -145,33 +251,62 @@ class LayerControls(BaseGUI):
         lasso_layer.events.data.connect(self.on_interaction)
         self._viewer.add_layer(lasso_layer)
 
+    @property
+    def objects(self) -> ObjectRegistry:
+        """The registry of the objects of the current image."""
+        return self._object_registries.setdefault(self.session_cfg["name"], ObjectRegistry())
+
+    def _on_layer_removed(self, event: Any) -> None:
+        """
+        Forgets the object of a deleted layer, so it is not exported or autosaved anymore. The
+        buffer of a scribble layer is recycled.
+        """
+        for registry in self._object_registries.values():
+            registry.remove_layer(event.value)
+        if isinstance(event.value, ScribbleLayer) and self._buffer_pool is not None:
+            self._buffer_pool.release(event.value.data, event.value.painted_bbox(), known=True)
+
     def add_label_layer(self) -> None:
         """
-        Check if a layer with the layer_name already exists. If yes rename this by adding an index
-        and afterward create the layer
-        :return:
-        :rtype:
+        Check if a layer with the layer_name already exists. If yes finish its object by renaming
+        it after the object and unbinding its data, afterward create the layer for the next object.
         """
+        # Get the current object name from the dropdown (if any)
+        object_name = self.object_name_combo.currentText().strip()
         if self.label_layer_name in self._viewer.layers:
-            _index = determine_layer_index(
-                names=[layer.name for layer in self._viewer.layers if isinstance(layer, Labels)],
-                prefix="object ",
-                postfix=f" - {self.session_cfg['name']}",
-            )
             _layer = self._viewer.layers[self.label_layer_name]
-
-            # Get the current object name from the dropdown (if any)
-            object_name = self.object_name_combo.currentText().strip()
-            name_suffix = f" ({object_name})" if object_name else ""
-
-            _layer.name = f"object {_index}{name_suffix} - {self.session_cfg['name']}"
-            _layer.data = _layer.data.copy()
-            _index += 1
-        else:
-            _index = 0
-
+            record = self.objects.find(_layer)
+            if record is None:
+                _index = self.objects.next_index
+                record = self.objects.register(_index, _layer, object_name, self.colormap[_index])
+
+            record.finished = True
+            record.dirty = True
+            _layer.name = object_layer_name(record.index, record.name, self.session_cfg["name"])
+            # The coarse levels of the finished object get all changes which are not applied yet,
+            # including predictions of a session in a child process which were not collected yet
+            if self._label_pyramid is not None:
+                self._refresh_label_layer(self._drain_session_regions())
+            # The object is saved where the working buffer was written, the saved working object
+            # has to be cleared there as the next object starts empty
+            _extent = self._working_extent.pop()
+            self._mark_object(_layer, _extent or [[0, 0]] * self._data_result.ndim)
+            if _extent is not None:
+                self._working_changes.mark(_extent)
+            # The finished object keeps the working buffer, the next object gets a fresh one. The
+            # session has to be pointed at it before its interactions are reset.
+            self._data_result = self._buffer_pool.acquire()
+            if self._label_pyramid is not None:
+                self._label_pyramid = LabelPyramid(
+                    self._data_result, skip_axes=self._label_pyramid.skip_axes, empty=True
+                )
+        _index = self.objects.next_index
+        self.object_index = _index
+
+        _multiscale = self._label_pyramid is not None
         _layer_res = Labels(
-            self._data_result,
+            self._label_pyramid.levels if _multiscale else self._data_result,
+            multiscale=_multiscale,
             name=self.label_layer_name,
             opacity=0.3,
             affine=self.session_cfg["affine"],
@@ -185,6 +320,98 @@ class LayerControls(BaseGUI):
         _layer_res._source = self.session_cfg["source"]
 
         self._viewer.add_layer(_layer_res)
+        self.objects.register(_index, _layer_res, object_name, self.colormap[_index])
+        # The layer keeps its handlers once its object is finished
+        _layer_res.events.paint.connect(lambda event: self._on_object_changed(_layer_res, event))
+        _layer_res.events.data.connect(lambda *_: self._on_object_changed(_layer_res))
+
+    def add_object_layer(
+        self,
+        data: np.ndarray,
+        name: str = "",
+        index: Optional[int] = None,
+        region: Optional[List[List[int]]] = None,
+    ) -> ObjectRecord:
+        """
+        Adds a finished object, e.g. an imported class or an object of a resumed session.
+
+        Args:
+            data (np.ndarray): The mask of the object.
+            name (str, optional): The object name.
+            index (Optional[int], optional): The object id, the next free one by default.
+            region (Optional[List[List[int]]], optional): The region ([start, stop] per axis)
+                holding the object if known, only this region is autosaved.
+
+        Returns:
+            ObjectRecord: The record of the object.
+        """
+        _index = self.objects.next_index if index is None else index
+        _multiscale = self._label_pyramid is not None
+        if _multiscale:
+            data = LabelPyramid(data, skip_axes=self._label_pyramid.skip_axes).levels
+        _layer = Labels(
+            data,
+            multiscale=_multiscale,
+            name=object_layer_name(_index, name, self.session_cfg["name"]),
+            opacity=0.3,
+            affine=self.session_cfg["affine"],
+            scale=self.session_cfg["scale"],
+            translate=self.session_cfg["translate"],
+            rotate=self.session_cfg["rotate"],
+            shear=self.session_cfg["shear"],
+            colormap=self.colormap[_index],
+            metadata=self.session_cfg["metadata"],
+        )
+        _layer._source = self.session_cfg["source"]
+        self._viewer.add_layer(_layer)
+        record = self.objects.register(_index, _layer, name, self.colormap[_index])
+        record.finished = True
+        self._track_object_layer(_layer, region)
+        return record
+
+    def _raise_label_layer(self) -> None:
+        """Moves the label layer of the working object on top of all object layers."""
+        _layer = self._viewer.layers[self.label_layer_name]
+        self._viewer.layers.move(self._viewer.layers.index(_layer), len(self._viewer.layers))
+
+    def _move_working_object(self, index: int, name: Optional[str] = None) -> None:
+        """
+        Gives the working object another id and keeps its layer on top, e.g. after objects were
+        added in front of it.
+
+        Args:
+            index (int): The new object id.
+            name (Optional[str], optional): The object name, kept if None.
+        """
+        _layer = self._viewer.layers[self.label_layer_name]
+        if name is None:
+            _working = self.objects.find(_layer)
+            name = _working.name if _working is not None else ""
+        self.object_index = index
+        self.objects.register(index, _layer, name, self.colormap[index])
+        _layer.colormap = self.colormap[index]
+        self._raise_label_layer()
+
+    def _seed_points(self, layer: Any) -> np.ndarray:
+        """
+        Converts the points of a points layer into voxel coordinates of the session. Points of a
+        time series are only used in the current frame, points outside the image are dropped.
+
+        Args:
+            layer (Any): The points layer.
+
+        Returns:
+            np.ndarray: The seeds as (n, 3) integer coordinates.
+        """
+        _label_layer = self._viewer.layers[self.label_layer_name]
+        _points = np.array(
+            [_label_layer.world_to_data(layer.data_to_world(point)) for point in layer.data]
+        ).reshape(-1, _label_layer.ndim)
+        _points = np.round(_points).astype(int)
+        if self.session_cfg["time_series"]:
+            _points = _points[_points[:, 0] == self.frame][:, 1:]
+        _inside = np.all((_points >= 0) & (_points < self._session_result().shape), axis=1)
+        return _points[_inside]
 
     def add_mask_init_layer(self) -> None:
         """
@@ -195,7 +422,7 @@ class LayerControls(BaseGUI):
         """
 
         _layer_res = Labels(
-            np.zeros_like(self._data_result),
+            self._buffer_pool.acquire(),
             name=self.mask_init_layer_name,
             opacity=0.3,
             affine=self.session_cfg["affine"],
@@ -217,17 +444,28 @@ class LayerControls(BaseGUI):
         )  # Labels and Image should have same shape
 
         self._data_result = (_layer_data == self.class_for_init.value()).astype(np.uint8)
-        self.session.set_target_buffer(self._data_result)
+        self._working_extent.mark([[0, int(s)] for s in self._data_result.shape])
+        self.session.set_target_buffer(self._session_result())
         self._viewer.layers[self.label_layer_name].data = self._data_result
 
     # Event Handlers
-    def on_init(self, *args, **kwargs) -> None:
+    def on_init(self, *args, **kwargs) -> bool:
         """
         Initializes the session by configuring the selected model and image and creating a label layer.
 
         Retrieves the selected model and image names from the GUI, extracts relevant data from the
-        image layer, and creates a corresponding label layer in the viewer.
+        image layer, and creates a corresponding label layer in the viewer. If the checkpoint is not
+        downloaded yet, the download is started in the background and the initialization continues
+        once it finished.
+
+        Returns:
+            bool: False if the initialization waits for the download of the checkpoint or the
+                image is too large to be loaded.
         """
+        if self._download_timer.isActive():
+            # Initialize is called again once the running download finished
+            return False
+
         # --- MODEL HANDLING --- #
         # Get all model and image from the GUI
         image_name = self.image_selection.currentText()
@@ -237,30 +475,52 @@ class LayerControls(BaseGUI):
 
         model_name = self.model_selection.currentText()
         model_name_local = self.model_selection_local.text()
-        if model_name_local != "" and Path(model_name_local).exists():
+        if self.backend_selection.currentText() == "Server":
+            # The server holds the model
+            self.checkpoint_path = None
+        elif model_name_local != "" and Path(model_name_local).exists():
             # Use Local Checkpoint
             model_name = Path(model_name_local).name
             self.checkpoint_path = model_name_local
         else:
             # Download Checkpoint
-            repo_id = "nnInteractive/nnInteractive"
-            force_download = False
-            download_path = snapshot_download(
-                repo_id=repo_id, allow_patterns=[f"{model_name}/*"], force_download=force_download
-            )
-            self.checkpoint_path = Path(download_path).joinpath(model_name)
+            self.checkpoint_path = cached_checkpoint(model_name)
+            if self.checkpoint_path is None:
+                self._start_download(model_name)
+                return False
         print(f"Using Model {model_name} at : {self.checkpoint_path}")
 
         # --- DATA HANDLING --- #
         # Get everything we need from the image layer
         image_layer = self._viewer.layers[image_name]
+        _time_series = is_time_series(image_layer.ndim, getattr(image_layer, "rgb", False))
+
+        # Multiscale images are segmented on one resolution level, only this level is loaded
+        _levels = pyramid_levels(image_layer)
+        if self.level_selection.currentText() == "auto":
+            _level = select_level(_levels, skip_axes=1 if _time_series else 0)
+        else:
+            _level = min(int(self.level_selection.currentText().split(":")[0]), len(_levels) - 1)
+        # The session reads the whole level (or frame) into memory, which is refused for lazily
+        # loaded images without a small enough level instead of running out of memory
+        _voxels = np.prod(_levels[_level].shape[1 if _time_series else 0 :], dtype=np.int64)
+        if not isinstance(_levels[_level], np.ndarray) and _voxels > MAX_SESSION_VOXELS:
+            show_warning(
+                f"{image_name} is loaded lazily and its resolution level {_level} has {_voxels} "
+                f"voxels, more than the session can load ({MAX_SESSION_VOXELS}). Please add a "
+                "multiscale image or a cropped region of the image."
+            )
+            return False
+
         self.source_cfg = {
             "name": image_name,
             "model": model_name,
             "ndim": image_layer.ndim,
-            "shape": image_layer.data.shape,
+            "shape": _levels[_level].shape,
+            "level": _level,
+            "chunks": source_chunks(_levels[_level]),
             "affine": image_layer.affine,
-            "scale": image_layer.scale,
+            "scale": np.asarray(image_layer.scale) * downsample_factors(_levels, _level),
             "translate": image_layer.translate,
             "rotate": image_layer.rotate,
             "shear": image_layer.shear,
@@ -269,6 +529,11 @@ class LayerControls(BaseGUI):
         }
 
         self.session_cfg = self.source_cfg.copy()
+        # A 4D image is a time series, the session works on one 3D frame at a time
+        self.session_cfg["time_series"] = _time_series
+        self.frame = 0
+        if self.session_cfg["time_series"]:
+            self.frame = int(self._viewer.dims.current_step[0])
         # Store original dimensionality and affine for export
         self.session_cfg["ndim_source"] = self.source_cfg["ndim"]
         self.session_cfg["affine_source"] = self.source_cfg["affine"]
@@ -344,18 +609,179 @@ class LayerControls(BaseGUI):
             self.session_cfg["affine"].scale
         )
 
-        # Create the target label array and layer
-        self._data_result = np.zeros(self.session_cfg["shape"], dtype=np.uint8)
+        # Create the target label array and layer, a child process writes it in shared memory
+        _shared = self.backend_selection.currentText() == "Child process"
+        self._buffer_pool = BufferPool(
+            self.session_cfg["shape"], allocate=shared_zeros if _shared else np.zeros
+        )
+        self._data_result = self._buffer_pool.acquire()
+        self._working_extent.pop()
+
+        # Multiscale labels keep lower resolution levels, updated where predictions change them
+        self._label_pyramid = None
+        if self.multiscale_labels_ckbx.isChecked():
+            self._label_pyramid = LabelPyramid(
+                self._data_result, skip_axes=1 if self.session_cfg["time_series"] else 0
+            )
 
         # Add Layer
         self.add_label_layer()
 
         # Lock the Session
         self._lock_session()
+        self.propagate_frames_button.setEnabled(self.session_cfg["time_series"])
+
+        # Every session gets a fresh autosave, older ones stay available for resuming
+        self._start_autosave()
+        return True
+
+    def _start_download(self, model_name: str) -> None:
+        """
+        Downloads a checkpoint in a background thread, the viewer stays usable meanwhile. Once the
+        download finished the session is initialized with the then selected image.
+        """
+        self._download_cancelled = False
+
+        @thread_worker
+        def _download():
+            from huggingface_hub.utils import build_hf_headers
+
+            _files = list_checkpoint_files(model_name)
+            self._downloader = CheckpointDownloader(
+                _files, checkpoint_dir(model_name), headers=build_hf_headers()
+            )
+            if self._download_cancelled:
+                raise DownloadCancelled()
+            return self._downloader.run()
+
+        def _finished(path):
+            self._stop_download()
+            print(f"Downloaded Model {model_name} to : {path}")
+            self.on_init()
+
+        def _errored(e):
+            self._stop_download()
+            if not isinstance(e, DownloadCancelled):
+                show_warning(f"Downloading {model_name} failed, it resumes on retry: {str(e)}")
+
+        worker = _download()
+        worker.returned.connect(_finished)
+        worker.errored.connect(_errored)
+
+        self.init_button.setEnabled(False)
+        self.download_label.setText(f"Downloading {model_name}...")
+        self.download_progress.setValue(0)
+        for _widget in (self.download_progress, self.download_cancel_btn, self.download_label):
+            _widget.setVisible(True)
+        self._download_timer.start()
+        worker.start()
+
+    def _poll_download(self) -> None:
+        """Shows the progress of the running download."""
+        if self._downloader is None:
+            return
+        _file, _file_done, _file_size, _done, _total = self._downloader.progress()
+        _mb = 2**20
+        if _total > 0:
+            self.download_progress.setValue(int(1000 * _done / _total))
+        _text = f"Downloading: {_done / _mb:.0f} / {_total / _mb:.0f} MB"
+        if _file is not None and _file_size > 0:
+            _text += f"\n{_file}: {_file_done / _mb:.0f} / {_file_size / _mb:.0f} MB"
+        self.download_label.setText(_text)
+
+    def _stop_download(self) -> None:
+        """Hides the download progress once a download finished, failed or was cancelled."""
+        self._download_timer.stop()
+        self._downloader = None
+        for _widget in (self.download_progress, self.download_cancel_btn, self.download_label):
+            _widget.setVisible(False)
+        self.init_button.setEnabled(True)
+
+    def on_cancel_download(self, *args, **kwargs) -> None:
+        """Cancels the running download, the downloaded part is kept and continued on retry."""
+        self._download_cancelled = True
+        if self._downloader is not None:
+            self._downloader.cancel()
+        self.download_label.setText("Cancelling download...")
+
+    def _session_image(self) -> Any:
+        """Returns the (lazily loaded) image of the session at the selected resolution level."""
+        _layer = self._viewer.layers[self.session_cfg["name"]]
+        return pyramid_levels(_layer)[self.session_cfg["level"]]
+
+    def _session_result(self) -> DirtyTrackingArray:
+        """
+        Returns the part of the current object the session predicts, i.e. the current frame.
+        Writes are recorded to update the lower resolution levels and the autosave.
+        """
+        if self.session_cfg is not None and self.session_cfg.get("time_series"):
+            return self._frame_result(self.frame)
+        view = self._data_result.view(DirtyTrackingArray)
+        view.listener = self._mark_working
+        return view
+
+    def _frame_result(self, frame: int) -> DirtyTrackingArray:
+        """Returns a frame of the current object of a time series, writes are recorded."""
+        view = self._data_result[frame].view(DirtyTrackingArray)
+        view.listener = lambda region: self._mark_working([[frame, frame + 1]] + list(region))
+        return view
+
+    def _mark_working(self, region: Sequence[Sequence[int]]) -> None:
+        """
+        Records a changed region of the working object ([start, stop] per axis) for the label
+        pyramid and the autosave. Called from any thread that writes into the working object.
+        """
+        if self._label_pyramid is not None:
+            self._label_pyramid.mark(region)
+        self._working_changes.mark(region)
+        self._working_extent.mark(region)
+
+    def _drain_session_regions(self) -> List[Tuple[slice, ...]]:
+        """
+        Waits for running predictions and returns the regions of the target buffer they changed
+        which were not collected yet. Only sessions in another process report regions.
+        """
+        return []
+
+    def _refresh_label_layer(self, regions: Sequence[Tuple[slice, ...]] = (), full=False) -> None:
+        """
+        Shows changes of the working object. The lower resolution levels of multiscale labels are
+        updated where the session wrote into its target buffer.
+
+        Args:
+            regions (Sequence[Tuple[slice, ...]], optional): Further changed regions of the target
+                buffer, e.g. written by another process.
+            full (bool, optional): The whole object changed, e.g. when it was cleared.
+        """
+        if full:
+            self._mark_working([[0, int(s)] for s in self._data_result.shape])
+        _prefix = [[self.frame, self.frame + 1]] if self.session_cfg["time_series"] else []
+        for region in regions:
+            self._mark_working(_prefix + pyramid_region(region))
+        if self._label_pyramid is not None:
+            self._label_pyramid.update()
+        if self.label_layer_name in self._viewer.layers:
+            self._viewer.layers[self.label_layer_name].refresh()
+
+    def on_image_selected(self):
+        """Lists the resolution levels of the selected image"""
+        super().on_image_selected()
+        _name = self.image_selection.currentText()
+        _levels = pyramid_levels(self._viewer.layers[_name]) if _name in self._viewer.layers else []
+
+        self.level_selection.blockSignals(True)
+        self.level_selection.clear()
+        self.level_selection.addItems(
+            ["auto"] + [f"{i}: {tuple(data.shape)}" for i, data in enumerate(_levels)]
+        )
+        self.level_selection.blockSignals(False)
 
     def on_reset_interactions(self):
         """Reset only the current interaction"""
         super().on_reset_interactions()
+        self.prompt_history = [p for p in self.prompt_history if p["object"] != self.object_index]
+        _masks = {p["data"].get("mask") for p in self.prompt_history if isinstance(p["data"], dict)}
+        self._prompt_masks = {k: v for k, v in self._prompt_masks.items() if k in _masks}
         self.on_layer_selected()
 
     def on_next(self) -> None:
@@ -419,7 +845,7 @@ class LayerControls(BaseGUI):
     def on_run(self):
         if self.session is not None:
             self.session._predict()
-            self._viewer.layers[self.label_layer_name].refresh()
+            self._refresh_label_layer()
 
     def on_interaction(self, event: Any):
         if (
@@ -464,10 +890,31 @@ class LayerControls(BaseGUI):
             f"Inference for interaction {index} and prompt {self.prompt_button.index == 0} and valid data {data is not None} "
         )
 
-    def _export(self) -> None:
+    def _select_output_dir(self) -> str:
+        """Asks for an output directory, returns an empty string if the dialog was cancelled."""
+        _dialog = QFileDialog(self)
+        _dialog.setDirectory(os.getcwd())
+
+        return _dialog.getExistingDirectory(
+            self,
+            "Select an Output Directory",
+            options=QFileDialog.DontUseNativeDialog | QFileDialog.ShowDirsOnly,
+        )
+
+    def _export(
+        self, *args, output_dir: Optional[str] = None, reset: bool = True
+    ) -> Optional[Path]:
         """Export all Label layers belonging to the current image & model pair.
         When the 'Export as separate OME-Zarr files' option is checked (default),
-        exports ONLY as OME-Zarr files. When unchecked, exports in the original format."""
+        exports ONLY as OME-Zarr files. When unchecked, exports in the original format.
+
+        Args:
+            output_dir (Optional[str], optional): The output directory, asked for if None.
+            reset (bool, optional): Reset all after the export if this is enabled in the GUI.
+
+        Returns:
+            Optional[Path]: The directory the objects were exported to, None if nothing was.
+        """
         _img_layer = self._viewer.layers[self.session_cfg["name"]]
 
         # Handle cases where the image might not have a source path
@@ -481,17 +928,10 @@ class LayerControls(BaseGUI):
             _output_file = _img_file
             _dtype = ""
 
-        _dialog = QFileDialog(self)
-        _dialog.setDirectory(os.getcwd())
-
-        _output_dir = _dialog.getExistingDirectory(
-            self,
-            "Select an Output Directory",
-            options=QFileDialog.DontUseNativeDialog | QFileDialog.ShowDirsOnly,
-        )
+        _output_dir = self._select_output_dir() if output_dir is None else output_dir
 
         if _output_dir == "":
-            return
+            return None
 
         elif Path(_output_dir).is_dir():
             _output_dir = Path(_output_dir).joinpath(f"{_output_file}_nnInteractive")
@@ -500,59 +940,78 @@ class LayerControls(BaseGUI):
             # Check if we should export as separate OME-Zarr files
             export_as_omezarr = self.separate_omezarr_ckbx.isChecked()
 
-            for _layer in self._viewer.layers:
-                if self.label_layer_name == _layer.name:
-                    _index = determine_layer_index(
-                        names=[
-                            layer.name for layer in self._viewer.layers if isinstance(layer, Labels)
-                        ],
-                        prefix="object ",
-                        postfix=f" - {self.session_cfg['name']}",
-                    )
-                    # No object name for the current working layer
-                    object_name = ""
-                elif _layer.name.startswith("object ") and _layer.name.endswith(
-                    f" - {self.session_cfg['name']}"
-                ):
-                    # Extract the object index and possibly the object name
-                    layer_name_part = _layer.name.replace(f" - {self.session_cfg['name']}", "")
-                    # Check if there's an object name in parentheses
-                    if " (" in layer_name_part and ")" in layer_name_part:
-                        base_part = layer_name_part.split(" (")[0].strip()
-                        name_part = layer_name_part.split(" (")[1].split(")")[0]
-                        try:
-                            _index = int(base_part.replace("object ", ""))
-                            object_name = name_part
-                        except ValueError:
-                            # If we can't convert to int, skip this layer
-                            continue
-                    else:
-                        try:
-                            _index = int(layer_name_part.replace("object ", ""))
-                            object_name = ""
-                        except ValueError:
-                            # If we can't convert to int, skip this layer
-                            continue
-                else:
-                    continue
+            _objects = self._current_objects()
+
+            # NIfTI masks are collected and written directly, compressed and in parallel
+            _write_nifti = not export_as_omezarr and is_nifti(_dtype)
+            _nifti_writer = None
+            _nifti_files = []
 
+            # Objects which did not change since the last export into this folder are skipped
+            _manifest = ExportManifest(_output_dir)
+            _skipped = 0
+
+            for record in _objects:
+                _index, object_name, _layer = record.index, record.name, record.layer
                 # Add object name to filename if it exists
                 name_suffix = f"_{object_name}" if object_name else ""
 
                 # reverse the corrections for non-orthogonal data and convert dummy 3d back to 2d
-                _data = _layer.data[0] if self.session_cfg["ndim_source"] == 2 else _layer.data
+                _data = label_data(_layer)
+                _data = _data[0] if self.session_cfg["ndim_source"] == 2 else _data
+                _full_shape = _data.shape
+
+                # Crop to the bounding box, the offset keeps the crop in place in world space
+                _offset = None
+                if self.crop_export_ckbx.isChecked() and record.bbox is not None:
+                    _bbox = record.bbox[-_data.ndim :]
+                    _bbox = expand_bbox(_bbox, self.crop_margin.value(), _data.shape)
+                    _data = _data[_bbox]
+                    _offset = np.array([sl.start for sl in _bbox])
+                _translate = self._export_translate(_offset)
+
+                # Fingerprint the chunks (the chunks of the OME-Zarr store) to detect changes
+                _chunks = normalize_chunks(
+                    _data.shape, self.session_cfg["chunks"] or (128, 128, 128)
+                )
+                _fingerprints = chunk_fingerprints(_data, _chunks)
+                _signature = {
+                    "shape": [int(s) for s in _data.shape],
+                    "chunks": list(_chunks),
+                    "offset": None if _offset is None else [int(o) for o in _offset],
+                }
+                _info = {"index": _index, "name": object_name}
+
+                if _write_nifti:
+                    if _nifti_writer is None:
+                        _nifti_writer = self._nifti_writer(_full_shape, _img_layer)
+                    _file_name = (
+                        f"{_output_file}_{str(_index).zfill(4)}{name_suffix}{_nifti_writer.suffix}"
+                    )
+                    _signature["format"] = f"nifti-{_nifti_writer.level}"
+                    _changed = _manifest.changed_chunks(_file_name, _signature, _fingerprints)
+                    if _changed is not None and not _changed.any():
+                        _skipped += 1
+                        continue
+                    _nifti_files.append((Path(_output_dir).joinpath(_file_name), _data, _offset))
+                    _manifest.update(_file_name, _signature, _fingerprints, **_info)
 
                 # Save in original format only if zarr export is not enabled
-                if not export_as_omezarr:
+                elif not export_as_omezarr:
                     _file_name = f"{_output_file}_{str(_index).zfill(4)}{name_suffix}{_dtype}"
                     _file = str(Path(_output_dir).joinpath(_file_name))
+                    _signature["format"] = _dtype
+                    _changed = _manifest.changed_chunks(_file_name, _signature, _fingerprints)
+                    if _changed is not None and not _changed.any():
+                        _skipped += 1
+                        continue
 
                     _layer_temp = Labels(
                         _data,
                         name="_temp",
                         affine=self.session_cfg["affine_source"],
                         scale=self.source_cfg["scale"],
-                        translate=self.source_cfg["translate"],
+                        translate=_translate,
                         rotate=self.source_cfg["rotate"],
                         shear=self.source_cfg["shear"],
                         metadata=self.source_cfg["metadata"],
@@ -564,6 +1023,7 @@ class LayerControls(BaseGUI):
 
                     _layer_temp.save(_file)
                     del _layer_temp
+                    _manifest.update(_file_name, _signature, _fingerprints, **_info)
 
                 # If OME-Zarr export is enabled, export each object as a separate OME-Zarr file
                 if export_as_omezarr:
@@ -571,25 +1031,40 @@ class LayerControls(BaseGUI):
                         import zarr
                         import numpy as np
 
-                        # Create a binary mask for the current object (all non-zero values are set to 1)
-                        binary_mask = (_data > 0).astype(np.uint8)
-
                         # Create OME-Zarr file path with object name if it exists
                         _zarr_file_name = f"{_output_file}_{str(_index).zfill(4)}{name_suffix}.zarr"
                         _zarr_path = Path(_output_dir).joinpath(_zarr_file_name)
 
-                        # Create the zarr store with proper OME-Zarr v0.4 structure
-                        root = zarr.open(str(_zarr_path), mode='w')
-
-                        # Save the binary mask directly at the root level as "labels" array
-                        # napari expects the data at this level
-                        chunk_size = (128, 128, 128) if len(binary_mask.shape) == 3 else (128, 128)
-                        mask_dataset = root.create_dataset(
-                            '0',  # Use '0' as the main image dataset name
-                            data=binary_mask,
-                            chunks=chunk_size,
-                            dtype=np.uint8
+                        _signature["format"] = "ome-zarr"
+                        _changed = _manifest.changed_chunks(
+                            _zarr_file_name, _signature, _fingerprints
                         )
+                        if _changed is not None and not _changed.any():
+                            _skipped += 1
+                            continue
+
+                        if _changed is None:
+                            # Binary mask of the current object (all non-zero values are set to 1)
+                            binary_mask = (_data > 0).astype(np.uint8)
+
+                            # Create the zarr store with proper OME-Zarr v0.4 structure
+                            root = zarr.open(str(_zarr_path), mode='w')
+
+                            # Save the binary mask directly at the root level as "labels" array
+                            # napari expects the data at this level
+                            # Follow the chunks of the source so both can be read block by block
+                            mask_dataset = root.create_dataset(
+                                '0',  # Use '0' as the main image dataset name
+                                data=binary_mask,
+                                chunks=_chunks,
+                                dtype=np.uint8
+                            )
+                        else:
+                            # Only the chunks which changed since the last export are rewritten
+                            root = zarr.open(str(_zarr_path), mode='r+')
+                            mask_dataset = root['0']
+                            for _sl in compress(chunk_slices(_data.shape, _chunks), _changed):
+                                mask_dataset[_sl] = (_data[_sl] > 0).astype(np.uint8)
 
                         # Add OME-Zarr metadata including object name if it exists
                         layer_display_name = f"Object {_index}"
@@ -603,7 +1078,7 @@ class LayerControls(BaseGUI):
 
                         # Add coordinate metadata
                         axes = []
-                        if len(binary_mask.shape) == 3:
+                        if _data.ndim == 3:
                             axes = [
                                 {'name': 'z', 'type': 'space'},
                                 {'name': 'y', 'type': 'space'},
@@ -615,14 +1090,22 @@ class LayerControls(BaseGUI):
                                 {'name': 'x', 'type': 'space'}
                             ]
 
+                        # Place the mask (or its crop) in world space
+                        _scale = [float(s) for s in self.source_cfg["scale"]]
+                        _transforms = [
+                            {"type": "scale", "scale": _scale},
+                            {"type": "translation", "translation": [float(t) for t in _translate]},
+                        ]
+
                         multiscales = [{
                             'version': '0.4',
                             'name': layer_display_name,
                             'axes': axes,
-                            'datasets': [{'path': '0'}]
+                            'datasets': [{'path': '0', 'coordinateTransformations': _transforms}]
                         }]
 
                         root.attrs['multiscales'] = multiscales
+                        _manifest.update(_zarr_file_name, _signature, _fingerprints, **_info)
 
                     except ImportError:
                         from napari.utils.notifications import show_warning
@@ -633,40 +1116,488 @@ class LayerControls(BaseGUI):
                     except Exception as e:
                         from napari.utils.notifications import show_warning
                         show_warning(f"Error exporting OME-Zarr file: {str(e)}")
+                        # The store might be incomplete, it is written again next time
+                        _manifest.files.pop(_zarr_file_name, None)
+
+            if _nifti_files:
+                try:
+                    _nifti_writer.write_all(_nifti_files)
+                except Exception as e:
+                    show_warning(f"Error exporting NIfTI files: {str(e)}")
+                    # Nothing is known about the written files, they are written again next time
+                    for _file, _, _ in _nifti_files:
+                        _manifest.files.pop(_file.name, None)
+
+            _manifest.save()
+            print(
+                f"Exported {len(_objects) - _skipped} objects to {_output_dir}, "
+                f"skipped {_skipped} unchanged objects"
+            )
+
+            # The measurements are written next to the exported files
+            _measurements = self._measure(_objects)
+            write_measurements(_measurements, _output_dir, self._measure_spacing())
+            self._show_measurements(_measurements)
 
             # Check if reset after export is enabled
-            if hasattr(self, 'reset_after_export_ckbx') and self.reset_after_export_ckbx.isChecked():
+            if (
+                reset
+                and hasattr(self, 'reset_after_export_ckbx')
+                and self.reset_after_export_ckbx.isChecked()
+            ):
                 self.on_reset_all()
+            return _output_dir
+        return None
+
+    def _current_objects(self) -> List[ObjectRecord]:
+        """Returns the records of all finished objects followed by the working object."""
+        _objects = self.objects.finished()
+        _working = self.objects.get(self.object_index)
+        if _working is not None and not _working.finished:
+            # Predictions write into the working layer without events
+            _working.dirty = True
+            _objects.append(_working)
+        return _objects
+
+    def _measure_spacing(self) -> np.ndarray:
+        """
+        The spatial voxel spacing of the source image, without the dummy axis of 2D images and
+        the time axis of time series.
+        """
+        _spacing = np.asarray(self.session_cfg["spacing"], dtype=np.float64)
+        if self.session_cfg["ndim_source"] == 2 or self.session_cfg["time_series"]:
+            return _spacing[1:]
+        return _spacing
+
+    def _measure(self, records: List[ObjectRecord]) -> List[Dict[str, Any]]:
+        """Measures objects in the voxel space of the source image."""
+        measurements = measure_objects(records, self._measure_spacing())
+        if self.session_cfg["ndim_source"] == 2:
+            # Drop the dummy axis, it has no spacing and does not count towards the volume
+            for _measurement in measurements:
+                for _key in ("centroid", "bbox_start", "bbox_stop"):
+                    if _measurement[_key] is not None:
+                        _measurement[_key] = _measurement[_key][1:]
+        return measurements
+
+    def on_measure(self, *args, **kwargs) -> None:
+        """Measures all objects of the current session and shows the results in the table."""
+        if self.session_cfg is None:
+            return
+        self._show_measurements(self._measure(self._current_objects()))
+
+    def _show_measurements(self, measurements: List[Dict[str, Any]]) -> None:
+        """Fills the measurement table, numbers are stored as numbers so columns sort correctly."""
+        self.measurement_table.setSortingEnabled(False)
+        self.measurement_table.setRowCount(len(measurements))
+        for row, _measurement in enumerate(measurements):
+            _centroid = _measurement["centroid"]
+            _values = [
+                _measurement["index"],
+                _measurement["name"],
+                _measurement["voxels"],
+                _measurement["volume"],
+                "" if _centroid is None else ", ".join(f"{c:.1f}" for c in _centroid),
+            ]
+            for column, value in enumerate(_values):
+                item = QTableWidgetItem()
+                item.setData(Qt.DisplayRole, value)
+                self.measurement_table.setItem(row, column, item)
+        self.measurement_table.setSortingEnabled(True)
+
+    def _export_translate(self, offset: Optional[np.ndarray]) -> np.ndarray:
+        """
+        Returns the translation of an exported mask, which moves a crop starting at the voxel
+        offset to the position it had in the full volume.
+
+        Args:
+            offset (Optional[np.ndarray]): The voxel offset of the crop, None if it is not cropped.
+        """
+        _translate = np.asarray(self.source_cfg["translate"], dtype=np.float64)
+        if offset is None:
+            return _translate
+        _linear = Affine(
+            scale=self.source_cfg["scale"],
+            rotate=self.source_cfg["rotate"],
+            shear=self.source_cfg["shear"],
+        ).linear_matrix
+        return _translate + _linear @ offset
+
+    def _nifti_writer(self, shape: Tuple[int, ...], image_layer: Any) -> NiftiLabelWriter:
+        """
+        Prepares the writer of exported NIfTI masks. The header of the source image is reused if it
+        is a NIfTI file, otherwise the header is built from the transforms of the source image.
+
+        Args:
+            shape (Tuple[int, ...]): The shape of the exported masks.
+            image_layer (Any): The source image layer.
+        """
+        _transform = Affine(
+            scale=self.source_cfg["scale"],
+            translate=self.source_cfg["translate"],
+            rotate=self.source_cfg["rotate"],
+            shear=self.source_cfg["shear"],
+        )
+        _affine = self.session_cfg["affine_source"].affine_matrix @ _transform.affine_matrix
+        return NiftiLabelWriter(
+            shape,
+            nifti_affine(_affine),
+            source_path=getattr(getattr(image_layer, "source", None), "path", None),
+            level=NIFTI_COMPRESSION[self.nifti_compression.currentText()],
+        )
 
     def on_object_name_selected(self, text=None, *args, **kwargs) -> None:
         """
-        Updates the name of the current label layer when a new object name is selected.
+        Updates the name of the current object when a new object name is selected. The working
+        layer keeps its name, the object name is part of the layer name once the object is finished.
         """
-        if self.label_layer_name in self._viewer.layers:
+        if self.session_cfg is None:
+            return
+        record = self.objects.get(self.object_index)
+        if record is not None and not record.finished:
             # If text is provided by the signal, use it, otherwise get from combobox
-            object_name = text if text is not None else self.object_name_combo.currentText().strip()
+            object_name = text if text is not None else self.object_name_combo.currentText()
+            record.name = object_name.strip()
+
+    # Worklist
+    def on_load_worklist(self, *args, **kwargs) -> None:
+        """Loads the worklist and opens its first case, the next case is read in the background."""
+        _path = self.worklist_path.text().strip()
+        if _path == "":
+            show_warning("No worklist selected")
+            return
+        try:
+            _cases = load_worklist(_path)
+        except OSError as e:
+            show_warning(f"Could not load the worklist: {str(e)}")
+            return
+        if not _cases:
+            show_warning(f"The worklist {_path} contains no images")
+            return
 
-            # Get the current layer's name
-            current_layer = self._viewer.layers[self.label_layer_name]
+        self._prefetcher.discard()
+        self._worklist = _cases
+        self._worklist_index = -1
+        print(f"Loaded worklist with {len(_cases)} cases from {_path}")
+        self._open_case(0)
 
-            # If the layer is still using the default name, don't modify it
-            if current_layer.name == self.label_layer_name:
+    def on_export_next(self, *args, **kwargs) -> None:
+        """Exports the objects of the current case and switches to the prefetched next case."""
+        if not self._worklist:
+            show_warning("No worklist loaded")
+            return
+        _output_dir = self.worklist_output.text().strip()
+        if _output_dir == "":
+            _output_dir = self._select_output_dir()
+            if _output_dir == "":
                 return
+            self.worklist_output.setText(_output_dir)
 
-            # Parse the current layer name to extract the index
-            layer_name_part = current_layer.name.replace(f" - {self.session_cfg['name']}", "")
+        if self._export(output_dir=_output_dir, reset=False) is None:
+            show_warning(f"Could not export to {_output_dir}")
+            return
+        self._open_case(self._worklist_index + 1)
 
-            # Extract the base part (with "object" and the index)
-            if " (" in layer_name_part and ")" in layer_name_part:
-                base_part = layer_name_part.split(" (")[0].strip()
-            else:
-                base_part = layer_name_part.strip()
+    def _open_case(self, index: int) -> bool:
+        """
+        Replaces the layers of the current case with a case of the worklist and initializes the
+        session on it. The inference session is kept, only its image is exchanged. Cases which
+        can not be read are skipped.
 
-            # Create the new name with or without the object name
-            if object_name:
-                new_name = f"{base_part} ({object_name}) - {self.session_cfg['name']}"
+        Args:
+            index (int): The index of the case in the worklist.
+
+        Returns:
+            bool: False if the worklist is finished.
+        """
+        _case = None
+        while index < len(self._worklist):
+            try:
+                # Waits only if the case is still being read
+                _case = self._prefetcher.get(self._worklist[index])
+                break
+            except Exception as e:
+                show_warning(f"Skipping case {self._worklist[index]}: {str(e)}")
+                index += 1
+
+        self._close_case()
+        self._worklist_index = index
+        if _case is None:
+            self._worklist_timer.stop()
+            self.worklist_label.setText(f"Worklist finished ({len(self._worklist)} cases)")
+            print("Worklist finished")
+            return False
+
+        _layer_data, _plugin = _case
+        _path = self._worklist[index]
+        with layer_source(path=str(_path), reader_plugin=_plugin):
+            self._case_layers = [Layer.create(*layer_tuple) for layer_tuple in _layer_data]
+        for layer in self._case_layers:
+            self._viewer.add_layer(layer)
+
+        # The following case is read while this one is annotated
+        if index + 1 < len(self._worklist):
+            self._prefetcher.prefetch(self._worklist[index + 1])
+            self._worklist_timer.start()
+        self._update_worklist_label()
+
+        _images = [layer for layer in self._case_layers if isinstance(layer, Image)]
+        if not _images:
+            show_warning(f"{_path} contains no image")
+            return True
+        self.image_selection.setCurrentText(_images[0].name)
+        self.on_init()
+        return True
+
+    def _close_case(self) -> None:
+        """Writes the autosave of the current case and removes its image and object layers."""
+        self._autosave(wait=True)
+        self._stop_autosave()
+        _layers = list(self._case_layers)
+        if self.session_cfg is not None:
+            _layers += [record.layer for record in self.objects]
+        self._clear_layers()
+        for layer in _layers:
+            if layer in self._viewer.layers:
+                self._viewer.layers.remove(layer)
+        self._case_layers = []
+
+    def _update_worklist_label(self) -> None:
+        """Shows the current case and if the next case is read already."""
+        if not 0 <= self._worklist_index < len(self._worklist):
+            return
+        _text = (
+            f"Case {self._worklist_index + 1}/{len(self._worklist)}: "
+            f"{self._worklist[self._worklist_index].name}"
+        )
+        if self._worklist_index + 1 < len(self._worklist):
+            if self._prefetcher.is_ready(self._worklist[self._worklist_index + 1]):
+                _text += " (next case ready)"
+                self._worklist_timer.stop()
             else:
-                new_name = f"{base_part} - {self.session_cfg['name']}"
+                _text += " (reading next case)"
+        self.worklist_label.setText(_text)
+
+    # Autosave
+    def on_autosave_ckbx(self, *args, **kwargs) -> None:
+        """Starts or stops the autosave timer based on the autosave settings."""
+        if self.autosave_ckbx.isChecked() and self._autosaver is not None:
+            self._autosave_timer.start(self.autosave_interval.value() * 1000)
+        else:
+            self._autosave_timer.stop()
+
+    def _start_autosave(self) -> None:
+        """Creates a new autosave for the current session."""
+        self._stop_autosave()
+        cleanup_sessions(self.session_cfg["name"], keep=3)
+        self._autosaver = SessionAutosaver(
+            self.session_cfg["name"], chunks=self.session_cfg["chunks"] or (64, 64, 64)
+        )
+        self._autosave_dirty = {}
+        # The new autosave starts empty, the working object is saved wherever it was written
+        self._working_changes.pop()
+        _extent = self._working_extent.pop()
+        if _extent is not None:
+            self._working_changes.mark(_extent)
+            self._working_extent.mark(_extent)
+        self.prompt_history = []
+        self._prompt_masks = {}
+        self._prompt_mask_count = 0
+        self.on_autosave_ckbx()
+
+    def _stop_autosave(self) -> None:
+        """Stops the autosave timer and waits until the last save is written."""
+        self._autosave_timer.stop()
+        if self._autosaver is not None:
+            self._autosaver.close()
+            self._autosaver = None
+
+    def _track_object_layer(self, layer: Labels, region: Optional[List[List[int]]] = None) -> None:
+        """
+        Marks an object layer as changed for the autosave now and whenever its data changes.
 
-            # Update the layer name
-            current_layer.name = new_name
+        Args:
+            layer (Labels): The object layer.
+            region (Optional[List[List[int]]], optional): The region holding the object, the whole
+                object is saved if None.
+        """
+        self._mark_object(layer, region)
+        layer.events.paint.connect(lambda event: self._on_object_changed(layer, event))
+        layer.events.data.connect(lambda *_: self._on_object_changed(layer))
+
+    def _mark_object(self, layer: Labels, region: Optional[List[List[int]]] = None) -> None:
+        """Records a changed region of an object layer for the autosave, None if all changed."""
+        _layer_id = id(layer)
+        if _layer_id in self._autosave_dirty and self._autosave_dirty[_layer_id] is None:
+            return
+        if region is None or _layer_id not in self._autosave_dirty:
+            self._autosave_dirty[_layer_id] = region
+        else:
+            self._autosave_dirty[_layer_id] = merge_regions(self._autosave_dirty[_layer_id], region)
+
+    def _on_object_changed(self, layer: Labels, event: Any = None) -> None:
+        """
+        Marks the autosave and the statistics of an edited object layer as outdated. Painting only
+        marks the painted region, replacing the data marks the whole object.
+        """
+        _region = painted_region(event, layer.ndim) if event is not None else None
+        record = self.objects.find(layer) if self.session_cfg is not None else None
+        if record is not None:
+            record.dirty = True
+        if record is not None and not record.finished:
+            self._mark_working(_region or [[0, int(s)] for s in self._data_result.shape])
+        else:
+            self._mark_object(layer, _region)
+
+    def _record_prompt(
+        self, kind: str, positive: bool, data: Any, index: Optional[int] = None
+    ) -> None:
+        """
+        Appends an interaction to the prompt history of an object.
+
+        Args:
+            kind (str): The interaction type (point, bbox, scribble, lasso or initial_seg).
+            positive (bool): If the interaction is positive or negative.
+            data (Any): A json serializable representation of the interaction.
+            index (Optional[int], optional): The object id, the current object if None.
+        """
+        self.prompt_history.append(
+            {
+                "object": self.object_index if index is None else index,
+                "type": kind,
+                "positive": bool(positive),
+                "data": data,
+            }
+        )
+
+    def _record_mask_prompt(
+        self, kind: str, positive: bool, mask: np.ndarray, index: Optional[int] = None
+    ) -> None:
+        """
+        Appends a scribble or lasso to the prompt history. The history only holds the bounding box
+        of the mask, its bit packed crop is autosaved once into a file of its own.
+
+        Args:
+            kind (str): The interaction type (scribble or lasso).
+            positive (bool): If the interaction is positive or negative.
+            mask (np.ndarray): The mask of the interaction.
+            index (Optional[int], optional): The object id, the current object if None.
+        """
+        bbox, packed = pack_mask(mask)
+        _key = f"prompt_{str(self._prompt_mask_count).zfill(5)}"
+        self._prompt_mask_count += 1
+        self._prompt_masks[_key] = packed
+        self._record_prompt(kind, positive, {"bbox": bbox, "mask": _key}, index)
+
+    def _autosave(self, wait: bool = False) -> None:
+        """
+        Saves the working result, all changed objects, the object names and the prompt history.
+
+        Args:
+            wait (bool, optional): Save in the calling thread instead of the background.
+        """
+        if self._autosaver is None or self.session_cfg is None:
+            return
+
+        arrays = {}
+        regions = {}
+        objects = []
+        for record in self.objects.finished():
+            _key = f"object_{str(record.index).zfill(4)}"
+            objects.append({"index": record.index, "name": record.name, "key": _key})
+            if id(record.layer) in self._autosave_dirty:
+                arrays[_key] = label_data(record.layer)
+                if self._autosave_dirty[id(record.layer)] is not None:
+                    regions[_key] = self._autosave_dirty[id(record.layer)]
+
+        # Don't create an (empty) autosave before anything happened, it would push out older ones
+        if not (objects or self.prompt_history or self._autosaver.directory.exists()):
+            return
+
+        _working = self._working_changes.pop()
+        if _working is not None:
+            arrays["working"] = self._data_result
+            regions["working"] = _working
+
+        state = {
+            "image": self.session_cfg["name"],
+            "model": self.session_cfg["model"],
+            "shape": [int(s) for s in self.session_cfg["shape"]],
+            "object_index": self.object_index,
+            "object_names": list(self.object_names),
+            "objects": objects,
+            "prompt_history": list(self.prompt_history),
+        }
+
+        try:
+            _masks = dict(self._prompt_masks)
+            if wait:
+                self._autosaver.wait()
+                self._autosaver.save(arrays, state, regions, _masks)
+            elif not self._autosaver.save_async(arrays, state, regions, _masks):
+                # The previous save is still running, keep everything dirty for the next one
+                if _working is not None:
+                    self._working_changes.mark(_working)
+                return
+            self._autosave_dirty.clear()
+            for key in _masks:
+                self._prompt_masks.pop(key, None)
+        except Exception as e:
+            if _working is not None:
+                self._working_changes.mark(_working)
+            show_warning(f"Autosave failed: {str(e)}")
+
+    def on_resume_session(self, *args, **kwargs) -> bool:
+        """
+        Restores the last autosaved session of the current image. Objects are memory-mapped from
+        the autosave and the working result is restored without running the model.
+
+        Returns:
+            bool: True if a session was resumed.
+        """
+        _running = self._autosaver.directory if self._autosaver is not None else None
+        _dir = latest_session_dir(self.session_cfg["name"], exclude=_running)
+        if _dir is None:
+            show_warning(f"No autosaved session found for {self.session_cfg['name']}")
+            return False
+        if self.objects.finished():
+            show_warning("A session can only be resumed before the first object is finished")
+            return False
+
+        state, arrays = load_session(_dir)
+        if tuple(state["shape"]) != tuple(int(s) for s in self.session_cfg["shape"]):
+            show_warning(
+                f"Autosaved session has shape {state['shape']} which does not match the image"
+            )
+            return False
+
+        for _obj in state["objects"]:
+            if _obj["key"] in arrays:
+                self.add_object_layer(arrays[_obj["key"]], _obj["name"], _obj["index"])
+
+        # Restore the working object and keep it on top
+        if "working" in arrays:
+            self._data_result[...] = arrays["working"]
+        self._move_working_object(state["object_index"])
+        self._refresh_label_layer(full=True)
+
+        # Restore object names and the prompt history
+        for object_name in state["object_names"]:
+            if object_name not in self.object_names:
+                self.object_names.append(object_name)
+                self.object_name_combo.addItem(object_name)
+        self.prompt_history = list(state["prompt_history"])
+        # The prompt masks are saved again into the running autosave, new ones are numbered after
+        for key in state.get("files", []):
+            if key.startswith("prompt_") and key in arrays:
+                self._prompt_masks[key] = arrays[key]
+                self._prompt_mask_count = max(self._prompt_mask_count, int(key[7:]) + 1)
+
+        print(f"Resumed session from {_dir}")
+        return True
+
+    def on_reset_all(self, *args, **kwargs):
+        """Writes and stops the autosave before resetting the plugin"""
+        self._autosave(wait=True)
+        self._stop_autosave()
+        super().on_reset_all(*args, **kwargs)
@@ -1,6 +1,7 @@
+import os
 from typing import Optional
 
-from napari.layers import Image, Labels
+from napari.layers import Image, Labels, Points
 from napari.viewer import Viewer
 from napari_toolkit.containers import setup_vcollapsiblegroupbox, setup_vgroupbox, setup_vscrollarea
 from napari_toolkit.widgets import (
@@ -22,12 +23,17 @@ from qtpy.QtWidgets import (
     QComboBox,
     QGroupBox,
     QHBoxLayout,
+    QProgressBar,
     QShortcut,
     QSizePolicy,
+    QTableWidget,
     QVBoxLayout,
     QWidget,
 )
 
+from napari_nninteractive.utils.batching import MAX_BATCH_ZOOM_OUT_FACTOR
+from napari_nninteractive.utils.nifti import NIFTI_COMPRESSION
+
 
 class BaseGUI(QWidget):
     """
@@ -64,10 +70,16 @@ class BaseGUI(QWidget):
         _scroll_layout.addWidget(self._init_image_selection())  # Image Selection
         _scroll_layout.addWidget(self._init_control_buttons())  # Init and Reset Button
         _scroll_layout.addWidget(self._init_init_buttons())  # Init and Reset Button
+        _scroll_layout.addWidget(self._init_seed_segmentation())  # Bulk Segmentation from Seeds
         _scroll_layout.addWidget(self._init_prompt_selection())  # Prompt Selection
         _scroll_layout.addWidget(self._init_interaction_selection())  # Interaction Selection
         _scroll_layout.addWidget(self._init_run_button())  # Run Button
         _scroll_layout.addWidget(self._init_export_button())  # Run Button
+        _scroll_layout.addWidget(self._init_worklist())  # Worklist with Export & Next
+        _scroll_layout.addWidget(self._init_measurements())  # Object Measurements
+        _scroll_layout.addWidget(self._init_time_series())  # Time Series Propagation
+        _scroll_layout.addWidget(self._init_autosave())  # Autosave and Resume
+        _scroll_layout.addWidget(self._init_performance())  # Performance Settings
 
         _ = setup_acknowledgements(_scroll_layout, width=self._width)  # Acknowledgements
 
@@ -83,6 +95,8 @@ class BaseGUI(QWidget):
     def _unlock_session(self):
         """Unlocks the session, enabling model and image selection, and initializing controls."""
         self.init_button.setEnabled(True)
+        self.level_selection.setEnabled(True)
+        self.multiscale_labels_ckbx.setEnabled(True)
 
         self.reset_button.setEnabled(False)
         self.reset_all_button.setEnabled(True)  # Reset All should always be enabled
@@ -92,6 +106,9 @@ class BaseGUI(QWidget):
         self.run_ckbx.setEnabled(False)
         self.export_button.setEnabled(False)
         self.separate_omezarr_ckbx.setEnabled(False)
+        self.nifti_compression.setEnabled(False)
+        self.crop_export_ckbx.setEnabled(False)
+        self.crop_margin.setEnabled(False)
         self.reset_after_export_ckbx.setEnabled(False)
         self.reset_interaction_button.setEnabled(False)
         self.propagate_ckbx.setEnabled(False)
@@ -99,16 +116,32 @@ class BaseGUI(QWidget):
         self.label_for_init.setEnabled(False)
         self.class_for_init.setEnabled(False)
         self.auto_refine.setEnabled(False)
+        self.class_table.setEnabled(False)
+        self.import_classes_btn.setEnabled(False)
         # self.empty_mask_btn.setEnabled(False)
         self.load_mask_btn.setEnabled(False)
         self.add_button.setEnabled(False)
         self.add_ckbx.setEnabled(False)
+        self.batch_ckbx.setEnabled(False)
+        self.batch_zoom.setEnabled(False)
+        self.progressive_ckbx.setEnabled(False)
+        self.propagate_frames_button.setEnabled(False)
+        self.measure_button.setEnabled(False)
+        self.seed_layer.setEnabled(False)
+        self.seed_button.setEnabled(False)
+        self.seed_stop_button.setEnabled(False)
+        self.export_next_button.setEnabled(False)
         self.object_name_combo.setEnabled(False)
         self.add_name_button.setEnabled(False)
+        self.resume_button.setEnabled(False)
+        self.autotune_button.setEnabled(False)
+        self.precision_report_button.setEnabled(False)
 
     def _lock_session(self):
         """Locks the session, disabling model and image selection, and enabling control buttons."""
         self.init_button.setEnabled(False)
+        self.level_selection.setEnabled(False)
+        self.multiscale_labels_ckbx.setEnabled(False)
 
         self.reset_button.setEnabled(True)
         self.reset_all_button.setEnabled(True)  # Reset All should always be enabled
@@ -118,6 +151,9 @@ class BaseGUI(QWidget):
         self.run_ckbx.setEnabled(True)
         self.export_button.setEnabled(True)
         self.separate_omezarr_ckbx.setEnabled(True)
+        self.nifti_compression.setEnabled(True)
+        self.crop_export_ckbx.setEnabled(True)
+        self.crop_margin.setEnabled(True)
         self.reset_after_export_ckbx.setEnabled(True)
         self.reset_interaction_button.setEnabled(True)
         self.propagate_ckbx.setEnabled(True)
@@ -125,12 +161,26 @@ class BaseGUI(QWidget):
         self.label_for_init.setEnabled(True)
         self.class_for_init.setEnabled(True)
         self.auto_refine.setEnabled(True)
+        self.class_table.setEnabled(True)
+        self.import_classes_btn.setEnabled(True)
         # self.empty_mask_btn.setEnabled(True)
         self.load_mask_btn.setEnabled(True)
         self.add_button.setEnabled(True)
         self.add_ckbx.setEnabled(True)
+        self.batch_ckbx.setEnabled(True)
+        self.batch_zoom.setEnabled(True)
+        self.progressive_ckbx.setEnabled(True)
+        self.propagate_frames_button.setEnabled(True)
+        self.measure_button.setEnabled(True)
+        self.seed_layer.setEnabled(True)
+        self.seed_button.setEnabled(True)
+        self.seed_stop_button.setEnabled(False)
+        self.export_next_button.setEnabled(True)
         self.object_name_combo.setEnabled(True)
         self.add_name_button.setEnabled(True)
+        self.resume_button.setEnabled(True)
+        self.autotune_button.setEnabled(True)
+        self.precision_report_button.setEnabled(True)
 
     def _clear_layers(self):
         """Abstract function to clear all needed layers"""
@@ -161,6 +211,44 @@ class BaseGUI(QWidget):
         )
         btn.setFixedWidth(30)
 
+        _boxlayout = QHBoxLayout()
+        _layout.addLayout(_boxlayout)
+        self.backend_selection = setup_combobox(
+            _boxlayout,
+            options=["In-process", "Child process", "Server"],
+            function=self.on_model_selected,
+            tooltips="Run the model in napari, in a separate process or use the model of an "
+            "inference server (python -m napari_nninteractive.server)",
+            stretch=1,
+        )
+        self.server_address = setup_lineedit(
+            _boxlayout,
+            text="127.0.0.1:5757",
+            function=self.on_model_selected,
+            tooltips="Address of the inference server (host:port)",
+            stretch=1,
+        )
+
+        # Shown while a checkpoint is downloaded in the background
+        _boxlayout = QHBoxLayout()
+        _layout.addLayout(_boxlayout)
+        self.download_progress = QProgressBar()
+        self.download_progress.setRange(0, 1000)
+        _boxlayout.addWidget(self.download_progress, stretch=1)
+        self.download_cancel_btn = setup_iconbutton(
+            _boxlayout,
+            "",
+            "delete_shape",
+            self._viewer.theme,
+            function=self.on_cancel_download,
+            tooltips="Cancel the download, it continues where it stopped on the next start",
+        )
+        self.download_cancel_btn.setFixedWidth(30)
+        self.download_label = setup_label(_layout, "")
+        self.download_progress.setVisible(False)
+        self.download_cancel_btn.setVisible(False)
+        self.download_label.setVisible(False)
+
         _group_box.setLayout(_layout)
         return _group_box
 
@@ -173,6 +261,24 @@ class BaseGUI(QWidget):
         )
         self.image_selection.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLength)
 
+        h_layout = QHBoxLayout()
+        _layout.addLayout(h_layout)
+        _text = setup_label(h_layout, "Resolution level:", stretch=3)
+        self.level_selection = setup_combobox(
+            h_layout,
+            options=["auto"],
+            tooltips="Resolution level of a multiscale image used for the session, 'auto' selects "
+            "the finest level which fits into memory",
+            stretch=2,
+        )
+        self.multiscale_labels_ckbx = setup_checkbox(
+            _layout,
+            "Multiscale labels",
+            False,
+            tooltips="Show objects as label pyramids, which renders large volumes faster when "
+            "zoomed out or in 3D. Multiscale labels can not be painted on",
+        )
+
         _group_box.setLayout(_layout)
         return _group_box
 
@@ -277,6 +383,22 @@ class BaseGUI(QWidget):
             _layout, "Auto refine", False, tooltips="Auto Refine the Initial Mask"
         )
 
+        self.class_table = setup_lineedit(
+            _layout,
+            placeholder="Class Table (json/csv)...",
+            tooltips="Names of the class ids, e.g. the dataset.json of nnU-Net or a csv file "
+            "with id,name rows",
+        )
+        self.import_classes_btn = setup_iconbutton(
+            _layout,
+            "Import All Classes",
+            "logo_silhouette",
+            self._viewer.theme,
+            self.on_import_classes,
+            tooltips="Add every class of the label layer as a separate object, named after the "
+            "class table. With Auto refine, the classes are refined one after another",
+        )
+
         _txt = setup_label(
             _layout, "<b>Warning:</b> This will reset all interactions<br>for the current object"
         )
@@ -285,6 +407,42 @@ class BaseGUI(QWidget):
         _group_box.setLayout(_layout)
         return _group_box
 
+    def _init_seed_segmentation(self) -> QGroupBox:
+        """Initializes the bulk segmentation of the seeds of a points layer"""
+        _group_box, _layout = setup_vcollapsiblegroupbox(text="Segment from Seeds:", collapsed=True)
+
+        self.seed_layer = setup_layerselect(
+            _layout,
+            viewer=self._viewer,
+            layer_type=Points,
+            tooltips="Points layer with one seed per object, e.g. the centroids of a detector",
+        )
+
+        h_layout = QHBoxLayout()
+        _layout.addLayout(h_layout)
+        self.seed_button = setup_iconbutton(
+            h_layout,
+            "Segment Seeds",
+            "right_arrow",
+            self._viewer.theme,
+            self.on_segment_seeds,
+            tooltips="Segment every seed as its own object with a positive point prompt",
+            stretch=3,
+        )
+        self.seed_stop_button = setup_iconbutton(
+            h_layout,
+            "Stop",
+            "delete",
+            self._viewer.theme,
+            self.on_stop_seeds,
+            tooltips="Stop after the current seed, finished seeds are kept",
+            stretch=1,
+        )
+        self.seed_label = setup_label(_layout, "")
+
+        _group_box.setLayout(_layout)
+        return _group_box
+
     def _init_prompt_selection(self) -> QGroupBox:
         """Initializes the prompt selection as switch with options and shortcuts."""
         _group_box, _layout = setup_vgroupbox(text="Prompt Type:")
@@ -382,6 +540,38 @@ class BaseGUI(QWidget):
             tooltips="Add interaction automatically to session",
         )
 
+        self.progressive_ckbx = setup_checkbox(
+            _layout,
+            "Progressive Preview",
+            False,
+            tooltips="Show a low resolution preview of the first patch right away and run the "
+            "auto-zoom prediction in the background",
+        )
+
+        h_layout = QHBoxLayout()
+        _layout.addLayout(h_layout)
+
+        self.batch_ckbx = setup_checkbox(
+            h_layout,
+            "Batch Prompts",
+            False,
+            function=self.on_batch_ckbx,
+            tooltips="Collect prompts of all interaction tools and submit them together with Run",
+            stretch=2,
+        )
+        self.batch_zoom = setup_spinbox(
+            h_layout,
+            minimum=1,
+            maximum=16,
+            default=MAX_BATCH_ZOOM_OUT_FACTOR,
+            suffix="x zoom",
+            tooltips="Largest zoom out factor used to predict several batched prompts with one "
+            "patch, also with auto-zoom turned off (1: only merge prompts fitting one patch)",
+            stretch=1,
+        )
+        self.pending_label = setup_label(h_layout, "Pending: 0", stretch=1)
+        self.pending_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+
         _group_box.setLayout(_layout)
         return _group_box
 
@@ -401,6 +591,38 @@ class BaseGUI(QWidget):
             tooltips="When checked, export ONLY as OME-Zarr files. When unchecked, export in original format."
         )
 
+        _boxlayout = QHBoxLayout()
+        _layout.addLayout(_boxlayout)
+        setup_label(_boxlayout, "NIfTI compression:", stretch=1)
+        self.nifti_compression = setup_combobox(
+            _boxlayout,
+            options=list(NIFTI_COMPRESSION),
+            tooltips="Compression of NIfTI files exported in the original format, the files are "
+            "compressed and written in parallel",
+            stretch=1,
+        )
+
+        _boxlayout = QHBoxLayout()
+        _layout.addLayout(_boxlayout)
+        self.crop_export_ckbx = setup_checkbox(
+            _boxlayout,
+            "Crop to objects",
+            False,
+            tooltips="Export each object cropped to its bounding box, the offset is stored in the "
+            "affine (or the OME-Zarr translation) so the crop stays in place",
+            stretch=1,
+        )
+        self.crop_margin = setup_spinbox(
+            _boxlayout,
+            0,
+            256,
+            default=4,
+            prefix="Margin: ",
+            suffix=" voxels",
+            tooltips="Number of voxels kept around the bounding box of each object",
+            stretch=1,
+        )
+
         # Add a checkbox to reset after export
         self.reset_after_export_ckbx = setup_checkbox(
             _layout,
@@ -412,10 +634,250 @@ class BaseGUI(QWidget):
         _group_box.setLayout(_layout)
         return _group_box
 
+    def _init_worklist(self) -> QGroupBox:
+        """Initializes the worklist of cases and the Export & Next button"""
+        _group_box, _layout = setup_vcollapsiblegroupbox(text="Worklist:", collapsed=True)
+
+        _boxlayout = QHBoxLayout()
+        _layout.addLayout(_boxlayout)
+        self.worklist_path = setup_lineedit(
+            _boxlayout,
+            placeholder="Folder or CSV file...",
+            tooltips="A folder of images or a CSV file with one image path per row (first column)",
+            stretch=3,
+        )
+        self.load_worklist_button = setup_iconbutton(
+            _boxlayout,
+            "Load",
+            "add",
+            self._viewer.theme,
+            self.on_load_worklist,
+            tooltips="Open the first case of the worklist",
+            stretch=1,
+        )
+
+        self.worklist_output = setup_lineedit(
+            _layout,
+            placeholder="Output folder...",
+            tooltips="Every case is exported into this folder, asked for on the first export if "
+            "empty",
+        )
+
+        self.export_next_button = setup_iconbutton(
+            _layout,
+            "Export && Next",
+            "step_right",
+            self._viewer.theme,
+            self.on_export_next,
+            tooltips="Export the objects of this case and switch to the next case, which is read "
+            "in the background while the current one is annotated",
+        )
+        self.worklist_label = setup_label(_layout, "")
+
+        _group_box.setLayout(_layout)
+        return _group_box
+
+    def _init_measurements(self) -> QGroupBox:
+        """Initializes the table of object measurements"""
+        _group_box, _layout = setup_vcollapsiblegroupbox(text="Measurements:", collapsed=True)
+
+        self.measure_button = setup_iconbutton(
+            _layout,
+            "Measure Objects",
+            "right_arrow",
+            self._viewer.theme,
+            self.on_measure,
+            tooltips="Measure voxel count, volume, bounding box and centroid of all objects, the "
+            "measurements are also written next to exported files",
+        )
+
+        self.measurement_table = QTableWidget(0, 5)
+        self.measurement_table.setHorizontalHeaderLabels(
+            ["Object", "Name", "Voxels", "Volume", "Centroid"]
+        )
+        self.measurement_table.setSortingEnabled(True)
+        self.measurement_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.measurement_table.verticalHeader().setVisible(False)
+        self.measurement_table.setMinimumHeight(150)
+        _layout.addWidget(self.measurement_table)
+
+        _group_box.setLayout(_layout)
+        return _group_box
+
+    def _init_time_series(self) -> QGroupBox:
+        """Initializes the propagation of objects through the frames of a time series"""
+        _group_box, _layout = setup_vcollapsiblegroupbox(text="Time Series:", collapsed=True)
+
+        h_layout = QHBoxLayout()
+        _layout.addLayout(h_layout)
+        _text = setup_label(h_layout, "Frames to propagate:", stretch=3)
+        self.propagate_frames = setup_spinbox(
+            h_layout,
+            minimum=0,
+            maximum=100000,
+            default=0,
+            tooltips="Number of following frames to propagate to (0: all remaining frames)",
+        )
+
+        self.propagate_frames_button = setup_iconbutton(
+            _layout,
+            "Propagate to Next Frames",
+            "right_arrow",
+            self._viewer.theme,
+            self.on_propagate_frames,
+            tooltips="Carry the mask of the current object to the following frames, each frame is "
+            "predicted from the mask of its predecessor",
+        )
+        self.frame_label = setup_label(_layout, "")
+
+        _group_box.setLayout(_layout)
+        return _group_box
+
+    def _init_autosave(self) -> QGroupBox:
+        """Initializes the autosave settings and the resume button"""
+        _group_box, _layout = setup_vcollapsiblegroupbox(text="Autosave:", collapsed=True)
+
+        h_layout = QHBoxLayout()
+        _layout.addLayout(h_layout)
+
+        self.autosave_ckbx = setup_checkbox(
+            h_layout,
+            "Autosave every",
+            True,
+            function=self.on_autosave_ckbx,
+            tooltips="Save all objects and interactions in the background",
+            stretch=3,
+        )
+        self.autosave_interval = setup_spinbox(
+            h_layout,
+            minimum=5,
+            maximum=3600,
+            default=60,
+            function=self.on_autosave_ckbx,
+            stretch=1,
+        )
+        _text = setup_label(h_layout, "sec", stretch=1)
+
+        self.resume_button = setup_iconbutton(
+            _layout,
+            "Resume Session",
+            "pop_out",
+            self._viewer.theme,
+            self.on_resume_session,
+            tooltips="Load the last autosaved session of this image without rerunning the model",
+        )
+
+        _group_box.setLayout(_layout)
+        return _group_box
+
+    def _init_performance(self) -> QGroupBox:
+        """Initializes the performance settings (threads and NUMA pinning)"""
+        _group_box, _layout = setup_vcollapsiblegroupbox(text="Performance:", collapsed=True)
+
+        h_layout = QHBoxLayout()
+        _layout.addLayout(h_layout)
+        _text = setup_label(h_layout, "Threads (intra/inter):", stretch=3)
+        self.intra_threads = setup_spinbox(
+            h_layout,
+            minimum=1,
+            maximum=os.cpu_count(),
+            default=os.cpu_count(),
+            function=self.on_thread_settings,
+            tooltips="Threads used within one operation",
+        )
+        self.inter_threads = setup_spinbox(
+            h_layout,
+            minimum=1,
+            maximum=os.cpu_count(),
+            default=1,
+            function=self.on_thread_settings,
+            tooltips="Threads used to run independent operations in parallel",
+        )
+
+        h_layout = QHBoxLayout()
+        _layout.addLayout(h_layout)
+        _text = setup_label(h_layout, "NUMA node:", stretch=3)
+        self.numa_selection = setup_combobox(
+            h_layout,
+            options=["all"],
+            function=self.on_thread_settings,
+            tooltips="Pin inference to the cores of one socket",
+            stretch=2,
+        )
+
+        self.autotune_button = setup_iconbutton(
+            _layout,
+            "Auto-Tune Threads",
+            "right_arrow",
+            self._viewer.theme,
+            self.on_autotune,
+            tooltips="Benchmark a prediction at several thread counts and keep the fastest",
+        )
+
+        h_layout = QHBoxLayout()
+        _layout.addLayout(h_layout)
+        _text = setup_label(h_layout, "CPU precision:", stretch=3)
+        self.precision_selection = setup_combobox(
+            h_layout,
+            options=["fp32", "bf16"],
+            function=self.on_precision_selected,
+            tooltips="Run the model in bfloat16 when no GPU is available",
+            stretch=2,
+        )
+
+        self.precision_report_button = setup_iconbutton(
+            _layout,
+            "Precision Report",
+            "right_arrow",
+            self._viewer.theme,
+            self.on_precision_report,
+            tooltips="Compare latency and accuracy of all CPU precisions against fp32",
+        )
+        self.performance_label = setup_label(_layout, "")
+
+        h_layout = QHBoxLayout()
+        _layout.addLayout(h_layout)
+        _text = setup_label(h_layout, "Auto-zoom budget:", stretch=3)
+        self.max_patches = setup_spinbox(
+            h_layout,
+            minimum=0,
+            maximum=256,
+            default=0,
+            function=self.on_budget_changed,
+            suffix=" patches",
+            tooltips="Maximum number of patches predicted per interaction (0: no limit)",
+        )
+        self.latency_target = setup_spinbox(
+            h_layout,
+            minimum=0,
+            maximum=600000,
+            step_size=500,
+            default=0,
+            function=self.on_budget_changed,
+            suffix=" ms",
+            tooltips="Stop zooming out once the next patch would exceed this runtime (0: no limit)",
+        )
+
+        self.compile_ckbx = setup_checkbox(
+            _layout,
+            "Compile model (torch.compile)",
+            False,
+            tooltips="Compile the model once when it is loaded, every prediction afterwards is faster. "
+            "Compiled kernels are cached on disk for later launches.",
+        )
+        self.compile_label = setup_label(_layout, "")
+
+        _group_box.setLayout(_layout)
+        return _group_box
+
     # Event Handlers
     def on_init(self, *args, **kwargs) -> None:
         """Initializes the session configuration based on the selected model and image."""
 
+    def on_cancel_download(self, *args, **kwargs) -> None:
+        """Placeholder method for cancelling a checkpoint download"""
+        print("on_cancel_download")
+
     def on_image_selected(self):
         """When a new image is selected reset layers and session (cfg + gui)"""
         self._clear_layers()
@@ -448,6 +910,9 @@ class BaseGUI(QWidget):
         """Placeholder method for run operation"""
         print("on_run")
 
+    def on_batch_ckbx(self, *args, **kwargs) -> None:
+        """Placeholder method for when prompt batching is toggled"""
+
     def on_propagate_ckbx(self, *args, **kwargs):
         """Handle changes to the auto-zoom checkbox."""
         pass
@@ -462,6 +927,18 @@ class BaseGUI(QWidget):
     def add_mask_init_layer(self):
         pass
 
+    def on_segment_seeds(self, *args, **kwargs) -> None:
+        """Placeholder method for segmenting all seeds of a points layer"""
+        print("on_segment_seeds")
+
+    def on_stop_seeds(self, *args, **kwargs) -> None:
+        """Placeholder method for stopping the segmentation of seeds"""
+        print("on_stop_seeds")
+
+    def on_import_classes(self, *args, **kwargs) -> None:
+        """Placeholder method for importing all classes of a label layer as objects"""
+        print("on_import_classes")
+
     def on_object_name_selected(self, text=None, *args, **kwargs) -> None:
         """Called when a new object name is selected from the dropdown."""
         # If text is provided by the signal, use it, otherwise get from combobox
@@ -487,9 +964,49 @@ class BaseGUI(QWidget):
             # Update the current object's name with the selected text
             self.on_object_name_selected(current_text)
 
-    def _export(self) -> None:
+    def _export(self, *args, **kwargs) -> None:
         """Placeholder method for exporting all generated label layers"""
 
+    def on_load_worklist(self, *args, **kwargs) -> None:
+        """Placeholder method for loading a worklist"""
+        print("on_load_worklist")
+
+    def on_export_next(self, *args, **kwargs) -> None:
+        """Placeholder method for exporting the current case and opening the next one"""
+        print("on_export_next")
+
+    def on_measure(self, *args, **kwargs) -> None:
+        """Placeholder method for measuring all objects"""
+        print("on_measure")
+
+    def on_propagate_frames(self, *args, **kwargs) -> None:
+        """Placeholder method for propagating the current object through a time series"""
+        print("on_propagate_frames")
+
+    def on_autosave_ckbx(self, *args, **kwargs) -> None:
+        """Placeholder method for when the autosave settings change"""
+
+    def on_resume_session(self, *args, **kwargs) -> None:
+        """Placeholder method for resuming an autosaved session"""
+        print("on_resume_session")
+
+    def on_thread_settings(self, *args, **kwargs) -> None:
+        """Placeholder method for when the thread settings change"""
+
+    def on_autotune(self, *args, **kwargs) -> None:
+        """Placeholder method for benchmarking the thread settings"""
+        print("on_autotune")
+
+    def on_precision_selected(self, *args, **kwargs) -> None:
+        """Placeholder method for when the CPU precision changes"""
+
+    def on_precision_report(self, *args, **kwargs) -> None:
+        """Placeholder method for comparing the CPU precisions"""
+        print("on_precision_report")
+
+    def on_budget_changed(self, *args, **kwargs) -> None:
+        """Placeholder method for when the auto-zoom budget changes"""
+
     def on_reset_all(self, *args, **kwargs):
         """
         Reset the plugin to its initial state but preserve object names.
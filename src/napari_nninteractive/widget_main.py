@@ -1,20 +1,53 @@
 import os
+import threading
 import warnings
-from pathlib import Path
-from typing import Any, Optional
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-import nnInteractive
 import numpy as np
 import torch
-from batchgenerators.utilities.file_and_folder_operations import join, load_json
+from napari.qt.threading import thread_worker
 from napari.utils.notifications import show_warning
 from napari.viewer import Viewer
-from nnunetv2.utilities.find_class_by_name import recursive_find_python_class
 from qtpy.QtWidgets import QWidget
 from qtpy.QtCore import QTimer
 
+from napari_nninteractive.server.client import RemoteSession, parse_address
+from napari_nninteractive.server.process import InferenceProcessError, ProcessSession
+from napari_nninteractive.utils.batching import group_interaction_centers
+from napari_nninteractive.utils.budget import set_prediction_budget, start_prediction_budget
+from napari_nninteractive.utils.classes import class_mask, load_class_table, split_classes
+from napari_nninteractive.utils.compile import configure_compile_cache, warmup_network
+from napari_nninteractive.utils.network import set_wrapper
+from napari_nninteractive.utils.performance import (
+    apply_thread_settings,
+    benchmark_thread_counts,
+    candidate_thread_counts,
+    load_performance_settings,
+    numa_nodes,
+    save_performance_settings,
+)
+from napari_nninteractive.utils.precision import (
+    CPU_PRECISIONS,
+    compare_precisions,
+    set_cpu_precision,
+)
+from napari_nninteractive.utils.preview import CancellableNetwork, predict_preview
+from napari_nninteractive.utils.pyramid import label_data as pyramid_label_data
+from napari_nninteractive.utils.session import (
+    clone_session,
+    find_inference_class,
+    initialize_session,
+)
+from napari_nninteractive.utils.shared import DirtyTrackingArray
+from napari_nninteractive.utils.timeseries import prefetch_frames, read_frame
 from napari_nninteractive.widget_controls import LayerControls
 
+# Latency target of the bounded auto-zoom on CPU if the user did not set a budget
+DEFAULT_CPU_LATENCY_TARGET_MS = 5000
+# The session moves to another frame once the frame slider rested for this long
+FRAME_SWITCH_DELAY_MS = 150
+
 
 class nnInteractiveWidget_(LayerControls):
     """Just a Debug Dummy without all the machine learning stuff"""
@@ -32,7 +65,78 @@ class nnInteractiveWidget(LayerControls):
         """
         super().__init__(viewer, parent)
         self.session = None
+        self._session_compiled = False
+        self._session_backend = None
+        # Collects the predictions of a session running in a child process
+        self._session_timer = QTimer(self)
+        self._session_timer.setInterval(15)
+        self._session_timer.timeout.connect(self._poll_session)
+        # Set while a background job (e.g. a benchmark) uses the session
+        self._session_busy = False
+        # Set while a progressive preview is refined in the background, newer prompts wait in
+        # _refine_prompts and a bumped _preview_generation drops the running refinement
+        self._refining = False
+        self._refine_prompts = []
+        self._refine_lock = threading.Lock()
+        self._preview_prior = None
+        self._preview_generation = 0
+        # Classes of an imported label map which still need to be refined, as (id, bbox)
+        self._class_queue = deque()
+        # Set to stop the segmentation of seeds, the id of the next seed object
+        self._seed_stop = threading.Event()
+        self._seed_index = 0
         self._viewer.dims.events.order.connect(self.on_axis_change)
+        # Scrubbing through a time series only moves the session to the frame it stops at
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setInterval(FRAME_SWITCH_DELAY_MS)
+        self._frame_timer.timeout.connect(self._switch_frame)
+        self._viewer.dims.events.current_step.connect(self.on_frame_change)
+        self._init_performance_settings()
+
+    def _init_performance_settings(self) -> None:
+        """Loads the performance settings of this machine into the GUI and applies them."""
+        settings = load_performance_settings()
+        _widgets = [
+            self.intra_threads,
+            self.inter_threads,
+            self.numa_selection,
+            self.precision_selection,
+            self.max_patches,
+            self.latency_target,
+        ]
+        for _widget in _widgets:
+            _widget.blockSignals(True)
+
+        _nodes = numa_nodes()
+        if len(_nodes) > 1:
+            self.numa_selection.addItems([str(node) for node in _nodes])
+        self.intra_threads.setValue(settings["intra_op_threads"])
+        self.inter_threads.setValue(settings["inter_op_threads"])
+        if str(settings["numa_node"]) in [str(node) for node in _nodes] and len(_nodes) > 1:
+            self.numa_selection.setCurrentText(str(settings["numa_node"]))
+        if settings["cpu_precision"] in CPU_PRECISIONS:
+            self.precision_selection.setCurrentText(settings["cpu_precision"])
+        self.max_patches.setValue(settings["max_patches"])
+        self.latency_target.setValue(settings["latency_target_ms"])
+
+        # Reduced precision is only used for CPU inference
+        if torch.cuda.is_available():
+            self.precision_selection.setEnabled(False)
+            self.precision_selection.setToolTip("Only used when no GPU is available")
+
+        for _widget in _widgets:
+            _widget.blockSignals(False)
+        apply_thread_settings(**self._thread_settings())
+
+    def _thread_settings(self) -> dict:
+        """Returns the thread settings selected in the GUI."""
+        _numa = self.numa_selection.currentText()
+        return {
+            "intra_op_threads": self.intra_threads.value(),
+            "inter_op_threads": self.inter_threads.value(),
+            "numa_node": -1 if _numa == "all" else int(_numa),
+        }
 
     # Event Handlers
     def on_init(self, *args, **kwargs):
@@ -42,73 +146,189 @@ class nnInteractiveWidget(LayerControls):
         This method sets up the nnInteractiveInferenceSession, loading from a
         pre-trained model folder and initializing properties based on the viewer layer.
         """
-        super().on_init(*args, **kwargs)
-        if self.session is None:
-            # Get inference class from Checkpoint
-            if Path(self.checkpoint_path).joinpath("inference_session_class.json").is_file():
-                inference_class = load_json(
-                    Path(self.checkpoint_path).joinpath("inference_session_class.json")
-                )
-                if isinstance(inference_class, dict):
-                    inference_class = inference_class["inference_class"]
-            else:
-                inference_class = "nnInteractiveInferenceSession"
-
-            inference_class = recursive_find_python_class(
-                join(nnInteractive.__path__[0], "inference"),
-                inference_class,
-                "nnInteractive.inference",
-            )
+        if not super().on_init(*args, **kwargs):
+            # The checkpoint is downloaded first (initialize is called again afterwards) or the
+            # image can not be loaded
+            return
+        _backend = self.backend_selection.currentText()
+        if self.session is not None and (
+            self._session_backend != _backend
+            or (_backend != "Server" and self._session_compiled != self.compile_ckbx.isChecked())
+            or (isinstance(self.session, ProcessSession) and not self.session.is_alive())
+        ):
+            # The backend or the compile setting changed, the model has to be loaded again
+            self._release_session()
 
+        if self.session is None and _backend == "Server":
+            _address = self.server_address.text()
+            try:
+                self.session = RemoteSession(*parse_address(_address))
+            except (OSError, ValueError) as e:
+                show_warning(f"Could not connect to the inference server at {_address}: {str(e)}")
+                self._unlock_session()
+                return
+            print(f"Using Model {self.session.model} of the inference server at {_address}")
+            self.session.set_do_autozoom(self.propagate_ckbx.isChecked())
+        elif self.session is None:
             # CPU Fallback if noc Cuda is available
             if torch.cuda.is_available():
                 device = torch.device("cuda:0")
             else:
                 show_warning(
-                    "Cuda is not available. Using CPU instead. This will result in longer runtimes and additionally auto-zoom will be disabled for runtime reasons"
+                    "Cuda is not available. Using CPU instead. This will result in longer runtimes, auto-zoom is bounded by the budget in the performance settings"
                 )
 
                 device = torch.device("cpu")
-                self.propagate_ckbx.setChecked(False)
+                if self.max_patches.value() == 0 and self.latency_target.value() == 0:
+                    # Keep auto-zoom, but bound its runtime
+                    self.latency_target.blockSignals(True)
+                    self.latency_target.setValue(DEFAULT_CPU_LATENCY_TARGET_MS)
+                    self.latency_target.blockSignals(False)
 
             # device = torch.device("cuda:0") if torch.cuda.is_available() else torch.device("cpu")
 
-            # Initialize the Session
-            self.session = inference_class(
-                device=device,  # can also be cpu or mps. CPU not recommended
-                use_torch_compile=False,
-                torch_n_threads=os.cpu_count(),
-                verbose=False,
-                do_autozoom=self.propagate_ckbx.isChecked(),
-            )
-
-            self.session.initialize_from_trained_model_folder(
-                self.checkpoint_path,
-                0,
-                "checkpoint_final.pth",
-            )
+            _compile = self.compile_ckbx.isChecked()
+            if _backend == "Child process":
+                self.session = ProcessSession(
+                    self.checkpoint_path, device, self._process_settings(_compile)
+                )
+                self._session_timer.start()
+                self.compile_label.setText("")
+            else:
+                self._init_local_session(device, _compile)
+            self._session_compiled = _compile
+        self._session_backend = _backend
 
-        _data = np.array(self._viewer.layers[self.session_cfg["name"]].data)
+        # Only the needed resolution level (and frame) of lazily loaded images is read
+        if self.session_cfg["time_series"]:
+            _data = read_frame(self._session_image(), self.frame)
+            self.frame_label.setText(f"Frame: {self.frame}")
+        else:
+            _data = np.asarray(self._session_image())
         _data = _data[np.newaxis, ...]
 
         if self.source_cfg["ndim"] == 2:
             _data = _data[np.newaxis, ...]
 
-        self.session.set_image(_data, {"spacing": self.session_cfg["spacing"]})
+        self.session.set_image(_data, {"spacing": self._session_spacing()})
 
-        self.session.set_target_buffer(self._data_result)
+        self.session.set_target_buffer(self._session_result())
         self._scribble_brush_size = self.session.preferred_scribble_thickness[
-            self._viewer.dims.not_displayed[0]
+            self._scribble_axis()
         ]
         # Set the prompt type to positive
         self.prompt_button._uncheck()
         self.prompt_button._check(0)
 
+    def _init_local_session(self, device: torch.device, use_torch_compile: bool) -> None:
+        """Loads the model into an inference session running in this process"""
+        if use_torch_compile:
+            _cache_dir = configure_compile_cache()
+            print(f"Using compile cache at : {_cache_dir}")
+
+        # Initialize the Session
+        inference_class = find_inference_class(self.checkpoint_path)
+        self.session = inference_class(
+            device=device,  # can also be cpu or mps. CPU not recommended
+            use_torch_compile=use_torch_compile,
+            torch_n_threads=self.intra_threads.value(),
+            verbose=False,
+            do_autozoom=self.propagate_ckbx.isChecked(),
+        )
+
+        initialize_session(self.session, self.checkpoint_path)
+        if device.type == "cpu":
+            set_cpu_precision(self.session, self.precision_selection.currentText())
+        self._apply_prediction_budget()
+        if use_torch_compile:
+            self._warmup_compiled_network()
+        else:
+            self.compile_label.setText("")
+
+    def _process_settings(self, use_torch_compile: bool) -> dict:
+        """Returns the settings of an inference session running in a child process"""
+        return {
+            **self._thread_settings(),
+            "cpu_precision": self.precision_selection.currentText(),
+            "max_patches": self.max_patches.value(),
+            "latency_target_ms": self.latency_target.value(),
+            "compile": use_torch_compile,
+            "do_autozoom": self.propagate_ckbx.isChecked(),
+        }
+
+    def _poll_session(self) -> None:
+        """Shows the predictions a session in a child process finished since the last call"""
+        if not isinstance(self.session, ProcessSession):
+            self._session_timer.stop()
+            return
+        try:
+            _dirty = self.session.poll()
+        except InferenceProcessError as e:
+            show_warning(f"Inference failed: {str(e)}")
+            if not self.session.is_alive():
+                self._release_session()
+                self._unlock_session()
+            return
+        if _dirty:
+            self._refresh_label_layer(_dirty)
+
+    def _drain_session_regions(self) -> List[Tuple[slice, ...]]:
+        """Wait for the predictions of a session in a child process and collect their regions"""
+        if not isinstance(self.session, ProcessSession):
+            return []
+        try:
+            self.session.wait()
+            return self.session.poll()
+        except InferenceProcessError as e:
+            show_warning(f"Inference failed: {str(e)}")
+            return []
+
+    def _warmup_compiled_network(self) -> None:
+        """
+        Compile the network in the background by running it on a dummy patch. The session is busy
+        meanwhile, so no interaction runs the network concurrently.
+        """
+        _session = self.session
+
+        @thread_worker
+        def _warmup():
+            start_prediction_budget(_session)
+            warmup_network(
+                _session.network, _session.configuration_manager.patch_size, _session.device
+            )
+
+        def _on_returned(_):
+            self._session_busy = False
+            self.compile_label.setText("Compiled kernels ready")
+
+        def _on_errored(e):
+            self._session_busy = False
+            self.compile_label.setText(f"Compilation failed: {str(e)}")
+
+        worker = _warmup()
+        worker.returned.connect(_on_returned)
+        worker.errored.connect(_on_errored)
+        self._session_busy = True
+        self.compile_label.setText("Compiling kernels in the background...")
+        worker.start()
+
     def on_model_selected(self):
         """Reset the current session completely"""
         super().on_model_selected()
+        self._release_session()
+
+    def _release_session(self) -> None:
+        """Drops the session, a server connection or child process is closed"""
+        if isinstance(self.session, RemoteSession):
+            # Also stops a session running in a child process
+            self.session.close()
+        self._session_timer.stop()
         self.session = None
 
+    def _is_local_session(self) -> bool:
+        """Checks if the model runs in this process, only then its network can be accessed"""
+        return self.session is not None and not isinstance(self.session, RemoteSession)
+
     def on_image_selected(self):
         """Reset the current sessions interaction but keep the session itself"""
         super().on_image_selected()
@@ -119,10 +339,11 @@ class nnInteractiveWidget(LayerControls):
         """Reset only the current interaction"""
         _ind = self.interaction_button.index
         super().on_reset_interactions()
+        self._cancel_refinement()
         if self.session is not None:
             self.session.reset_interactions()
 
-        self._viewer.layers[self.label_layer_name].refresh()
+        self._refresh_label_layer()
 
         self.interaction_button._check(_ind)
         self.on_interaction_selected()
@@ -133,7 +354,10 @@ class nnInteractiveWidget(LayerControls):
         """Reset the Interactions of current session"""
         _ind = self.interaction_button.index
         super().on_next()
+        self._cancel_refinement()
         if self.session is not None:
+            # The finished object keeps its buffer, the session continues in a fresh one
+            self.session.set_target_buffer(self._session_result())
             self.session.reset_interactions()
 
         # if (
@@ -142,12 +366,48 @@ class nnInteractiveWidget(LayerControls):
         # ):
         #     self.init_with_mask()
 
-        self._viewer.layers[self.label_layer_name].refresh()
+        self._refresh_label_layer()
 
         self.interaction_button._check(_ind)
         self.on_interaction_selected()
         self.prompt_button._check(0)
 
+    def on_run(self):
+        """Submit all pending prompts as one batch and run a single prediction"""
+        if self.session is not None and not self._session_busy:
+            self._submit_pending_prompts()
+            self._merge_interaction_centers()
+            start_prediction_budget(self.session)
+            self.session._predict()
+            self._refresh_label_layer()
+
+    def on_budget_changed(self, *args, **kwargs):
+        """Apply the auto-zoom budget and remember it for this machine"""
+        self._apply_prediction_budget()
+        save_performance_settings(
+            {
+                "max_patches": self.max_patches.value(),
+                "latency_target_ms": self.latency_target.value(),
+            }
+        )
+
+    def _apply_prediction_budget(self) -> None:
+        """Bounds the number of patches and the runtime of each prediction of the session"""
+        if self._is_local_session():
+            set_prediction_budget(
+                self.session, self.max_patches.value(), self.latency_target.value() / 1000
+            )
+        elif isinstance(self.session, ProcessSession):
+            self.session.configure(
+                max_patches=self.max_patches.value(),
+                latency_target_ms=self.latency_target.value(),
+            )
+
+    def on_batch_ckbx(self, *args, **kwargs):
+        """Hand collected prompts to the session when batching is turned off"""
+        if not self.batch_ckbx.isChecked() and self.session is not None:
+            self._submit_pending_prompts()
+
     def on_propagate_ckbx(self, *args, **kwargs):
         if self.session is not None:
             self.session.set_do_autozoom(self.propagate_ckbx.isChecked())
@@ -161,7 +421,7 @@ class nnInteractiveWidget(LayerControls):
         if self.session is not None:
             # Update scribble brush size
             self._scribble_brush_size = self.session.preferred_scribble_thickness[
-                self._viewer.dims.not_displayed[0]
+                self._scribble_axis()
             ]
             if self.scribble_layer_name in self._viewer.layers:
                 self._viewer.layers[self.scribble_layer_name].brush_size = self._scribble_brush_size
@@ -175,7 +435,7 @@ class nnInteractiveWidget(LayerControls):
         """Center the camera view on the center of mass of current label layer"""
         if self.label_layer_name in self._viewer.layers:
             label_layer = self._viewer.layers[self.label_layer_name]
-            label_data = label_layer.data
+            label_data = pyramid_label_data(label_layer)
             
             # Only center if there are actually labels
             if not np.any(label_data > 0):
@@ -234,18 +494,370 @@ class nnInteractiveWidget(LayerControls):
                     if max_size > 0:
                         self._viewer.camera.zoom = 800 / max_size
 
+    def _session_spacing(self) -> np.ndarray:
+        """Returns the spacing of the image the session works on, without the time axis."""
+        if self.session_cfg["time_series"]:
+            return self.session_cfg["spacing"][1:]
+        return self.session_cfg["spacing"]
+
+    def _scribble_axis(self) -> int:
+        """Returns the axis scribbles are drawn across, in the coordinates of the session."""
+        _offset = 1 if self.session_cfg["time_series"] else 0
+        _axes = [axis - _offset for axis in self._viewer.dims.not_displayed if axis >= _offset]
+        return _axes[0] if _axes else 0
+
+    def _frame_prompt(self, index: int, data: Any) -> Any:
+        """
+        Removes the time axis from a prompt drawn on a time series.
+
+        Args:
+            index (int): The interaction type, corresponding to the layer_dict key.
+            data (Any): The data obtained from the layer's get_last method.
+        """
+        if not self.session_cfg["time_series"]:
+            return data
+        if index in (0, 1):
+            # Point and bbox coordinates
+            return np.asarray(data)[..., 1:]
+        # Scribble and lasso masks
+        return data[self.frame]
+
+    def on_frame_change(self, *args, **kwargs):
+        """Move the session to the frame shown in the viewer once the frame slider rests"""
+        if self.session is None or not self.session_cfg["time_series"]:
+            return
+        self._frame_timer.start()
+
+    def _switch_frame(self) -> None:
+        """Move the session to the frame shown in the viewer, a running job calls this again"""
+        if self.session is None or self._session_busy or not self.session_cfg["time_series"]:
+            return
+        _frame = int(self._viewer.dims.current_step[0])
+        if _frame != self.frame:
+            self._set_frame(_frame)
+
+    def _set_frame(self, frame: int) -> None:
+        """
+        Hands a frame of the time series to the session in the background, the session is busy
+        meanwhile. The mask of the current object in this frame (e.g. from a propagation) becomes
+        the prior of the session.
+
+        Args:
+            frame (int): The frame.
+        """
+        self._cancel_refinement()
+        # Prompts of the previous frame do not belong to this one
+        self.pending_prompts = []
+        self._update_pending_label()
+
+        self.frame = frame
+        _session = self.session
+        _image = self._session_image()
+        _spacing = self._session_spacing()
+
+        @thread_worker
+        def _switch():
+            _data = read_frame(_image, frame)
+            _session.set_image(_data[np.newaxis, ...], {"spacing": _spacing})
+            _session.set_target_buffer(self._frame_result(frame))
+            self._restore_working_prior(np.array(self._frame_result(frame)))
+
+        def _on_returned(_):
+            self.frame_label.setText(f"Frame: {frame}")
+
+        def _on_errored(e):
+            show_warning(f"Moving to frame {frame} failed: {str(e)}")
+
+        def _on_finished():
+            self._session_busy = False
+            self._refresh_label_layer()
+            # The slider might have moved on meanwhile
+            self._switch_frame()
+
+        worker = _switch()
+        worker.returned.connect(_on_returned)
+        worker.errored.connect(_on_errored)
+        worker.finished.connect(_on_finished)
+
+        self._session_busy = True
+        self.frame_label.setText(f"Loading frame {frame}...")
+        worker.start()
+
+    def on_propagate_frames(self, *args, **kwargs):
+        """
+        Carry the current object through the following frames of a time series. Each frame is
+        predicted with the mask of its predecessor as initial segmentation, while the next frame
+        is read in the background. A model running in this process gets a second session which
+        preprocesses the next frame meanwhile, the two sessions take turns. Stops early if the
+        object is lost.
+        """
+        if self.session is None or self._session_busy or not self.session_cfg["time_series"]:
+            return
+        _n_frames = self.session_cfg["shape"][0]
+        if self.propagate_frames.value() > 0:
+            _n_frames = min(_n_frames, self.frame + 1 + self.propagate_frames.value())
+        _frames = list(range(self.frame + 1, _n_frames))
+        if not _frames:
+            show_warning("There is no following frame to propagate to")
+            return
+        if not np.any(self._session_result()):
+            show_warning("The current object is empty in this frame")
+            return
+
+        self._cancel_refinement()
+        _sessions = [self.session]
+        if self._is_local_session() and len(_frames) > 1:
+            _sessions.append(clone_session(self.session))
+        # The session which predicted the last frame, it becomes the session of the widget
+        _current = [self.session]
+        _result = self._data_result
+        _image = self._session_image()
+        _spacing = self._session_spacing()
+
+        @thread_worker
+        def _propagate():
+            _frames_iter = prefetch_frames(_image, _frames)
+            frame, _data = next(_frames_iter)
+            _session = _sessions[0]
+            _session.set_image(_data[np.newaxis, ...], {"spacing": _spacing})
+            while True:
+                _next = next(_frames_iter, None)
+                _spare = _sessions[-1] if _session is _sessions[0] else _sessions[0]
+                if _next is not None and _spare is not _session:
+                    # set_image preprocesses in the background, overlapping with this prediction
+                    _spare.set_image(_next[1][np.newaxis, ...], {"spacing": _spacing})
+
+                _target = self._frame_result(frame)
+                _session.set_target_buffer(_target)
+                start_prediction_budget(_session)
+                _session.add_initial_seg_interaction(_result[frame - 1].copy(), run_prediction=True)
+                if isinstance(_session, ProcessSession):
+                    _session.wait()
+                    # The child process wrote into shared memory, mark the whole frame
+                    _target.mark(Ellipsis)
+                _current[0] = _session
+                yield frame
+                if not np.any(_result[frame]):
+                    print(f"Object lost in frame {frame}, propagation stopped")
+                    return
+                if _next is None:
+                    return
+
+                frame, _data = _next
+                if _spare is _session:
+                    _session.set_image(_data[np.newaxis, ...], {"spacing": _spacing})
+                _session = _spare
+
+        def _on_yielded(frame):
+            self.frame = frame
+            self.frame_label.setText(f"Propagated to frame {frame} of {_frames[-1]}")
+            _step = list(self._viewer.dims.current_step)
+            _step[0] = frame
+            self._viewer.dims.current_step = tuple(_step)
+            self._refresh_label_layer()
+
+        def _on_errored(e):
+            show_warning(f"Propagation failed: {str(e)}")
+            # The session might be left on a half processed frame, it is set up again
+            _current[0] = None
+
+        def _on_finished():
+            # The session of the last frame holds its interactions, the other one is dropped
+            if self.session is _sessions[0] and _current[0] is not None:
+                self.session = _current[0]
+            self._session_busy = False
+            self.propagate_frames_button.setEnabled(True)
+            if _current[0] is None and self.session is not None:
+                self._set_frame(self.frame)
+            else:
+                self._switch_frame()
+
+        worker = _propagate()
+        worker.yielded.connect(_on_yielded)
+        worker.errored.connect(_on_errored)
+        worker.finished.connect(_on_finished)
+
+        self._session_busy = True
+        self.propagate_frames_button.setEnabled(False)
+        worker.start()
+
+    def on_resume_session(self, *args, **kwargs):
+        """Resume the autosaved session and hand the restored working result to the session"""
+        if super().on_resume_session(*args, **kwargs) and self.session is not None:
+            self._restore_working_prior(self._session_result().copy())
+            self._refresh_label_layer()
+
+    def _restore_working_prior(self, working: np.ndarray) -> None:
+        """
+        Resets the session interactions and registers `working` as prior of the current object.
+        Only the mask is handed to the session, the model is not run. The label layer is not
+        refreshed, so this can run in a background job.
+
+        Args:
+            working (np.ndarray): The segmentation of the current object.
+        """
+        self.session.reset_interactions()
+        if np.any(working):
+            self.session.add_initial_seg_interaction(working, run_prediction=False)
+        self._session_result()[...] = working
+
+    def on_thread_settings(self, *args, **kwargs):
+        """Apply the thread settings and remember them for this machine"""
+        settings = self._thread_settings()
+        apply_thread_settings(**settings)
+        save_performance_settings(settings)
+
+    def _representative_prediction(self):
+        """
+        Prepares a positive point prediction in the center of the image which is written into a
+        scratch buffer, so the current object is not touched.
+
+        Returns:
+            Tuple[Callable, Callable, np.ndarray]: The prediction, a function restoring the
+            current object and the scratch buffer.
+        """
+        _working = self._session_result().copy()
+        _scratch = np.zeros_like(_working)
+        _center = [int(s) // 2 for s in _working.shape]
+        self.session.set_target_buffer(_scratch)
+
+        def _run():
+            self.session.reset_interactions()
+            start_prediction_budget(self.session)
+            self.session.add_point_interaction(_center, True, True)
+
+        def _restore():
+            self.session.set_target_buffer(self._session_result())
+            self._restore_working_prior(_working)
+            self._refresh_label_layer()
+
+        return _run, _restore, _scratch
+
+    def _start_benchmark(self, job: Callable, on_yielded: Callable, on_finished: Callable) -> None:
+        """
+        Runs a benchmark on the representative prediction in a background worker. The session is
+        marked as busy meanwhile and the current object is restored afterwards.
+
+        Args:
+            job (Callable): Generator function receiving the prediction and the scratch buffer.
+            on_yielded (Callable): Called in the main thread for each yielded result.
+            on_finished (Callable): Called in the main thread after the current object is restored.
+        """
+        _run, _restore, _scratch = self._representative_prediction()
+
+        @thread_worker
+        def _benchmark():
+            yield from job(_run, _scratch)
+
+        def _on_finished():
+            _restore()
+            self._session_busy = False
+            self.autotune_button.setEnabled(True)
+            self.precision_report_button.setEnabled(True)
+            on_finished()
+
+        worker = _benchmark()
+        worker.yielded.connect(on_yielded)
+        worker.errored.connect(lambda e: show_warning(f"Benchmark failed: {str(e)}"))
+        worker.finished.connect(_on_finished)
+
+        self._session_busy = True
+        self.autotune_button.setEnabled(False)
+        self.precision_report_button.setEnabled(False)
+        self.performance_label.setText("Benchmarking...")
+        worker.start()
+
+    def on_autotune(self, *args, **kwargs):
+        """
+        Benchmark a representative prediction at several thread counts in the background and
+        keep the fastest setting for this machine.
+        """
+        if not self._is_local_session() or self._session_busy:
+            return
+
+        _numa = self._thread_settings()["numa_node"]
+        _cpus = numa_nodes().get(_numa, []) if _numa >= 0 else []
+        _counts = candidate_thread_counts(len(_cpus) if _cpus else os.cpu_count())
+        results = {}
+
+        def _on_yielded(result):
+            results[result[0]] = result[1]
+            self.performance_label.setText(f"{result[0]} threads: {result[1]:.2f} s")
+
+        def _on_finished():
+            if results:
+                best = min(results, key=results.get)
+                save_performance_settings({"autotune": {str(n): t for n, t in results.items()}})
+                self.intra_threads.setValue(best)
+                self.on_thread_settings()
+                self.performance_label.setText(f"Fastest: {best} threads ({results[best]:.2f} s)")
+
+        self._start_benchmark(
+            lambda run, _: benchmark_thread_counts(run, _counts), _on_yielded, _on_finished
+        )
+
+    def on_precision_selected(self, *args, **kwargs):
+        """Switch the CPU inference precision and remember it for this machine"""
+        _precision = self.precision_selection.currentText()
+        if self._is_local_session() and self.session.device.type == "cpu":
+            set_cpu_precision(self.session, _precision)
+        elif isinstance(self.session, ProcessSession):
+            self.session.configure(cpu_precision=_precision)
+        save_performance_settings({"cpu_precision": _precision})
+
+    def on_precision_report(self, *args, **kwargs):
+        """
+        Compare latency and accuracy (dice against fp32) of all CPU precisions on a representative
+        prediction on the current image.
+        """
+        if not self._is_local_session() or self._session_busy:
+            return
+        if self.session.device.type != "cpu":
+            show_warning("Reduced precision is only used for CPU inference")
+            return
+
+        report = []
+
+        def _on_yielded(result):
+            report.append(result)
+            self.performance_label.setText(f"{result['precision']}: {result['seconds']:.2f} s")
+
+        def _on_finished():
+            # Go back to the selected precision
+            self.on_precision_selected()
+            if report:
+                _lines = [
+                    f"{r['precision']}: {r['seconds']:.2f} s, dice to fp32 {r['dice']:.4f}"
+                    for r in report
+                ]
+                print("Precision Report:\n" + "\n".join(_lines))
+                save_performance_settings({"precision_report": report})
+                self.performance_label.setText("<br>".join(_lines))
+
+        self._start_benchmark(
+            lambda run, scratch: compare_precisions(
+                run, scratch, lambda p: set_cpu_precision(self.session, p), CPU_PRECISIONS
+            ),
+            _on_yielded,
+            _on_finished,
+        )
+
     def on_reset_all(self, *args, **kwargs):
         """Reset the plugin to initial state and close all layers, preserving object names"""
+        self._cancel_refinement()
         if self.session is not None:
             self.session.reset_interactions()
-            self.session = None
-            
+            self._release_session()
+
         # Call the parent implementation to handle UI reset and layer closing
         super().on_reset_all(*args, **kwargs)
 
     # Inference Behaviour
 
     def add_interaction(self):
+        if self._session_busy and not self._refining:
+            show_warning("The session is busy, please add the interaction again afterwards")
+            return
         _index = self.interaction_button.index
         _layer_name = self.layer_dict.get(_index)
         if (
@@ -254,45 +866,401 @@ class nnInteractiveWidget(LayerControls):
             and not self._viewer.layers[_layer_name].is_free()
         ):
             data = self._viewer.layers[_layer_name].get_last()
+            # The prompt store of the layer holds the polarity, scribble layers store no prompts
+            _prompts = self._viewer.layers[_layer_name].prompts
+            _prompt = bool(_prompts.include[-1]) if len(_prompts) else self.prompt_button.index == 0
 
             self._viewer.layers[_layer_name].run()
             # self.inference(_data, _index)
 
             if data is not None:
-                _prompt = self.prompt_button.index == 0
-                _auto_run = self.run_ckbx.isChecked()
-
-                if _index == 0:
-                    self._viewer.layers[self.point_layer_name].refresh(force=True)
-                    self.session.add_point_interaction(data, _prompt, _auto_run)
-                elif _index == 1:
-                    # add_bbox_interaction expects [[xmin, xmax], [ymin, ymax], [zmin, zmax]]
-                    _min = np.min(data, axis=0)
-                    _max = np.max(data, axis=0)
-                    bbox = [[_min[0], _max[0]], [_min[1], _max[1]], [_min[2], _max[2]]]
-                    self.session.add_bbox_interaction(bbox, _prompt, _auto_run)
-                elif _index == 2:
-                    self.session.add_scribble_interaction(data, _prompt, _auto_run)
-                elif _index == 3:
-                    self.session.add_lasso_interaction(data, _prompt, _auto_run)
-
-                self._viewer.layers[self.label_layer_name].refresh()
+                data = self._frame_prompt(_index, data)
+
+                if self.batch_ckbx.isChecked():
+                    # Keep the prompt until the batch is submitted by Run
+                    self.pending_prompts.append((_index, data, _prompt))
+                    self._update_pending_label()
+                elif self._refining:
+                    # The session is in use, the prompt is predicted once the refinement stopped
+                    self._refine_prompts.append((_index, data, _prompt))
+                    self._preview_generation += 1
+                elif (
+                    self.progressive_ckbx.isChecked()
+                    and self.run_ckbx.isChecked()
+                    and self.propagate_ckbx.isChecked()
+                    and self._is_local_session()
+                ):
+                    self._submit_progressive(_index, data, _prompt)
+                else:
+                    self._submit_prompt(_index, data, _prompt, self.run_ckbx.isChecked())
+
+                self._refresh_label_layer()
+
+    def _submit_prompt(self, index: int, data: Any, prompt: bool, run_prediction: bool) -> None:
+        """
+        Adds a single prompt to the session.
+
+        Args:
+            index (int): The interaction type, corresponding to the layer_dict key.
+            data (Any): The data obtained from the layer's get_last method.
+            prompt (bool): If the prompt is positive.
+            run_prediction (bool): If the prediction should run directly.
+        """
+        if run_prediction:
+            start_prediction_budget(self.session)
+        if index == 0:
+            self._viewer.layers[self.point_layer_name].refresh(force=True)
+            self.session.add_point_interaction(data, prompt, run_prediction)
+            self._record_prompt("point", prompt, np.asarray(data).tolist())
+        elif index == 1:
+            # add_bbox_interaction expects [[xmin, xmax], [ymin, ymax], [zmin, zmax]]
+            _min = np.min(data, axis=0)
+            _max = np.max(data, axis=0)
+            bbox = [[_min[0], _max[0]], [_min[1], _max[1]], [_min[2], _max[2]]]
+            self.session.add_bbox_interaction(bbox, prompt, run_prediction)
+            self._record_prompt("bbox", prompt, np.asarray(bbox).tolist())
+        elif index == 2:
+            self.session.add_scribble_interaction(data, prompt, run_prediction)
+            self._record_mask_prompt("scribble", prompt, data)
+        elif index == 3:
+            self.session.add_lasso_interaction(data, prompt, run_prediction)
+            self._record_mask_prompt("lasso", prompt, data)
+
+    def _submit_progressive(self, index: int, data: Any, prompt: bool) -> None:
+        """
+        Adds a prompt and shows a low resolution preview of its first patch right away. The full
+        auto-zoom prediction runs in the background afterwards. Prompts added meanwhile drop the
+        remaining forward passes of the running prediction and are predicted together afterwards.
+
+        Args:
+            index (int): The interaction type, corresponding to the layer_dict key.
+            data (Any): The data obtained from the layer's get_last method.
+            prompt (bool): If the prompt is positive.
+        """
+        self._submit_prompt(index, data, prompt, False)
+        self._merge_interaction_centers()
+        if not self.session.new_interaction_centers:
+            return
+
+        self._preview_generation += 1
+        _generation = self._preview_generation
+        _session = self.session
+        _center = self.session.new_interaction_centers[-1]
+
+        def _stopped():
+            return self._preview_generation != _generation
+
+        @thread_worker
+        def _refine():
+            with self._refine_lock:
+                if _stopped():
+                    return
+                start_prediction_budget(_session)
+                _preview = predict_preview(_session, _center)
+                if _preview is not None:
+                    self._preview_prior = (_session.target_buffer, *_preview)
+            if _preview is not None:
+                yield
+            with self._refine_lock:
+                # The prediction pastes only the regions it refines, the preview is undone first
+                self._restore_preview()
+                if _stopped():
+                    return
+                start_prediction_budget(_session)
+                _session._predict()
+
+        def _on_errored(e):
+            show_warning(f"Prediction failed: {str(e)}")
+
+        def _on_finished():
+            set_wrapper(_session, CancellableNetwork, None)
+            self._refining = False
+            self._session_busy = False
+            self._refresh_label_layer()
+            if self._refine_prompts and self.session is _session:
+                _prompts = self._refine_prompts
+                self._refine_prompts = []
+                for _index, _data, _prompt in _prompts[:-1]:
+                    self._submit_prompt(_index, _data, _prompt, False)
+                self._submit_progressive(*_prompts[-1])
+
+        set_wrapper(_session, CancellableNetwork, lambda n: CancellableNetwork(n, _stopped))
+        worker = _refine()
+        worker.yielded.connect(lambda *_: self._refresh_label_layer())
+        worker.errored.connect(_on_errored)
+        worker.finished.connect(_on_finished)
+
+        self._refining = True
+        self._session_busy = True
+        worker.start()
+
+    def _restore_preview(self) -> None:
+        """Writes the content a preview replaced back into the target buffer"""
+        if self._preview_prior is not None:
+            target, region, prior = self._preview_prior
+            target[region] = prior
+            self._preview_prior = None
+
+    def _cancel_refinement(self) -> None:
+        """
+        Drops a running progressive prediction and the prompts waiting for it, e.g. when the
+        interactions are reset. Waits until the session is not used by the prediction anymore.
+        """
+        self._refine_prompts = []
+        self._preview_generation += 1
+        with self._refine_lock:
+            self._restore_preview()
+
+    def _submit_pending_prompts(self) -> None:
+        """Adds all prompts collected in batch mode to the session without running a prediction."""
+        for _index, data, _prompt in self.pending_prompts:
+            self._submit_prompt(_index, data, _prompt, False)
+        self.pending_prompts = []
+        self._update_pending_label()
+
+    def _merge_interaction_centers(self) -> None:
+        """
+        Merges the prediction centers the session queued for all not yet predicted interactions,
+        so that prompts which fit into one patch are predicted with one forward pass.
+
+        A merged group is zoomed out as far as needed to cover its prompts, up to the batch zoom
+        setting. This also holds with auto-zoom turned off, a setting of 1 only merges prompts
+        which fit into one patch at full resolution.
+        """
+        _centers = getattr(self.session, "new_interaction_centers", None)
+        _zoom_factors = getattr(self.session, "new_interaction_zoom_out_factors", None)
+        if not _centers or _zoom_factors is None or len(_centers) != len(_zoom_factors):
+            return
+
+        _max_zoom = max(max(_zoom_factors), self.batch_zoom.value())
+
+        _centers, _zoom_factors = group_interaction_centers(
+            _centers,
+            _zoom_factors,
+            self.session.configuration_manager.patch_size,
+            _max_zoom,
+        )
+        self.session.new_interaction_centers = _centers
+        self.session.new_interaction_zoom_out_factors = _zoom_factors
 
     def on_load_mask(self):
 
-        _layer_data = self._viewer.layers[self.label_for_init.currentText()].data
+        _layer_data = pyramid_label_data(self._viewer.layers[self.label_for_init.currentText()])
 
         assert (
             _layer_data.shape == self.session_cfg["shape"]
         )  # Labels and Image should have same shape
 
         data = _layer_data == self.class_for_init.value()
+        if self.session_cfg["time_series"]:
+            data = data[self.frame]
 
         if np.any(data):
             if self.session is not None:
+                start_prediction_budget(self.session)
                 self.session.add_initial_seg_interaction(
-                    data.astype(np.uint8), run_prediction=self.auto_refine.isChecked()
+                    data.view(np.uint8), run_prediction=self.auto_refine.isChecked()
+                )
+                self._record_prompt(
+                    "initial_seg",
+                    True,
+                    {
+                        "layer": self.label_for_init.currentText(),
+                        "class": self.class_for_init.value(),
+                    },
                 )
-                self._viewer.layers[self.label_layer_name].refresh()
+                self._refresh_label_layer()
         else:
             warnings.warn("Mask is not valid - probably its empty", UserWarning, stacklevel=1)
+
+    def on_import_classes(self, *args, **kwargs):
+        """
+        Import every class of the selected label layer as a separate object. All classes and their
+        bounding boxes are found in a single pass and only the bounding boxes are compared. With
+        Auto refine, the classes are queued and each one is refined by the model before it becomes
+        an object, otherwise they are added directly.
+        """
+        if self.session is None or self._session_busy:
+            return
+        _label_map = np.asarray(
+            pyramid_label_data(self._viewer.layers[self.label_for_init.currentText()])
+        )
+        if tuple(_label_map.shape) != tuple(self.session_cfg["shape"]):
+            show_warning("The label layer and the image need to have the same shape")
+            return
+
+        _names = {}
+        if self.class_table.text().strip() != "":
+            try:
+                _names = load_class_table(self.class_table.text().strip())
+            except (OSError, ValueError) as e:
+                show_warning(f"Could not read the class table: {str(e)}")
+                return
+
+        _classes = split_classes(_label_map)
+        if not _classes:
+            show_warning("The label layer contains no classes")
+            return
+
+        if not self.auto_refine.isChecked():
+            for class_id, bbox in _classes:
+                _name = _names.get(class_id, f"class_{class_id}")
+                # Only the bounding box of the class is autosaved
+                self.add_object_layer(
+                    class_mask(_label_map, class_id, bbox),
+                    _name,
+                    region=[[sl.start, sl.stop] for sl in bbox],
+                )
+            self._raise_label_layer()
+            print(f"Imported {len(_classes)} classes from {self.label_for_init.currentText()}")
+            return
+
+        # The refined classes replace the working object, so it is finished first
+        if np.any(self._data_result):
+            self.on_next()
+        self._class_queue = deque(_classes)
+        self._session_busy = True
+        self.import_classes_btn.setEnabled(False)
+        self._refine_next_class(_label_map, _names, len(_classes))
+
+    def on_segment_seeds(self, *args, **kwargs):
+        """
+        Segment every seed of the selected points layer as its own object. Each seed is predicted
+        from a positive point prompt into a fresh buffer of the buffer pool. The model predicts the
+        next seed in the background while the previous one is committed as an object.
+        """
+        if self.session is None or self._session_busy:
+            return
+        _layer_name = self.seed_layer.currentText()
+        if _layer_name not in self._viewer.layers:
+            show_warning("No points layer selected")
+            return
+        _points = self._seed_points(self._viewer.layers[_layer_name])
+        if len(_points) == 0:
+            show_warning(f"{_layer_name} contains no seeds inside the image")
+            return
+
+        # The working object is finished first if needed. It keeps its id, the seeds are numbered
+        # after all existing objects so none of them replaces the record of the working object.
+        if np.any(self._data_result):
+            self.on_next()
+        self._cancel_refinement()
+        _first_index = self._seed_index = self.objects.next_index
+        self._seed_stop.clear()
+        _session = self.session
+        _pool = self._buffer_pool
+        _frame = self.frame if self.session_cfg["time_series"] else None
+        _total = len(_points)
+
+        @thread_worker
+        def _segment():
+            for i, point in enumerate(_points):
+                if self._seed_stop.is_set():
+                    return
+                _buffer = _pool.acquire()
+                _target = (_buffer if _frame is None else _buffer[_frame]).view(
+                    DirtyTrackingArray
+                )
+                _session.set_target_buffer(_target)
+                _session.reset_interactions()
+                # The buffer is empty already, only the region of the prediction is autosaved
+                _target.dirty = None
+                start_prediction_budget(_session)
+                _session.add_point_interaction(point, True, run_prediction=True)
+                _region = _target.dirty
+                if isinstance(_session, ProcessSession):
+                    # The child process wrote into shared memory, the region is not known
+                    _session.wait()
+                    _region = None
+                elif _region is not None and _frame is not None:
+                    _region = [[_frame, _frame + 1]] + _region
+                # Committing this seed in the GUI thread overlaps with predicting the next one
+                yield i, point, _buffer, _region
+
+        def _on_yielded(result):
+            i, point, _buffer, _region = result
+            if np.any(_buffer):
+                self.add_object_layer(_buffer, f"seed_{i}", self._seed_index, _region)
+                self._record_prompt("point", True, point.tolist(), self._seed_index)
+                self._seed_index += 1
+            else:
+                print(f"Seed {i} at {point.tolist()} gave an empty object, it is skipped")
+                _pool.release(_buffer, None, known=True)
+            self.seed_label.setText(f"Segmented seed {i + 1}/{_total}")
+
+        def _on_errored(e):
+            show_warning(f"Segmenting the seeds failed: {str(e)}")
+
+        def _on_finished():
+            # The session continues with the working object, whose layer stays on top
+            self.session.set_target_buffer(self._session_result())
+            self.session.reset_interactions()
+            self._raise_label_layer()
+            self._refresh_label_layer(full=True)
+            self._session_busy = False
+            self.seed_button.setEnabled(True)
+            self.seed_stop_button.setEnabled(False)
+            print(f"Segmented {self._seed_index - _first_index} objects from {_total} seeds")
+
+        worker = _segment()
+        worker.yielded.connect(_on_yielded)
+        worker.errored.connect(_on_errored)
+        worker.finished.connect(_on_finished)
+
+        self._session_busy = True
+        self.seed_button.setEnabled(False)
+        self.seed_stop_button.setEnabled(True)
+        worker.start()
+
+    def on_stop_seeds(self, *args, **kwargs):
+        """Stop the segmentation of seeds after the current seed"""
+        self._seed_stop.set()
+        self.seed_label.setText("Stopping after the current seed...")
+
+    def _refine_next_class(self, label_map: np.ndarray, names: Dict[int, str], total: int) -> None:
+        """
+        Refines the next queued class in the background and finishes it as an object afterward.
+
+        Args:
+            label_map (np.ndarray): The imported label map.
+            names (Dict[int, str]): The names of the class ids.
+            total (int): The number of imported classes.
+        """
+        if not self._class_queue:
+            self._session_busy = False
+            self.import_classes_btn.setEnabled(True)
+            print(f"Imported and refined {total} classes")
+            return
+
+        class_id, bbox = self._class_queue.popleft()
+        _mask = class_mask(label_map, class_id, bbox)
+        if self.session_cfg["time_series"]:
+            _mask = _mask[self.frame]
+        _session = self.session
+
+        @thread_worker
+        def _refine():
+            _session.reset_interactions()
+            start_prediction_budget(_session)
+            _session.add_initial_seg_interaction(_mask, run_prediction=True)
+            if isinstance(_session, ProcessSession):
+                _session.wait()
+
+        def _on_returned(_):
+            record = self.objects.get(self.object_index)
+            if record is not None:
+                record.name = names.get(class_id, f"class_{class_id}")
+            self.on_next()
+            print(f"Refined class {class_id} ({total - len(self._class_queue)}/{total})")
+            self._refine_next_class(label_map, names, total)
+
+        def _on_errored(e):
+            show_warning(f"Refining class {class_id} failed: {str(e)}")
+            self._class_queue.clear()
+            self._session_busy = False
+            self.import_classes_btn.setEnabled(True)
+
+        worker = _refine()
+        worker.returned.connect(_on_returned)
+        worker.errored.connect(_on_errored)
+        worker.start()